@@ -1,15 +1,19 @@
 from typing import Literal
-import jupyterlab
-import ipykernel
+import weakref
+import json
+import zlib
+from multiprocessing import shared_memory
 
 import pandas as pd
 import numpy as np
-from scipy import stats
 import math
 
 
 
 def print_notebook_versions():
+    import jupyterlab
+    import ipykernel
+
     print(f"JupyterLab: {jupyterlab.__version__}\n")
     print(f"ipykernel: {ipykernel.__version__}")
 
@@ -45,6 +49,8 @@ def mode_list(list_values: list):
 
 
 def mode(list_values:list, count_mode=False):
+    from scipy import stats
+
     mode_value = stats.mode(list_values, keepdims=False)
     if count_mode:
         mode_value = mode_value[1]
@@ -64,6 +70,8 @@ def mean_abs_deviation(list_values: list):
 
 
 def median_abs_deviation_norm(list_values: list):
+    from scipy import stats
+
     mad = stats.median_abs_deviation(list_values)
     factor = 1 / stats.norm.ppf(0.75)
     mad_norm = mad * factor  # Factor for normal distribution
@@ -100,129 +108,1145 @@ def count_outlier_values(list_values: list, dtype: Literal['lower', 'upper']):
     return num
 
 
-def describe_full_df(_df: pd.DataFrame, extend_metrics=False):
+def describe_functions(extend_metrics=False):
+    '''Returns the metrics of describe_full_df as a dict of functions applied to a single column.'''
+    from scipy import stats
+
+    count_isnull = lambda x: pd.Series.isnull(x).sum()
+    perc_count_isnull = lambda x: pd.Series.isnull(x).mean() * 100
+    percentile_25 = lambda x: np.percentile(x, 25)
+    percentile_75 = lambda x: np.percentile(x, 75)
+    amplitude = lambda x: np.max(x) - np.min(x)
+    lower_outlier = lambda x: outlier_values(x, 'lower')
+    upper_outlier = lambda x: outlier_values(x, 'upper')
+    count_lower_outlier = lambda x: count_outlier_values(x, 'lower')
+    count_upper_outlier = lambda x: count_outlier_values(x, 'upper')
+    coefficient_variation = lambda x: pd.Series.std(x) / pd.Series.mean(x)
+    int_mean_5p = lambda x: stats.trim_mean(x, proportiontocut=0.05)
+    int_mean_25p = lambda x: stats.trim_mean(x, proportiontocut=0.25)
+    ampl_over_avg = lambda x: amplitude(x) / pd.Series.mean(x)
+
+    dict_functions = {
+        'count': pd.Series.count,
+        'count_isnull': count_isnull,
+        '%_count_isnull': perc_count_isnull,
+        'count_zero': count_zero,
+        'count_nonzero': np.count_nonzero,
+        'count_unique': pd.Series.nunique,
+        'mean': pd.Series.mean,
+        'geo_mean': stats.gmean,
+        'harm_mean': stats.hmean,
+        'int_mean_5%': int_mean_5p,
+        'median': pd.Series.median,
+        'mode': mode,
+        'mode_list': mode_list,
+        'mode_freq': mode_freq,
+        'min': np.min,
+        '25%': percentile_25,
+        '50%': pd.Series.median,
+        '75%': percentile_75,
+        'max': np.max,
+        'amplitude': amplitude,
+        'iqr': stats.iqr,
+        'lower_outlier': lower_outlier,
+        'count_lower_outlier': count_lower_outlier,
+        'upper_outlier': upper_outlier,
+        'count_upper_outlier': count_upper_outlier,
+        'int_mean_25%': int_mean_25p,
+        'mean_abs_dev': mean_abs_deviation,
+        'std_dev': pd.Series.std,
+        'median_abs_dev': stats.median_abs_deviation,
+        'median_abs_dev_norm': median_abs_deviation_norm,
+        'coefficient_var': coefficient_variation, 
+        'ampl_over_avg': ampl_over_avg,
+        'variance': np.var,
+    }
+
+    if extend_metrics:
+        shapiro_stat = lambda x: stats.shapiro(x)[0]
+        shapiro_pvalue = lambda x: stats.shapiro(x)[1]
+
+        dict_functions.update({
+            'kurt': pd.Series.kurt,
+            'kurtosis': stats.kurtosis,
+            'skew': pd.Series.skew,
+            'shapiro_stat': shapiro_stat,
+            'shapiro_pvalue': shapiro_pvalue,
+            'autocorr': pd.Series.autocorr,
+            'circvar': stats.circvar,
+            'circmean': stats.circmean,
+            'circstd': stats.circstd,
+            'entropy': stats.entropy,
+            'kstat': stats.kstat,
+            'kstatvar': stats.kstatvar,
+        })
+
+    return dict_functions
+
+
+def apply_metric(function, list_values):
+    '''Applies a metric function to the values, returning None when the metric fails.'''
+
+    try:
+        return function(list_values)
+    except:
+        return None
+
+
+def describe_column_loop(series: pd.Series, dict_functions: dict):
+    '''Applies each metric function to the column, keeping None for the metrics that fail.'''
+
+    return [apply_metric(function, series) for function in dict_functions.values()]
+
+
+def percentile_sorted(sorted_values: np.ndarray, q: float):
+    '''Linear percentile (numpy default method) of each column of an array already sorted along axis 0.'''
+
+    n = len(sorted_values)
+    q = q / 100
+    virtual_index = n * q + (1 - q) - 1
+    previous_index = math.floor(virtual_index)
+    gamma = virtual_index - previous_index
+
+    a = sorted_values[previous_index]
+    b = sorted_values[min(previous_index + 1, n - 1)]
+    diff = b - a
+    if gamma >= 0.5:
+        return b - diff * (1 - gamma)
+    return a + diff * gamma
+
+
+def mode_sorted(sorted_values: np.ndarray):
+    '''Returns the distinct values and their frequencies of an 1-D array already sorted.'''
+
+    starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+    counts = np.diff(np.r_[starts, len(sorted_values)])
+    return sorted_values[starts], counts
+
+
+# Metrics of extend_metrics that describe_block evaluates column by column, the costly part of the extended description.
+# Built on first use, so importing the module does not import scipy
+dict_column_functions = None
+
+
+def get_column_functions():
+    '''Returns the metrics evaluated column by column by describe_block (dict_column_functions).'''
+    global dict_column_functions
+
+    if dict_column_functions is None:
+        from scipy import stats
+
+        dict_column_functions = {
+            'shapiro': stats.shapiro,
+            'autocorr': pd.Series.autocorr,
+            'circvar': stats.circvar,
+            'circmean': stats.circmean,
+            'circstd': stats.circstd,
+            'kstat': stats.kstat,
+            'kstatvar': stats.kstatvar,
+        }
+
+    return dict_column_functions
+
+
+def shared_column_metric(shm_name: str, shape: tuple, dtype: str, column: int, metric: str):
+    '''Worker of describe_column_metrics: evaluates one metric of one column read from shared memory.'''
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        values = np.ndarray(shape, dtype=dtype, buffer=shm.buf, order='F')
+        series = pd.Series(values[:, column].copy())
+        del values
+        return apply_metric(get_column_functions()[metric], series)
+    finally:
+        shm.close()
+
+
+def describe_column_metrics(values: np.ndarray, n_jobs: int = None):
+    '''Evaluates the metrics of dict_column_functions for each column of the block, optionally in a process pool.'''
+
+    column_functions = get_column_functions()
+    n, k = values.shape
+    tasks = [(j, metric) for j in range(k) for metric in column_functions]
+    dict_results = {metric: [None] * k for metric in column_functions}
+
+    if n_jobs is None or n_jobs <= 1:
+        for j, metric in tasks:
+            dict_results[metric][j] = apply_metric(column_functions[metric], pd.Series(values[:, j].copy()))
+        return dict_results
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    shm = shared_memory.SharedMemory(create=True, size=values.nbytes)
+    try:
+        shared_values = np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf, order='F')
+        shared_values[:] = values
+        del shared_values
+
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [
+                executor.submit(shared_column_metric, shm.name, values.shape, values.dtype.str, j, metric)
+                for j, metric in tasks
+            ]
+            for (j, metric), future in zip(tasks, futures):
+                dict_results[metric][j] = future.result()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return dict_results
+
+
+def describe_block(_df: pd.DataFrame, extend_metrics=False, n_jobs: int = None):
+    '''Computes the describe_full_df metrics of a numeric block without nulls, sorting each column only once.'''
+    from scipy import stats
+
+    values = np.asfortranarray(_df.to_numpy())
+    sorted_values = np.sort(values, axis=0)
+    n, k = values.shape
+
+    mean = _df.mean().to_numpy()
+    std_dev = _df.std().to_numpy()
+    minimum = sorted_values[0]
+    maximum = sorted_values[-1]
+    amplitude = maximum - minimum
+    median = np.mean(sorted_values[[(n - 1) // 2, n // 2]], axis=0)
+    q1 = percentile_sorted(sorted_values, 25)
+    q3 = percentile_sorted(sorted_values, 75)
+    iqr = q3 - q1
+    lower_outlier = q1 - 1.5 * iqr
+    upper_outlier = q3 + 1.5 * iqr
+    # Trimmed means and IQR by the same scipy functions of the column by column path, so the results are identical to it:
+    # stats.trim_mean sums a partitioned (not sorted) copy and stats.iqr interpolates the quartiles in its own order
+    iqr_metric = [apply_metric(stats.iqr, values[:, j]) for j in range(k)]
+    trim_mean_5 = [apply_metric(lambda x: stats.trim_mean(x, 0.05), values[:, j]) for j in range(k)]
+    trim_mean_25 = [apply_metric(lambda x: stats.trim_mean(x, 0.25), values[:, j]) for j in range(k)]
+    count_nonzero = np.count_nonzero(values, axis=0)
+    median_abs_dev = np.median(np.abs(sorted_values - median), axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        geo_mean = stats.gmean(values, axis=0)
+        harm_mean = [apply_metric(stats.hmean, values[:, j]) for j in range(k)]
+
+    count_unique = []
+    list_mode = []
+    list_mode_list = []
+    list_mode_freq = []
+    count_lower_outlier = []
+    count_upper_outlier = []
+    for j in range(k):
+        unique_values, counts = mode_sorted(sorted_values[:, j])
+        count_unique.append(len(unique_values))
+        list_mode.append(unique_values[np.argmax(counts)])
+        list_mode_list.append(unique_values[counts == counts.max()].tolist())
+        list_mode_freq.append(counts.max())
+        count_lower_outlier.append(int(np.searchsorted(sorted_values[:, j], lower_outlier[j], side='left')))
+        count_upper_outlier.append(int(n - np.searchsorted(sorted_values[:, j], upper_outlier[j], side='right')))
+
+    dict_metrics = {
+        'count': _df.count().to_numpy(),
+        'count_isnull': [np.int64(0)] * k,
+        '%_count_isnull': [np.float64(0.0)] * k,
+        'count_zero': n - count_nonzero,
+        'count_nonzero': count_nonzero,
+        'count_unique': count_unique,
+        'mean': mean,
+        'geo_mean': geo_mean,
+        'harm_mean': harm_mean,
+        'int_mean_5%': trim_mean_5,
+        'median': median,
+        'mode': list_mode,
+        'mode_list': list_mode_list,
+        'mode_freq': list_mode_freq,
+        'min': minimum,
+        '25%': q1,
+        '50%': median,
+        '75%': q3,
+        'max': maximum,
+        'amplitude': amplitude,
+        'iqr': iqr_metric,
+        'lower_outlier': lower_outlier,
+        'count_lower_outlier': count_lower_outlier,
+        'upper_outlier': upper_outlier,
+        'count_upper_outlier': count_upper_outlier,
+        'int_mean_25%': trim_mean_25,
+        'mean_abs_dev': (_df - mean).abs().mean().to_numpy(),
+        'std_dev': std_dev,
+        'median_abs_dev': median_abs_dev,
+        'median_abs_dev_norm': median_abs_dev * (1 / stats.norm.ppf(0.75)),
+        'coefficient_var': std_dev / mean,
+        'ampl_over_avg': amplitude / mean,
+        'variance': _df.var(ddof=0).to_numpy(),
+    }
+
+    if extend_metrics:
+        column_metrics = describe_column_metrics(values, n_jobs)
+        shapiro = column_metrics['shapiro']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dict_metrics.update({
+                'kurt': _df.kurt().to_numpy(),
+                'kurtosis': stats.kurtosis(values, axis=0),
+                'skew': _df.skew().to_numpy(),
+                'shapiro_stat': [None if s is None else s[0] for s in shapiro],
+                'shapiro_pvalue': [None if s is None else s[1] for s in shapiro],
+                'autocorr': column_metrics['autocorr'],
+                'circvar': column_metrics['circvar'],
+                'circmean': column_metrics['circmean'],
+                'circstd': column_metrics['circstd'],
+                'entropy': stats.entropy(values, axis=0),
+                'kstat': column_metrics['kstat'],
+                'kstatvar': column_metrics['kstatvar'],
+            })
+
+    return {col: [dict_metrics[metric][j] for metric in dict_metrics] for j, col in enumerate(_df.columns)}
+
+
+def describe_full_df(_df: pd.DataFrame, extend_metrics=False, n_jobs: int = None, approximate=False, relative_accuracy: float = 0.01, 
+                     max_counters: int = 1000, hll_precision: int = 14):
     '''Generates a full description of a DataFrame, 
     including additional statistics for numeric columns.
+    With approximate=True the quantile based metrics, mode and count_unique are estimates (see describe_approximate).
     '''
 
+    if approximate:
+        return describe_approximate(_df, extend_metrics, n_jobs, relative_accuracy, max_counters, hll_precision)
+
     cols_number = _df.select_dtypes(include='number').columns
-    df_describe = _df.describe()
+    # Same columns selected by _df.describe(), without computing it
+    cols_describe = _df.select_dtypes(include=['number', 'datetime']).columns
     
-    if np.all(df_describe.columns == cols_number):
-
-        count_isnull = lambda x: pd.Series.isnull(x).sum()
-        perc_count_isnull = lambda x: pd.Series.isnull(x).mean() * 100
-        percentile_25 = lambda x: np.percentile(x, 25)
-        percentile_75 = lambda x: np.percentile(x, 75)
-        amplitude = lambda x: np.max(x) - np.min(x)
-        lower_outlier = lambda x: outlier_values(x, 'lower')
-        upper_outlier = lambda x: outlier_values(x, 'upper')
-        count_lower_outlier = lambda x: count_outlier_values(x, 'lower')
-        count_upper_outlier = lambda x: count_outlier_values(x, 'upper')
-        coefficient_variation = lambda x: pd.Series.std(x) / pd.Series.mean(x)
-        int_mean_5p = lambda x: stats.trim_mean(x, proportiontocut=0.05)
-        int_mean_25p = lambda x: stats.trim_mean(x, proportiontocut=0.25)
-        ampl_over_avg = lambda x: amplitude(x) / pd.Series.mean(x)
-
-        dict_functions = {
-            'count': pd.Series.count,
-            'count_isnull': count_isnull,
-            '%_count_isnull': perc_count_isnull,
-            'count_zero': count_zero,
-            'count_nonzero': np.count_nonzero,
-            'count_unique': pd.Series.nunique,
-            'mean': pd.Series.mean,
-            'geo_mean': stats.gmean,
-            'harm_mean': stats.hmean,
-            'int_mean_5%': int_mean_5p,
-            'median': pd.Series.median,
-            'mode': mode,
-            'mode_list': mode_list,
-            'mode_freq': mode_freq,
-            'min': np.min,
-            '25%': percentile_25,
-            '50%': pd.Series.median,
-            '75%': percentile_75,
-            'max': np.max,
-            'amplitude': amplitude,
-            'iqr': stats.iqr,
-            'lower_outlier': lower_outlier,
-            'count_lower_outlier': count_lower_outlier,
-            'upper_outlier': upper_outlier,
-            'count_upper_outlier': count_upper_outlier,
-            'int_mean_25%': int_mean_25p,
-            'mean_abs_dev': mean_abs_deviation,
-            'std_dev': pd.Series.std,
-            'median_abs_dev': stats.median_abs_deviation,
-            'median_abs_dev_norm': median_abs_deviation_norm,
-            'coefficient_var': coefficient_variation, 
-            'ampl_over_avg': ampl_over_avg,
-            'variance': np.var,
-        }
+    if len(cols_number) > 0 and cols_number.equals(cols_describe):
 
-        if extend_metrics:
-            shapiro_stat = lambda x: stats.shapiro(x)[0]
-            shapiro_pvalue = lambda x: stats.shapiro(x)[1]
-
-            dict_functions.update({
-                'kurt': pd.Series.kurt,
-                'kurtosis': stats.kurtosis,
-                'skew': pd.Series.skew,
-                'shapiro_stat': shapiro_stat,
-                'shapiro_pvalue': shapiro_pvalue,
-                'autocorr': pd.Series.autocorr,
-                'circvar': stats.circvar,
-                'circmean': stats.circmean,
-                'circstd': stats.circstd,
-                'entropy': stats.entropy,
-                'kstat': stats.kstat,
-                'kstatvar': stats.kstatvar,
-            })
+        dict_functions = describe_functions(extend_metrics)
+
+        df_number = _df[cols_number]
+        dict_block_cols = {}
+        # Very small samples keep the column by column path, where several metrics fail or return None
+        if len(df_number) >= 4:
+            for col_n, dtype, has_null in zip(cols_number, df_number.dtypes, df_number.isnull().any()):
+                if isinstance(dtype, np.dtype) and dtype.kind in 'iuf' and not has_null:
+                    dict_block_cols.setdefault(dtype, []).append(col_n)
 
-        
         dict_data = {}
-        for col_n in cols_number:
-            
-            list_metric = []
-            for col, function in dict_functions.items():
-                try:
-                    list_metric.append(function(_df[col_n]))
-                except:
-                    list_metric.append(None)
+        for cols in dict_block_cols.values():
+            dict_data.update(describe_block(df_number[cols], extend_metrics, n_jobs))
 
-            dict_data.update({col_n: list_metric})
+        for col_n in cols_number:
+            if col_n not in dict_data:
+                dict_data[col_n] = describe_column_loop(_df[col_n], dict_functions)
 
-        df_temp = pd.DataFrame(dict_data)
+        df_temp = pd.DataFrame({col_n: dict_data[col_n] for col_n in cols_number})
         df_temp.index = dict_functions.keys()
 
         return pd.concat([df_temp])
       
 
-def describe_full_df_segmented(df:pd.DataFrame, column_numeric:str, column_category:str, category_values:list=None, extend_metrics=False):
+def describe_approximate(_df: pd.DataFrame, extend_metrics=False, n_jobs: int = None, relative_accuracy: float = 0.01, 
+                         max_counters: int = 1000, hll_precision: int = 14):
+    '''Approximate describe_full_df from mergeable summaries, one summary per row partition.
+    Quantile based metrics have a relative error of relative_accuracy; mode and count_unique are estimates above max_counters distinct values.
+    '''
+
+    df_number = _df.select_dtypes(include='number')
+    if len(df_number.columns) == 0:
+        return None
+
+    if n_jobs is not None and n_jobs > 1 and len(df_number) > n_jobs:
+        from concurrent.futures import ProcessPoolExecutor
+        from functools import reduce
+
+        partitions = [df_number.iloc[rows] for rows in np.array_split(np.arange(len(df_number)), n_jobs)]
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            sketches = list(executor.map(
+                sketch_describe, partitions, [relative_accuracy] * n_jobs, [max_counters] * n_jobs, [hll_precision] * n_jobs))
+        sketch = reduce(merge_sketch_describe, sketches)
+    else:
+        sketch = sketch_describe(df_number, relative_accuracy, max_counters, hll_precision)
+
+    return finalize_sketch_describe(sketch, extend_metrics)
+
+
+def describe_full_df_segmented(df:pd.DataFrame, column_numeric:str | list, column_category:str | list, category_values:list=None, extend_metrics=False):
+    '''Generates the describe_full_df metrics of numeric columns segmented by one or more category columns (nulls form their own segment).'''
+
+    cols_numeric = [column_numeric] if isinstance(column_numeric, str) else list(column_numeric)
+    cols_category = [column_category] if isinstance(column_category, str) else list(column_category)
+
+    if len(cols_category) == 1:
+        codes, uniques = pd.factorize(df[cols_category[0]], use_na_sentinel=False)
+        uniques = pd.Index(uniques)
+    else:
+        codes, uniques = pd.MultiIndex.from_frame(df[cols_category]).factorize()
+
     if category_values is None:
-        category_values = df[column_category].unique()
+        category_values = uniques
+        category_codes = np.arange(len(uniques))
+    else:
+        category_codes = uniques.get_indexer(category_values)
+
+    # One stable sort by code: each segment is a contiguous slice with the rows in their original order
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    df_sorted = df[cols_numeric].take(order)
+
+    dict_functions = describe_functions(extend_metrics)
+    dict_block_cols = {}
+    for col_n, dtype in zip(cols_numeric, df_sorted.dtypes):
+        if isinstance(dtype, np.dtype) and dtype.kind in 'iuf':
+            dict_block_cols.setdefault(dtype, []).append(col_n)
+    # Columns with nulls in each segment, from a single pass over the sorted rows (segments are never empty)
+    segment_has_null = np.logical_or.reduceat(df_sorted.isnull().to_numpy(), bounds[:-1], axis=0) if len(df_sorted) else None
 
     df_desc = []
-    for cv in category_values:
-        _ = describe_full_df(df.query(f"{column_category} == @cv"),extend_metrics=extend_metrics)[column_numeric]
-        df_desc.append(_)
+    for code in category_codes:
+        start, end = (bounds[code], bounds[code + 1]) if code >= 0 else (0, 0)
+        df_segment = df_sorted.iloc[start:end]
+        dict_data = {}
+        # Same block/column by column split of describe_full_df
+        if end - start >= 4:
+            for cols in dict_block_cols.values():
+                cols = [c for c in cols if not segment_has_null[code, cols_numeric.index(c)]]
+                if cols:
+                    dict_data.update(describe_block(df_segment[cols], extend_metrics))
+        for col_n in cols_numeric:
+            if col_n not in dict_data:
+                dict_data[col_n] = describe_column_loop(df_segment[col_n], dict_functions)
+        df_desc.append(pd.DataFrame({col_n: dict_data[col_n] for col_n in cols_numeric}, index=dict_functions.keys()))
 
-    df_desc = pd.concat(df_desc, axis=1)
-    df_desc.columns = category_values
-    df_desc.index.name = column_numeric
+    if len(cols_numeric) == 1 and len(cols_category) == 1:
+        df_desc = pd.concat([d[cols_numeric[0]] for d in df_desc], axis=1)
+        df_desc.columns = category_values
+        df_desc.index.name = cols_numeric[0]
+        return df_desc
+
+    keys = [cv if isinstance(cv, tuple) else (cv,) for cv in category_values]
+    df_desc = pd.concat(
+        [df_desc[i][c].rename((c, *keys[i])) for c in cols_numeric for i in range(len(keys))], 
+        axis=1
+    )
+    df_desc.columns = pd.MultiIndex.from_tuples(df_desc.columns, names=['variable', *cols_category])
 
     return df_desc
     
 
-def save_profile_report(df: pd.DataFrame, filename: str, title: str = "Pandas Profiling Report"):
+# Column profiles memoized per DataFrame: id(df) -> (weak reference to df, {column: profile})
+cache_column_profiles = {}
+
+# Column statistics memoized per DataFrame: id(df) -> (weak reference to df, {key: (tokens, statistic)})
+cache_column_statistics = {}
+
+
+def partial_describe(df: pd.DataFrame):
+    '''Computes mergeable partial statistics of the numeric columns of a DataFrame or chunk.'''
+
+    df_number = df.select_dtypes(include='number')
+    values = df_number.to_numpy(dtype=float)
+    isnull = np.isnan(values)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        count = (~isnull).sum(axis=0)
+        mean = np.nansum(values, axis=0) / count
+        deviation = values - mean
+        m2 = np.nansum(deviation ** 2, axis=0)
+        m3 = np.nansum(deviation ** 3, axis=0)
+        m4 = np.nansum(deviation ** 4, axis=0)
+
+    has_values = count > 0
+    minimum = np.full(len(count), np.nan)
+    maximum = np.full(len(count), np.nan)
+    minimum[has_values] = np.nanmin(values[:, has_values], axis=0)
+    maximum[has_values] = np.nanmax(values[:, has_values], axis=0)
+
+    return {
+        'columns': list(df_number.columns),
+        'rows': len(df_number),
+        'count': count,
+        'count_zero': (values == 0).sum(axis=0),
+        'mean': mean,
+        'm2': m2,
+        'm3': m3,
+        'm4': m4,
+        'min': minimum,
+        'max': maximum,
+    }
+
+
+def merge_partial_describe(partial_a: dict, partial_b: dict):
+    '''Combines the partial statistics of two chunks.'''
+
+    if partial_a['columns'] != partial_b['columns']:
+        raise ValueError('The partial statistics must have the same columns.')
+
+    n_a, n_b = partial_a['count'].astype(float), partial_b['count'].astype(float)
+    n = n_a + n_b
+    m2_a, m2_b = partial_a['m2'], partial_b['m2']
+    m3_a, m3_b = partial_a['m3'], partial_b['m3']
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = partial_b['mean'] - partial_a['mean']
+        mean = partial_a['mean'] + delta * n_b / n
+        m2 = m2_a + m2_b + delta ** 2 * n_a * n_b / n
+        m3 = (m3_a + m3_b + delta ** 3 * n_a * n_b * (n_a - n_b) / n ** 2 
+              + 3 * delta * (n_a * m2_b - n_b * m2_a) / n)
+        m4 = (partial_a['m4'] + partial_b['m4'] 
+              + delta ** 4 * n_a * n_b * (n_a ** 2 - n_a * n_b + n_b ** 2) / n ** 3
+              + 6 * delta ** 2 * (n_a ** 2 * m2_b + n_b ** 2 * m2_a) / n ** 2 
+              + 4 * delta * (n_a * m3_b - n_b * m3_a) / n)
+
+    # A chunk without values of a column keeps the statistics of the other one
+    only_a = n_b == 0
+    only_b = n_a == 0
+    for merged, key in ((mean, 'mean'), (m2, 'm2'), (m3, 'm3'), (m4, 'm4')):
+        merged[only_a] = partial_a[key][only_a]
+        merged[only_b] = partial_b[key][only_b]
+
+    return {
+        'columns': partial_a['columns'],
+        'rows': partial_a['rows'] + partial_b['rows'],
+        'count': partial_a['count'] + partial_b['count'],
+        'count_zero': partial_a['count_zero'] + partial_b['count_zero'],
+        'mean': mean,
+        'm2': m2,
+        'm3': m3,
+        'm4': m4,
+        'min': np.fmin(partial_a['min'], partial_b['min']),
+        'max': np.fmax(partial_a['max'], partial_b['max']),
+    }
+
+
+def finalize_partial_describe(partial: dict, extend_metrics=False):
+    '''Returns the describe_full_df metrics that can be computed exactly from merged partial statistics.'''
+
+    rows = partial['rows']
+    count = partial['count'].astype('int64')
+    n = count.astype(float)
+    mean = partial['mean']
+    m2, m3, m4 = partial['m2'], partial['m3'], partial['m4']
+    amplitude = partial['max'] - partial['min']
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std_dev = np.where(count > 1, np.sqrt(m2 / (n - 1)), np.nan)
+        metrics = {
+            'count': count,
+            'count_isnull': rows - count,
+            '%_count_isnull': (rows - count) / rows * 100 if rows else np.full(len(count), np.nan),
+            'count_zero': partial['count_zero'].astype('int64'),
+            'count_nonzero': rows - partial['count_zero'].astype('int64'),
+            'mean': mean,
+            'min': partial['min'],
+            'max': partial['max'],
+            'amplitude': amplitude,
+            'std_dev': std_dev,
+            'coefficient_var': std_dev / mean,
+            'ampl_over_avg': amplitude / mean,
+            'variance': m2 / n,
+        }
+
+        if extend_metrics:
+            # Same bias corrections of pd.Series.kurt / pd.Series.skew and the biased stats.kurtosis
+            kurt = (n * (n + 1) * (n - 1) * m4 / ((n - 2) * (n - 3) * m2 ** 2) 
+                    - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3)))
+            skew = np.sqrt(n * (n - 1)) / (n - 2) * (m3 / n) / (m2 / n) ** 1.5
+            metrics.update({
+                'kurt': np.where(count > 3, np.where(m2 == 0, 0, kurt), np.nan),
+                'kurtosis': np.where(m2 == 0, np.nan, (m4 / n) / (m2 / n) ** 2 - 3),
+                'skew': np.where(count > 2, np.where(m2 == 0, 0, skew), np.nan),
+            })
+
+    return pd.DataFrame(
+        [list(v) for v in metrics.values()],
+        index=list(metrics),
+        columns=partial['columns'],
+        dtype=object,
+    )
+
+
+def quantile_sketch(values: np.ndarray, relative_accuracy: float = 0.01):
+    '''Builds a mergeable quantile sketch with logarithmic buckets (as DDSketch).
+    Quantiles read from the sketch have a relative error of at most relative_accuracy.
+    '''
+
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+
+    stores = {}
+    for name, selected in (('positive', values[values > 0]), ('negative', -values[values < 0])):
+        index, counts = np.unique(np.ceil(np.log(selected) / np.log(gamma)).astype('int64'), return_counts=True)
+        stores[name] = pd.Series(counts, index=index, dtype='int64')
+
+    return {
+        'relative_accuracy': relative_accuracy,
+        'gamma': gamma,
+        'zero': int((values == 0).sum()),
+        **stores,
+    }
+
+
+def merge_quantile_sketch(sketch_a: dict, sketch_b: dict):
+    '''Adds the bucket counts of two quantile sketches built with the same relative accuracy.'''
+
+    if sketch_a['relative_accuracy'] != sketch_b['relative_accuracy']:
+        raise ValueError('The quantile sketches must have the same relative accuracy.')
+
+    merged = dict(sketch_a, zero=sketch_a['zero'] + sketch_b['zero'])
+    for name in ('positive', 'negative'):
+        merged[name] = sketch_a[name].add(sketch_b[name], fill_value=0).astype('int64')
+    return merged
+
+
+def sketch_buckets(sketch: dict):
+    '''Returns the representative value and the count of every bucket of a quantile sketch, in ascending order.'''
+
+    gamma = sketch['gamma']
+    negative = sketch['negative'].sort_index(ascending=False)
+    positive = sketch['positive'].sort_index()
+
+    values = np.concatenate([
+        -2 * gamma ** negative.index.to_numpy(dtype=float) / (gamma + 1),
+        [0.0] if sketch['zero'] else [],
+        2 * gamma ** positive.index.to_numpy(dtype=float) / (gamma + 1),
+    ])
+    counts = np.concatenate([
+        negative.to_numpy(), 
+        [sketch['zero']] if sketch['zero'] else [], 
+        positive.to_numpy(),
+    ]).astype('int64')
+    return values, counts
+
+
+def quantile_from_sketch(sketch: dict, q):
+    '''Reads one or more quantiles (0 to 1) from a quantile sketch. Returns NaN for an empty sketch.'''
+
+    values, counts = sketch_buckets(sketch)
+    q = np.asarray(q, dtype=float)
+    if counts.sum() == 0:
+        return np.full(q.shape, np.nan)[()]
+
+    cumulative = np.cumsum(counts)
+    rank = np.floor(q * (cumulative[-1] - 1))
+    return values[np.searchsorted(cumulative, rank, side='right')][()]
+
+
+def frequency_sketch(series: pd.Series, max_counters: int = 1000):
+    '''Counts the frequency of the values of a column, keeping at most max_counters values (Misra-Gries).
+    Exact up to max_counters distinct values; beyond that each kept count may be undercounted by up to n / (max_counters + 1).
+    '''
+
+    return truncate_frequency_sketch({
+        'max_counters': max_counters,
+        'counters': series.value_counts(dropna=True),
+        'error': 0,
+    })
+
+
+def truncate_frequency_sketch(sketch: dict):
+    counters = sketch['counters']
+    if len(counters) <= sketch['max_counters']:
+        return sketch
+
+    threshold = int(counters.nlargest(sketch['max_counters'] + 1).iloc[-1])
+    counters = counters - threshold
+    return dict(sketch, counters=counters[counters > 0], error=sketch['error'] + threshold)
+
+
+def merge_frequency_sketch(sketch_a: dict, sketch_b: dict):
+    '''Combines two frequency sketches, keeping the max_counters most frequent values.'''
+
+    return truncate_frequency_sketch({
+        'max_counters': min(sketch_a['max_counters'], sketch_b['max_counters']),
+        'counters': sketch_a['counters'].add(sketch_b['counters'], fill_value=0).astype('int64'),
+        'error': sketch_a['error'] + sketch_b['error'],
+    })
+
+
+def hyperloglog_registers(series: pd.Series, precision: int = 14):
+    '''Builds the HyperLogLog registers (2 ** precision) of the non-null values of a column.
+    The distinct count estimated from them has a standard error of about 1.04 / sqrt(2 ** precision).
+    '''
+
+    hashes = pd.util.hash_array(series.dropna().to_numpy())
+    index = (hashes >> np.uint64(64 - precision)).astype('int64')
+    remaining = hashes & np.uint64((1 << (64 - precision)) - 1)
+    # Position of the first 1 bit of the remaining 64 - precision bits
+    bit_length = np.where(remaining > 0, np.frexp(remaining.astype(float))[1], 0)
+    rank = (64 - precision - bit_length + 1).astype('uint8')
+
+    registers = np.zeros(1 << precision, dtype='uint8')
+    np.maximum.at(registers, index, rank)
+    return registers
+
+
+def hyperloglog_count(registers: np.ndarray):
+    '''Estimates the number of distinct values from HyperLogLog registers (with the small range correction).'''
+
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m ** 2 / np.sum(2.0 ** -registers.astype(float))
+    zeros = int((registers == 0).sum())
+    if estimate <= 2.5 * m and zeros > 0:
+        estimate = m * math.log(m / zeros)
+    return int(round(estimate))
+
+
+def sketch_describe(df: pd.DataFrame, relative_accuracy: float = 0.01, max_counters: int = 1000, hll_precision: int = 14):
+    '''Computes mergeable summaries (moments and sketches) of the numeric columns of a DataFrame or chunk.
+    The quantile based metrics, mode and count_unique finalized from them are approximate (see finalize_sketch_describe).
+    '''
+
+    df_number = df.select_dtypes(include='number')
+    return {
+        'partial': partial_describe(df_number),
+        'quantiles': {c: quantile_sketch(df_number[c], relative_accuracy) for c in df_number.columns},
+        'frequencies': {c: frequency_sketch(df_number[c], max_counters) for c in df_number.columns},
+        'registers': {c: hyperloglog_registers(df_number[c], hll_precision) for c in df_number.columns},
+    }
+
+
+def merge_sketch_describe(sketch_a: dict, sketch_b: dict):
+    '''Combines the summaries of two chunks or partitions (see sketch_describe).'''
+
+    columns = sketch_a['partial']['columns']
+    return {
+        'partial': merge_partial_describe(sketch_a['partial'], sketch_b['partial']),
+        'quantiles': {c: merge_quantile_sketch(sketch_a['quantiles'][c], sketch_b['quantiles'][c]) for c in columns},
+        'frequencies': {c: merge_frequency_sketch(sketch_a['frequencies'][c], sketch_b['frequencies'][c]) for c in columns},
+        'registers': {c: np.maximum(sketch_a['registers'][c], sketch_b['registers'][c]) for c in columns},
+    }
+
+
+def finalize_sketch_describe(sketch: dict, extend_metrics=False):
+    '''Returns the approximate describe_full_df metrics estimated from merged summaries.
+    Moments, counts, min and max are exact; quantile based metrics carry the sketch error and the second-pass metrics are left out.
+    '''
+
+    exact = finalize_partial_describe(sketch['partial'], extend_metrics)
+    data = {}
+    for c in sketch['partial']['columns']:
+        values, counts = sketch_buckets(sketch['quantiles'][c])
+        minimum, maximum = exact.at['min', c], exact.at['max', c]
+        # The extremes are known exactly, so the estimates are kept inside them
+        q1, median, q3 = np.clip(quantile_from_sketch(sketch['quantiles'][c], [0.25, 0.5, 0.75]), minimum, maximum)
+        iqr = q3 - q1
+        lower_fence = q1 - 1.5 * iqr
+        upper_fence = q3 + 1.5 * iqr
+
+        frequencies = sketch['frequencies'][c]
+        counters = frequencies['counters']
+        if len(counters) > 0:
+            mode_freq = int(counters.max())
+            mode_values = sorted(counters.index[counters == mode_freq])
+        else:
+            mode_freq, mode_values = 0, []
+        count_unique = len(counters) if frequencies['error'] == 0 else hyperloglog_count(sketch['registers'][c])
+
+        def trimmed_mean(proportiontocut):
+            total = counts.sum()
+            cut = int(proportiontocut * total)
+            cumulative = np.cumsum(counts)
+            kept = np.clip(np.minimum(cumulative, total - cut) - np.maximum(cumulative - counts, cut), 0, None)
+            return np.sum(values * kept) / kept.sum() if kept.sum() > 0 else np.nan
+
+        data[c] = {
+            **exact[c].to_dict(),
+            'count_unique': count_unique,
+            'int_mean_5%': trimmed_mean(0.05),
+            'median': median,
+            'mode': mode_values[0] if mode_values else np.nan,
+            'mode_list': mode_values,
+            'mode_freq': mode_freq,
+            '25%': q1,
+            '50%': median,
+            '75%': q3,
+            'iqr': iqr,
+            'lower_outlier': lower_fence,
+            'count_lower_outlier': int(counts[values < lower_fence].sum()),
+            'upper_outlier': upper_fence,
+            'count_upper_outlier': int(counts[values > upper_fence].sum()),
+            'int_mean_25%': trimmed_mean(0.25),
+        }
+
+    index = [m for m in describe_functions(extend_metrics) if m in next(iter(data.values()), {})]
+    return pd.DataFrame({c: [data[c][m] for m in index] for c in data}, index=index, dtype=object)
+
+
+def binned_kde(values: np.ndarray, gridsize: int = 200, cut: float = 3, bw_adjust: float = 1, clip: tuple = None, 
+               bins: int = 4096, max_bins: int = 1 << 22):
+    '''Gaussian KDE with the bandwidth and grid of seaborn.kdeplot, computed by linear binning and FFT convolution.
+    The values are binned to a grid with spacing at most bandwidth / 32, so the density approximates scipy.stats.gaussian_kde.
+    '''
+
+    x = np.asarray(values, dtype='float64')
+    x = x[np.isfinite(x)]
+    n = len(x)
+    std = x.std(ddof=1) if n > 1 else 0.0
+    if std == 0:
+        return {'x': np.empty(0), 'density': np.empty(0), 'count': n, 'bandwidth': 0.0}
+
+    bandwidth = std * n ** (-1 / 5) * bw_adjust
+    clip_lo, clip_hi = (None, None) if clip is None else clip
+    x_min, x_max = x.min(), x.max()
+    grid = np.linspace(
+        max(x_min - bandwidth * cut, -np.inf if clip_lo is None else clip_lo),
+        min(x_max + bandwidth * cut, np.inf if clip_hi is None else clip_hi),
+        gridsize,
+    )
+    norm = n * bandwidth * np.sqrt(2 * np.pi)
+
+    # Linear binning on a fine grid with spacing of at most bandwidth / 32, even when outliers stretch the range:
+    # each value splits its weight between the two nearest points of the fine grid
+    lower, upper = min(grid[0], x_min), max(grid[-1], x_max)
+    bins = max(bins, int(np.ceil((upper - lower) / bandwidth * 32)) + 1)
+    delta = (upper - lower) / (bins - 1) if bins <= max_bins else bandwidth / 32
+    position = (x - lower) / delta
+    index = np.minimum(position.astype('int64'), bins - 2)
+    weight = position - index
+
+    if bins > max_bins:
+        # Fine grid too long for the FFT: only the occupied points are summed at each point of the evaluation grid
+        points, inverse = np.unique(np.concatenate([index, index + 1]), return_inverse=True)
+        counts = np.bincount(inverse, np.concatenate([1 - weight, weight]))
+        centers = lower + delta * points
+        density = np.zeros(gridsize)
+        for start in range(0, len(points), 1 << 16):
+            offsets = (grid[:, None] - centers[None, start:start + (1 << 16)]) / bandwidth
+            density += np.exp(-0.5 * offsets ** 2) @ counts[start:start + (1 << 16)]
+        return {'x': grid, 'density': density / norm, 'count': n, 'bandwidth': bandwidth}
+
+    counts = np.bincount(index, 1 - weight, bins) + np.bincount(index + 1, weight, bins)
+
+    # Kernel truncated at 5 bandwidths, convolved with the counts through a zero padded FFT
+    half = int(min(bins - 1, np.ceil(5 * bandwidth / delta)))
+    offsets = np.arange(-half, half + 1) * delta / bandwidth
+    kernel = np.exp(-0.5 * offsets ** 2)
+    size = 1 << int(np.ceil(np.log2(bins + 2 * half)))
+    convolved = np.fft.irfft(np.fft.rfft(counts, size) * np.fft.rfft(kernel, size), size)[half:half + bins]
+
+    density = np.interp(grid, lower + delta * np.arange(bins), np.maximum(convolved, 0) / norm)
+    return {'x': grid, 'density': density, 'count': n, 'bandwidth': bandwidth}
+
+
+def box_statistics(values: np.ndarray, whis: float = 1.5, max_fliers: int = 1000, label=None):
+    '''Computes the statistics of one boxplot box in the format of matplotlib Axes.bxp.
+    Beyond max_fliers outliers only max_fliers evenly spaced ones are kept, always including the most extreme.
+    '''
+
+    x = np.asarray(values, dtype='float64')
+    x = x[np.isfinite(x)]
+    if len(x) == 0:
+        nan = np.nan
+        return {'label': label, 'mean': nan, 'med': nan, 'q1': nan, 'q3': nan, 'whislo': nan, 'whishi': nan,
+                'fliers': np.empty(0), 'count': 0, 'count_fliers': 0}
+
+    q1, med, q3 = np.percentile(x, [25, 50, 75])
+    iqr = q3 - q1
+
+    inside_hi = x[x <= q3 + whis * iqr]
+    whishi = q3 if len(inside_hi) == 0 or inside_hi.max() < q3 else inside_hi.max()
+    inside_lo = x[x >= q1 - whis * iqr]
+    whislo = q1 if len(inside_lo) == 0 or inside_lo.min() > q1 else inside_lo.min()
+
+    fliers = x[(x < whislo) | (x > whishi)]
+    count_fliers = len(fliers)
+    if count_fliers > max_fliers:
+        fliers = np.sort(fliers)[np.unique(np.linspace(0, count_fliers - 1, max_fliers).round().astype('int64'))]
+
+    return {
+        'label': label,
+        'mean': x.mean(),
+        'med': med,
+        'q1': q1,
+        'q3': q3,
+        'whislo': whislo,
+        'whishi': whishi,
+        'fliers': fliers,
+        'count': len(x),
+        'count_fliers': count_fliers,
+    }
+
+
+def grouped_statistics(values: pd.Series, groups: pd.Series, function, **kwargs):
+    '''Applies a statistic function to the values of each group, in the order the groups appear.'''
+
+    codes, uniques = pd.factorize(groups)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1), side='left')
+    sorted_values = np.asarray(values)[order]
+
+    results = []
+    for i, group in enumerate(uniques):
+        result = function(sorted_values[bounds[i]:bounds[i + 1]], **kwargs)
+        result['label'] = group
+        results.append(result)
+    return results
+
+
+def grouped_kde(values: pd.Series, groups: pd.Series, common_norm=True, **kwargs):
+    '''Computes binned_kde for each group, as seaborn.kdeplot with hue.'''
+
+    results = grouped_statistics(values, groups, binned_kde, **kwargs)
+    if common_norm:
+        total = sum(r['count'] for r in results if len(r['x']))
+        for r in results:
+            r['density'] = r['density'] * (r['count'] / total) if total else r['density']
+    return results
+
+
+def grouped_box_statistics(values: pd.Series, groups: pd.Series, **kwargs):
+    '''Computes box_statistics for each group (as seaborn.boxplot with a categorical axis).'''
+
+    return grouped_statistics(values, groups, box_statistics, **kwargs)
+
+
+def cached_statistic(df: pd.DataFrame, columns: list, function, **kwargs):
+    '''Returns function(*columns, **kwargs), memoized while the data of the columns is the same.'''
+
+    cache = get_frame_cache(cache_column_statistics, df)
+    key = (function.__module__, function.__qualname__, tuple(columns), json.dumps(kwargs, sort_keys=True, default=str))
+    tokens = tuple(column_data_token(df[c]) for c in columns)
+
+    cached = cache.get(key)
+    if cached is None or not all(map(same_column_data, cached[0], tokens)):
+        cached = (tokens, function(*(df[c] for c in columns), **kwargs))
+        cache[key] = cached
+    return cached[1]
+
+
+def column_fingerprint(series: pd.Series):
+    '''Checksum (CRC-32) of the values of a column, so that writes into the same array are noticed.'''
+
+    values = series.array
+    if hasattr(values, '__arrow_array__'):
+        checksum = 0
+        for chunk in values.__arrow_array__().chunks:
+            for buffer in chunk.buffers():
+                if buffer is not None:
+                    checksum = zlib.crc32(buffer, checksum)
+        return checksum
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        checksum = zlib.crc32(pd.util.hash_array(series.cat.categories.to_numpy()))
+        return zlib.crc32(np.ascontiguousarray(series.cat.codes.to_numpy()).view(np.uint8), checksum)
+
+    if isinstance(series.dtype, np.dtype) and series.dtype != object:
+        return zlib.crc32(np.ascontiguousarray(series.to_numpy()).view(np.uint8))
+
+    return zlib.crc32(pd.util.hash_pandas_object(series, index=False).to_numpy())
+
+
+def column_data_token(series: pd.Series):
+    '''Identifies the data of a column by a weak reference to its backing array, dtype, length, position and checksum.'''
+
+    if isinstance(series.dtype, np.dtype):
+        values = series.to_numpy()
+        owner = values
+        while isinstance(owner.base, np.ndarray):
+            owner = owner.base
+        position = (values.__array_interface__['data'][0] - owner.__array_interface__['data'][0], values.strides)
+    else:
+        owner = series.array
+        position = None
+
+    return (str(series.dtype), len(series), position, column_fingerprint(series), weakref.ref(owner))
+
+
+def same_column_data(token_a: tuple, token_b: tuple):
+    '''Tells whether two column_data_token refer to the same, unchanged data of the same, still alive, array.'''
+
+    if token_a is None or token_b is None:
+        return False
+    owner = token_a[4]()
+    return owner is not None and owner is token_b[4]() and token_a[:4] == token_b[:4]
+
+
+def profile_column(series: pd.Series, max_domain: int = 100):
+    '''Computes cardinality, null count, binary flag and the sorted value domain of a column.'''
+
+    unique_values = pd.unique(series)
+    not_null = unique_values[~pd.isnull(unique_values)]
+    domain = not_null[:max_domain].tolist()
+    try:
+        domain = sorted(domain)
+    except TypeError:
+        pass
+
+    count_null = int(series.isnull().sum())
+    # Same rule of the set difference with {0, 1}: a null value makes the column not binary
+    is_binary = count_null == 0 and len(not_null) <= 2 and all(v in (0, 1) for v in domain)
+
+    return {
+        'cardinality': len(not_null),
+        'count_null': count_null,
+        'is_binary': is_binary,
+        'domain': domain,
+        'max_domain': max_domain,
+    }
+
+
+def get_frame_cache(registry: dict, df: pd.DataFrame):
+    '''Returns the dict memoized in registry for the DataFrame object, creating it if needed.'''
+
+    cached = registry.get(id(df))
+    if cached is None or cached[0]() is not df:
+        cached = (weakref.ref(df), {})
+        registry[id(df)] = cached
+        weakref.finalize(df, registry.pop, id(df), None)
+    return cached[1]
+
+
+def get_column_profiles_cache(df: pd.DataFrame):
+    '''Returns the dict of memoized column profiles of the DataFrame object, creating it if needed.'''
+
+    return get_frame_cache(cache_column_profiles, df)
+
+
+def set_column_profile(df: pd.DataFrame, column: str, profile: dict):
+    '''Stores an already known profile of a column, so profile_columns does not scan it again.'''
+
+    get_column_profiles_cache(df)[column] = dict(profile, token=column_data_token(df[column]))
+
+
+def profile_columns(df: pd.DataFrame, max_domain: int = 100, refresh=False):
+    '''Profiles every column of the DataFrame, reusing the memoized profiles of unchanged columns.'''
+
+    profiles = get_column_profiles_cache(df)
+
+    for c in df.columns:
+        token = column_data_token(df[c])
+        profile = profiles.get(c)
+        if (refresh or profile is None or not same_column_data(profile['token'], token) 
+                or (profile['max_domain'] < max_domain and profile['cardinality'] > profile['max_domain'])):
+            profiles[c] = dict(profile_column(df[c], max_domain), token=token)
+
+    for c in set(profiles).difference(df.columns):
+        del profiles[c]
+
+    df_profile = pd.DataFrame(
+        [profiles[c] for c in df.columns], 
+        index=df.columns, 
+        columns=['cardinality', 'count_null', 'is_binary', 'domain'],
+    )
+    df_profile['domain'] = [d[:max_domain] for d in df_profile['domain']]
+    df_profile['domain_complete'] = df_profile['cardinality'] <= max_domain
+
+    return df_profile
+
+
+def format_report_value(value):
+    '''Formats a statistic for the HTML report.'''
+
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return ', '.join(format_report_value(v) for v in list(value)[:10]) + (' ...' if len(value) > 10 else '')
+    if isinstance(value, (float, np.floating)):
+        return 'nan' if np.isnan(value) else f'{value:,.4f}'.rstrip('0').rstrip('.')
+    return str(value)
+
+
+def bars_html(labels: list, counts: np.ndarray):
+    '''Renders counts as horizontal CSS bars, one row per label.'''
+
+    import html
+
+    maximum = max(int(np.max(counts)), 1) if len(counts) else 1
+    rows = [
+        f'<tr><td class="label">{html.escape(str(label))}</td>'
+        f'<td class="bar"><div style="width:{100 * count / maximum:.1f}%"></div></td>'
+        f'<td class="num">{int(count):,}</td></tr>'
+        for label, count in zip(labels, counts)
+    ]
+    return f'<table class="bars">{"".join(rows)}</table>'
+
+
+def profile_report_html(df: pd.DataFrame, title: str = "Pandas Profiling Report", columns: list = None, 
+                        sample_rows: int = None, bins: int = 20, max_categories: int = 20, 
+                        describe: pd.DataFrame = None, random_state: int = 0):
+    '''Builds a lightweight HTML profile report of a DataFrame.'''
+
+    import html
+
+    df_report = df if columns is None else df[list(columns)]
+    total_rows = len(df_report)
+    if sample_rows is not None and sample_rows < total_rows:
+        df_report = df_report.sample(n=sample_rows, random_state=random_state)
+
+    profile = profile_columns(df_report)
+    cols_number = df_report.select_dtypes(include='number').columns
+    if describe is None and len(cols_number) > 0:
+        describe = describe_full_df(df_report[cols_number])
+
+    sections = []
+    for c in df_report.columns:
+        series = df_report[c]
+        info = profile.loc[c]
+        summary = {
+            'dtype': str(series.dtype),
+            'distinct': info['cardinality'],
+            'missing': f"{info['count_null']:,} ({info['count_null'] / max(len(series), 1):.1%})",
+            'binary': 'yes' if info['is_binary'] else 'no',
+        }
+
+        if c in cols_number and info['cardinality'] > max_categories:
+            values = series.to_numpy(dtype=float)
+            values = values[~np.isnan(values)]
+            counts, edges = np.histogram(values, bins=bins) if len(values) else (np.array([]), np.array([]))
+            labels = [f'{format_report_value(edges[i])} - {format_report_value(edges[i + 1])}' for i in range(len(counts))]
+            chart = bars_html(labels, counts)
+        elif c in cols_number:
+            frequencies = series.value_counts(dropna=False).sort_index()
+            chart = bars_html(list(frequencies.index), frequencies.to_numpy())
+        else:
+            frequencies = series.value_counts(dropna=False).head(max_categories)
+            chart = bars_html(list(frequencies.index), frequencies.to_numpy())
+
+        if describe is not None and c in describe.columns:
+            summary.update({m: format_report_value(v) for m, v in describe[c].items()})
+
+        table = ''.join(f'<tr><th>{html.escape(str(k))}</th><td>{html.escape(str(v))}</td></tr>' for k, v in summary.items())
+        sections.append(
+            f'<section><h2>{html.escape(str(c))}</h2>'
+            f'<div class="column"><table class="stats">{table}</table>{chart}</div></section>'
+        )
+
+    overview = {
+        'Rows': f'{total_rows:,}',
+        'Rows profiled': f'{len(df_report):,}' + (' (sample)' if len(df_report) < total_rows else ''),
+        'Columns': f'{df_report.shape[1]:,}',
+        'Numeric columns': f'{len(cols_number):,}',
+        'Missing cells': f"{int(profile['count_null'].sum()):,}",
+        'Memory (shallow)': f'{df_report.memory_usage(deep=False).sum() / (1 << 20):,.2f} MB',
+    }
+    overview_table = ''.join(f'<tr><th>{k}</th><td>{v}</td></tr>' for k, v in overview.items())
+
+    style = (
+        'body{font-family:sans-serif;margin:2em;color:#222}'
+        'section{border-top:1px solid #ddd;padding:.5em 0}'
+        '.column{display:flex;gap:2em;align-items:flex-start}'
+        'table{border-collapse:collapse;font-size:.85em}'
+        'th,td{padding:2px 8px;text-align:left}'
+        '.stats th{color:#555;font-weight:normal}'
+        '.bars .bar{width:300px}.bars .bar div{background:#4c78a8;height:12px}'
+        '.bars .num{text-align:right}'
+    )
+    return (
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+        f'<style>{style}</style></head><body><h1>{html.escape(title)}</h1>'
+        f'<table class="stats">{overview_table}</table>{"".join(sections)}</body></html>'
+    )
+
+
+def save_profile_report(df: pd.DataFrame, filename: str, title: str = "Pandas Profiling Report", 
+                        engine: Literal['lightweight', 'ydata'] = 'lightweight', **kwargs):
     '''Saves a profile report of a DataFrame to an HTML file.'''
     
-    from ydata_profiling import ProfileReport
-
     filename=f'{filename}.html'
-    ProfileReport(df, title=title, explorative=True, progress_bar=False).to_file(filename)
-    #profile = ProfileReport(df, title=title, explorative=True)
-    #profile.to_file(filename)
+
+    if engine == 'ydata':
+        from ydata_profiling import ProfileReport
+
+        ProfileReport(df, title=title, explorative=True, progress_bar=False).to_file(filename)
+    else:
+        with open(filename, 'w', encoding='utf-8') as file:
+            file.write(profile_report_html(df, title, **kwargs))
 
     print(f"Profile report saved to {filename}")
 
@@ -246,6 +1270,48 @@ def convert_binary_to_descriptive(df: pd.DataFrame, cols_binary: list, values_de
     return df
 
 
+def convert_descriptive_to_binary(df: pd.DataFrame, mappings: dict, dtype='int8'):
+    '''Encodes descriptive columns to numeric codes through a per-column lookup; returns the DataFrame and the 0/1 columns.'''
+
+    cols_binary = []
+    for c in mappings:
+        # Codes of the distinct values of the column; the last position of the lookup holds nulls (code -1)
+        codes, uniques = pd.factorize(df[c])
+        lookup = np.full(len(uniques) + 1, np.nan)
+        for j, value in enumerate(uniques):
+            if value in mappings[c]:
+                lookup[j] = mappings[c][value]
+        encoded = lookup[codes]
+        present = np.zeros(len(lookup), dtype=bool)
+        present[codes] = True
+
+        domain = lookup[present]
+        count_null = 0
+        if np.isnan(domain).any():
+            count_null = int(np.isnan(encoded).sum())
+        domain = np.unique(domain[~np.isnan(domain)])
+
+        if count_null == 0:
+            df[c] = encoded.astype(dtype)
+            domain = domain.astype(dtype)
+        else:
+            df[c] = encoded
+
+        is_binary = count_null == 0 and all(v in (0, 1) for v in domain)
+        if is_binary:
+            cols_binary.append(c)
+
+        set_column_profile(df, c, {
+            'cardinality': len(domain),
+            'count_null': count_null,
+            'is_binary': is_binary,
+            'domain': domain.tolist(),
+            'max_domain': max(len(domain), 100),
+        })
+
+    return df, cols_binary
+
+
 def apply_percent_category(list_values: list):
     count_list = len(list_values)
     sum_list = sum(list_values) 
@@ -264,43 +1330,350 @@ def convert_types(df, list_columns: list, list_types: list):
     return df
 
 
-def get_chi_square(df:pd.DataFrame, reference_category: str, target_category: list):
+def create_bins(edges: list, labels: list = None):
+    '''Creates a bin definition of left-closed intervals [edges[i], edges[i+1]) with one label per interval.'''
+
+    edges = np.asarray(edges).tolist()
+    if labels is None:
+        labels = [f'[{edges[i]}, {edges[i+1]})' for i in range(len(edges) - 1)]
+    if len(labels) != len(edges) - 1:
+        raise ValueError('The number of labels must be the number of edges minus one.')
+    return {'edges': edges, 'labels': list(labels)}
+
+
+def apply_bins(values, bins: dict):
+    '''Assigns each value to its interval of the bin definition, as pd.cut with right=False.'''
+
+    edges = np.asarray(bins['edges'])
+    values = np.asarray(values, dtype=float)
+    codes = np.searchsorted(edges, values, side='right') - 1
+    codes[(codes >= len(edges) - 1) | np.isnan(values)] = -1
+    return pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(bins['labels'], ordered=True))
+
+
+def save_bins(bins: dict, filename: str):
+    '''Saves a dict of bin definitions (see create_bins) to a JSON file.'''
+
+    with open(filename, 'w', encoding='utf-8') as file:
+        json.dump(bins, file, ensure_ascii=False, indent=2)
+
+
+def load_bins(filename: str):
+    '''Loads a dict of bin definitions saved with save_bins.'''
+
+    with open(filename, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def chi_square_statistics(df:pd.DataFrame, reference_category: str, target_category: list):
+    '''Calculates the chi-square statistic, p-value and degrees of freedom of each target column against the reference column.'''
+
+    reference_codes, reference_uniques = pd.factorize(df[reference_category])
+    n_reference = len(reference_uniques)
+
+    list_codes = []
+    offsets = [0]
+    for c in target_category:
+        codes, uniques = pd.factorize(df[c])
+        list_codes.append(codes)
+        offsets.append(offsets[-1] + len(uniques))
+
+    # One row per (target, category) and one column per reference category
+    observed = np.zeros((offsets[-1], n_reference))
+    for i, codes in enumerate(list_codes):
+        valid = (codes >= 0) & (reference_codes >= 0)
+        keys = codes[valid] * n_reference + reference_codes[valid]
+        observed[offsets[i]:offsets[i + 1]] = np.bincount(keys, minlength=(offsets[i + 1] - offsets[i]) * n_reference).reshape(-1, n_reference)
+
+    return chi_square_from_observed(observed, offsets)
+
+
+def chi_square_from_observed(observed: np.ndarray, offsets: list):
+    '''Calculates chi-square, p-value and degrees of freedom from stacked contingency tables.'''
+    from scipy import stats
+
+    observed = np.array(observed, dtype=float)
+    n_target = len(offsets) - 1
+    n_reference = observed.shape[1]
+    row_target = np.repeat(np.arange(n_target), np.diff(offsets))
+    row_total = observed.sum(axis=1)
+    column_total = np.zeros((n_target, n_reference))
+    np.add.at(column_total, row_target, observed)
+    total = column_total.sum(axis=1)
+
+    # Categories absent from the valid pairs do not take part in the table, as in pd.crosstab
+    rows = np.bincount(row_target, weights=row_total > 0, minlength=n_target)
+    columns = (column_total > 0).sum(axis=1)
+    dof = np.maximum(rows - 1, 0) * np.maximum(columns - 1, 0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected = row_total[:, None] * column_total[row_target] / total[row_target][:, None]
+
+        yates = (dof == 1)[row_target]
+        diff = expected[yates] - observed[yates]
+        observed[yates] += np.minimum(0.5, np.abs(diff)) * np.sign(diff)
+
+        terms = np.where(expected > 0, (observed - expected) ** 2 / expected, 0)
+        chi2 = np.bincount(row_target, weights=terms.sum(axis=1), minlength=n_target)
+        p = stats.chi2.sf(chi2, dof)
+
+    chi2[dof == 0] = 0.0
+    p[dof == 0] = 1.0
+    chi2[total == 0] = np.nan
+    p[total == 0] = np.nan
+
+    return chi2, p, dof
+
+
+def get_chi_square(df:pd.DataFrame, reference_category: str, target_category: list, n_jobs: int = None):
     '''Calculates the chi-square statistic for two categorical variables in a DataFrame.'''
     
-    data_stat = []
-    for c in target_category:
-        contingency_table = pd.crosstab(df[c], df[reference_category])
-        # chi2: Chi-square statistic
-        chi2, p, _, _ = stats.chi2_contingency(contingency_table)
-        # p: p-value of the test 
-        if p < 0.05:
-            significance = 1
-        else:
-            significance = 0
-        values = dict(variable = c, chi_square = chi2, p_value = p, significance = significance)
+    target_category = list(target_category)
 
-        data_stat.append(values)
+    if n_jobs is not None and n_jobs > 1 and len(target_category) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunks = [list(chunk) for chunk in np.array_split(np.array(target_category, dtype=object), n_jobs) if len(chunk)]
+        with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+            futures = [
+                executor.submit(chi_square_statistics, df[[reference_category, *chunk]], reference_category, chunk)
+                for chunk in chunks
+            ]
+            results = [future.result() for future in futures]
+        chi2 = np.concatenate([r[0] for r in results])
+        p = np.concatenate([r[1] for r in results])
+    else:
+        chi2, p, _ = chi_square_statistics(df, reference_category, target_category)
 
-        df_chi_square = pd.DataFrame(data_stat)
-        df_chi_square.chi_square = df_chi_square.chi_square.round(4)
-        df_chi_square.p_value = df_chi_square.p_value.round(6)
-        df_chi_square.sort_values(by='variable', ascending=True, inplace=True)
+    return chi_square_frame(target_category, chi2, p)
+
+
+def chi_square_frame(target_category: list, chi2: np.ndarray, p: np.ndarray):
+    # chi2: Chi-square statistic
+    # p: p-value of the test 
+    df_chi_square = pd.DataFrame(dict(
+        variable = target_category, 
+        chi_square = chi2.round(4), 
+        p_value = p.round(6), 
+        significance = (p < 0.05).astype(int),
+    ))
+    df_chi_square.sort_values(by='variable', ascending=True, inplace=True)
 
     return df_chi_square
 
 
+def contingency_counts(df: pd.DataFrame, reference_category: str, target_category: list):
+    '''Counts the contingency table of each target column against the reference column.'''
+
+    reference_codes, reference_uniques = pd.factorize(df[reference_category])
+    n_reference = len(reference_uniques)
+
+    counts = {}
+    for c in target_category:
+        codes, uniques = pd.factorize(df[c])
+        valid = (codes >= 0) & (reference_codes >= 0)
+        keys = codes[valid] * n_reference + reference_codes[valid]
+        counts[c] = pd.DataFrame(
+            np.bincount(keys, minlength=len(uniques) * n_reference).reshape(-1, n_reference),
+            index=pd.Index(uniques, name=c),
+            columns=pd.Index(reference_uniques, name=reference_category),
+        )
+    return counts
+
+
+def merge_contingency_counts(counts_a: dict, counts_b: dict):
+    '''Adds the contingency counts of two chunks, aligning the categories found in each one.'''
+
+    merged = dict(counts_a)
+    for c, table in counts_b.items():
+        merged[c] = table if c not in merged else merged[c].add(table, fill_value=0).astype('int64')
+    return merged
+
+
+def get_chi_square_from_counts(counts: dict):
+    '''Same result of get_chi_square, calculated from contingency counts (see contingency_counts).'''
+
+    target_category = list(counts)
+    reference_values = pd.Index([])
+    for table in counts.values():
+        reference_values = reference_values.union(table.columns, sort=False)
+
+    tables = [counts[c].reindex(columns=reference_values, fill_value=0).to_numpy() for c in target_category]
+    offsets = np.concatenate([[0], np.cumsum([len(t) for t in tables])])
+    observed = np.vstack(tables) if tables else np.zeros((0, len(reference_values)))
+
+    chi2, p, _ = chi_square_from_observed(observed, offsets)
+    return chi_square_frame(target_category, chi2, p)
+
+
+def partial_correlation(df: pd.DataFrame, columns: list = None):
+    '''Computes mergeable pairwise co-moments of the numeric columns of a DataFrame or chunk.'''
+
+    columns = list(df.columns) if columns is None else list(columns)
+    values = np.column_stack([np.asarray(df[c], dtype='float64') for c in columns]) if columns else np.empty((len(df), 0))
+    present = ~np.isnan(values)
+    mask = present.astype('float64')
+    count = mask.T @ mask
+
+    # Centering on the column means of the chunk avoids cancellation in the sums of products
+    with np.errstate(invalid='ignore', divide='ignore'):
+        center = np.where(present, values, 0).sum(axis=0) / present.sum(axis=0)
+        centered = np.where(present, values - np.nan_to_num(center), 0)
+        mean_centered = np.where(count > 0, (centered.T @ mask) / count, 0)
+
+    return {
+        'columns': columns,
+        'count': count,
+        'mean': np.where(count > 0, np.nan_to_num(center)[:, None] + mean_centered, 0),
+        'm2': (centered ** 2).T @ mask - count * mean_centered ** 2,
+        'comoment': centered.T @ centered - count * mean_centered * mean_centered.T,
+    }
+
+
+def merge_partial_correlation(partial_a: dict, partial_b: dict):
+    '''Combines the co-moments of two chunks (pairwise update formulas of Chan et al.).'''
+
+    if partial_a['columns'] != partial_b['columns']:
+        raise ValueError('The partial correlations must have the same columns.')
+
+    n_a, n_b = partial_a['count'], partial_b['count']
+    n = n_a + n_b
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weight = np.where(n > 0, n_a * n_b / n, 0)
+        share_b = np.where(n > 0, n_b / n, 0)
+
+    delta = partial_b['mean'] - partial_a['mean']
+    return {
+        'columns': partial_a['columns'],
+        'count': n,
+        'mean': partial_a['mean'] + delta * share_b,
+        'm2': partial_a['m2'] + partial_b['m2'] + delta ** 2 * weight,
+        'comoment': partial_a['comoment'] + partial_b['comoment'] + delta * delta.T * weight,
+    }
+
+
+def correlation_from_partial(partial: dict, min_periods: int = 1):
+    '''Pearson correlation matrix from co-moments (same result of DataFrame.corr()).'''
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlation = partial['comoment'] / np.sqrt(partial['m2'] * partial['m2'].T)
+    correlation[(partial['count'] < max(min_periods, 1)) | ~np.isfinite(correlation)] = np.nan
+
+    return pd.DataFrame(np.clip(correlation, -1, 1), index=partial['columns'], columns=partial['columns'])
+
+
+def point_biserial_from_partial(partial: dict, binary_column: str):
+    '''Point-biserial correlation and p-value of each column against a 0/1 column, from co-moments.'''
+    from scipy import stats
+
+    columns = partial['columns']
+    i = columns.index(binary_column)
+    others = [j for j in range(len(columns)) if j != i]
+
+    r = correlation_from_partial(partial).to_numpy()[i, others]
+    n = partial['count'][i, others]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = r * np.sqrt((n - 2) / (1 - r ** 2))
+    p = 2 * stats.t.sf(np.abs(t), n - 2)
+
+    return pd.DataFrame(
+        {'r_pb': r, 'p_value': p, 'count': n.astype('int64')}, 
+        index=pd.Index([columns[j] for j in others], name='variable'),
+    )
+
+
+def rank_bin_edges(values: np.ndarray, max_bins: int = 256):
+    '''Left edges of the rank bins of a column for partial_rank_correlation.
+    Columns with more than max_bins distinct values get quantile edges, so their ranks are approximate.
+    '''
+
+    x = np.asarray(values, dtype='float64')
+    x = x[np.isfinite(x)]
+    distinct = np.unique(x)
+    if len(distinct) <= max_bins:
+        return distinct
+    return np.unique(np.quantile(x, np.linspace(0, 1, max_bins, endpoint=False)))
+
+
+def partial_rank_correlation(df: pd.DataFrame, edges: dict):
+    '''Counts the joint rank bins of each pair of columns, mergeable across chunks.'''
+
+    columns = list(edges)
+    codes = {}
+    for c in columns:
+        values = np.asarray(df[c], dtype='float64')
+        code = np.clip(np.searchsorted(edges[c], values, side='right') - 1, 0, len(edges[c]) - 1)
+        codes[c] = np.where(np.isnan(values), -1, code)
+
+    counts = {}
+    for i, a in enumerate(columns):
+        for b in columns[i + 1:]:
+            valid = (codes[a] >= 0) & (codes[b] >= 0)
+            keys = codes[a][valid] * len(edges[b]) + codes[b][valid]
+            counts[(a, b)] = np.bincount(keys, minlength=len(edges[a]) * len(edges[b])).reshape(len(edges[a]), len(edges[b]))
+    return {'columns': columns, 'edges': edges, 'counts': counts}
+
+
+def merge_partial_rank_correlation(partial_a: dict, partial_b: dict):
+    '''Adds the joint rank bin counts of two chunks, which must use the same edges.'''
+
+    if partial_a['columns'] != partial_b['columns']:
+        raise ValueError('The partial rank correlations must have the same columns.')
+    return {
+        'columns': partial_a['columns'],
+        'edges': partial_a['edges'],
+        'counts': {pair: table + partial_b['counts'][pair] for pair, table in partial_a['counts'].items()},
+    }
+
+
+def spearman_from_partial(partial: dict):
+    '''Spearman correlation matrix from joint rank bin counts.
+    Exact when every bin holds a single distinct value; otherwise the values of a bin share its average rank.
+    '''
+
+    columns = partial['columns']
+    correlation = np.eye(len(columns))
+    for (a, b), table in partial['counts'].items():
+        count_a, count_b = table.sum(axis=1), table.sum(axis=0)
+        n = table.sum()
+        # Average rank of each bin minus the mean rank (n + 1) / 2
+        rank_a = np.cumsum(count_a) - (count_a - 1) / 2 - (n + 1) / 2
+        rank_b = np.cumsum(count_b) - (count_b - 1) / 2 - (n + 1) / 2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r = (rank_a @ table @ rank_b) / np.sqrt((count_a @ rank_a ** 2) * (count_b @ rank_b ** 2))
+        i, j = columns.index(a), columns.index(b)
+        correlation[i, j] = correlation[j, i] = r if np.isfinite(r) else np.nan
+
+    return pd.DataFrame(np.clip(correlation, -1, 1), index=columns, columns=columns)
+
+
+# Cumulative probabilities of the standardized normal table (Z from 0.00 to 3.99), built on first use
+standardized_normal_array = None
+
+
+def get_standardized_normal_array():
+    """Returns the standardized normal table as a 40x10 float array (row: Z up to the first decimal, column: second decimal)."""
+    global standardized_normal_array
+
+    if standardized_normal_array is None:
+        from scipy import stats
+
+        values_z = np.round(np.arange(400) / 100, 2)
+        # Same 8 decimal places of the printed table
+        standardized_normal_array = np.array([float(f"{p:0.8f}") for p in stats.norm.cdf(values_z)]).reshape(40, 10)
+        standardized_normal_array.setflags(write=False)
+
+    return standardized_normal_array
+
+
 def create_standardized_normal_table():
     """Creates a standardized normal distribution table with Z-scores and their cumulative probabilities."""
     standardized_normal_table = pd.DataFrame(
-        [], 
+        [[f"{p:0.8f}" for p in row] for row in get_standardized_normal_array()], 
+        dtype=object,
         index=["{0:0.2f}".format(i / 100) for i in range(0, 400, 10)],
         columns = ["{0:0.2f}".format(i / 100) for i in range(0, 10)])
     
-    for index in standardized_normal_table.index:
-        for column in standardized_normal_table.columns:
-            Z = np.round(float(index) + float(column), 2)
-            standardized_normal_table.loc[index, column] = f"{stats.norm.cdf(Z):0.8f}"
-    
     standardized_normal_table.rename_axis('Z', axis = 'columns', inplace = True)
 
     return standardized_normal_table
@@ -309,13 +1682,26 @@ def create_standardized_normal_table():
 def get_standardized_normal(value_z, df_norm=None, is_print=False):
     """Returns the cumulative probability for a given Z-score from a standardized normal distribution table."""
     if df_norm is None:
-        df_norm = create_standardized_normal_table()
-    
-    value_z = round(value_z, 2)
-    row = f"{np.math.floor(value_z * 10) /10:.2f}"  # integer part and first decimal place
-    column = f"{value_z * 10 % 1 /10:.2f}"  # second decimal place
-    if is_print:
-        print(f'Row {row} e column {column}')
-    
-    # quering normalized table
-    return float(df_norm.loc[row, column])
\ No newline at end of file
+        table = get_standardized_normal_array()
+    else:
+        table = df_norm.to_numpy(dtype=float)
+
+    is_scalar = np.ndim(value_z) == 0
+    values_z = np.round(np.atleast_1d(np.asarray(value_z, dtype=float)), 2)
+    index = np.rint(values_z * 100)
+    in_table = (index >= 0) & (index < table.size)
+
+    probabilities = np.empty(values_z.shape)
+    probabilities[in_table] = table.ravel()[index[in_table].astype(int)]
+    if not in_table.all():
+        from scipy import stats
+
+        probabilities[~in_table] = np.round(stats.norm.cdf(values_z[~in_table]), 8)
+
+    if is_scalar:
+        if is_print:
+            # integer part and first decimal place, second decimal place
+            print(f'Row {index[0] // 10 / 10:.2f} e column {index[0] % 10 / 100:.2f}')
+        return float(probabilities[0])
+
+    return probabilities
@@ -2,34 +2,139 @@ import pandas as pd
 import numpy as np
 import math
 import json
-import requests
-
-import seaborn as sns
-import matplotlib.pyplot as plt
-import warnings
+import re
+import codecs
+import sys
+import colorsys
+from contextlib import contextmanager
 
 import scripts.local_tools as lt
-
-
-def carregar_dados_telecomx_normalizado(caminho_arquivo_json: str, imprimir=True):
-    # Fazendo a requisição HTTP
-    response = requests.get(caminho_arquivo_json)
-    # Verificando se a requisição foi bem-sucedida
-    if response.status_code == 200:
-        dados_telecom = json.loads(response.text)
-        df = pd.json_normalize(dados_telecom, sep='_', meta=['customerID', 'Churn'])
-        return df    
-    else:
-        print("Erro ao acessar o arquivo:", response.status_code)
+import scripts.telecomx_fontes as tf
+
+
+# Tipos das colunas numéricas do JSON da TelecomX, atribuídos diretamente na montagem de cada bloco
+TIPOS_COLUNAS_TELECOMX = {
+    'customer_SeniorCitizen': 'int64',
+    'customer_tenure': 'int64',
+    'account_Charges_Monthly': 'float64',
+}
+
+
+@contextmanager
+def abrir_fonte_json(caminho_arquivo_json: str, tamanho_leitura: int = 1 << 20, diretorio_cache: str = tf.DIRETORIO_CACHE_DOWNLOADS):
+    # Fornece o conteúdo do arquivo JSON em pedaços de texto, seja de uma URL HTTP (com cache de downloads 
+    # revalidado por ETag/Last-Modified), de um endereço file:// ou de um caminho local, comprimido ou não
+    with tf.abrir_fonte(caminho_arquivo_json, diretorio_cache, tamanho_leitura=tamanho_leitura) as pedacos:
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        yield (decoder.decode(pedaco) for pedaco in pedacos)
+
+
+def iterar_registros_json(pedacos_texto):
+    # Percorre os objetos do array JSON de nível superior, decodificando um registro por vez
+    # e mantendo em memória apenas o trecho do texto ainda não processado
+    decoder = json.JSONDecoder()
+    separadores = re.compile(r'[\s,]*')
+    buffer = ''
+    inicio_array = False
+
+    for pedaco in pedacos_texto:
+        buffer += pedaco
+        posicao = 0
+        while True:
+            posicao = separadores.match(buffer, posicao).end()
+            if posicao == len(buffer):
+                break
+            if not inicio_array:
+                if buffer[posicao] != '[':
+                    raise ValueError('O conteúdo JSON não é um array de registros')
+                inicio_array = True
+                posicao += 1
+                continue
+            if buffer[posicao] == ']':
+                return
+            try:
+                registro, posicao = decoder.raw_decode(buffer, posicao)
+            except json.JSONDecodeError:
+                # Registro incompleto, aguarda o próximo pedaço de texto
+                break
+            yield registro
+        buffer = buffer[posicao:]
+
+    if buffer.strip():
+        # Força o erro de decodificação do trecho que restou
+        decoder.raw_decode(buffer, separadores.match(buffer).end())
+
+
+def achatar_registro(registro: dict, prefixo: str = '', sep: str = '_', destino: dict = None):
+    # Mesma nomenclatura do pd.json_normalize: chaves aninhadas unidas pelo separador
+    destino = {} if destino is None else destino
+    for chave, valor in registro.items():
+        if isinstance(valor, dict):
+            achatar_registro(valor, f'{prefixo}{chave}{sep}', sep, destino)
+        else:
+            destino[f'{prefixo}{chave}'] = valor
+    return destino
+
+
+def montar_bloco_telecomx(registros: list, colunas: dict, inicio: int):
+    dados = {}
+    for c in colunas:
+        valores = [r.get(c) for r in registros]
+        tipo = TIPOS_COLUNAS_TELECOMX.get(c)
+        if tipo is not None and None not in valores:
+            dados[c] = np.array(valores, dtype=tipo)
+        else:
+            dados[c] = valores
+
+    return pd.DataFrame(dados, index=pd.RangeIndex(inicio, inicio + len(registros)))
+
+
+def carregar_dados_telecomx_em_blocos(caminho_arquivo_json: str, tamanho_bloco: int = 100_000, tamanho_leitura: int = 1 << 20):
+    # Carrega o JSON da TelecomX de forma incremental, gerando DataFrames de até tamanho_bloco registros.
+    # O pico de memória depende do tamanho do bloco e não do tamanho do arquivo
+    colunas = {}
+    registros = []
+    inicio = 0
+
+    with abrir_fonte_json(caminho_arquivo_json, tamanho_leitura) as pedacos_texto:
+        for registro in iterar_registros_json(pedacos_texto):
+            registro = achatar_registro(registro)
+            colunas.update(dict.fromkeys(registro))
+            registros.append(registro)
+
+            if len(registros) == tamanho_bloco:
+                yield montar_bloco_telecomx(registros, colunas, inicio)
+                inicio += len(registros)
+                registros = []
+
+    if registros:
+        yield montar_bloco_telecomx(registros, colunas, inicio)
+
+
+def carregar_dados_telecomx_normalizado(caminho_arquivo_json: str, imprimir=True, tamanho_bloco: int = 100_000):
+    try:
+        blocos = list(carregar_dados_telecomx_em_blocos(caminho_arquivo_json, tamanho_bloco))
+    except Exception as erro:
+        # requests só é importado para fontes HTTP; sem ele carregado, o erro não é de HTTP
+        requests = sys.modules.get('requests')
+        if requests is None or not isinstance(erro, requests.HTTPError):
+            raise
+        print("Erro ao acessar o arquivo:", erro.response.status_code)
         return None
 
+    if not blocos:
+        return pd.DataFrame()
+    return pd.concat(blocos)
+
 
 def extrair_colunas_categoricas(df: pd.DataFrame, quantidade_minima=5, imprimir=True):
-    
+    # Utiliza o perfil das colunas (memoizado no DataFrame) em vez de percorrer cada coluna novamente
+    perfil = lt.profile_columns(df, max_domain=max(quantidade_minima, 100))
+
     colunas_categoricas = []
     for c in df.columns:
-        if df[c].nunique() <= quantidade_minima:
-            print(f'\nColuna: {c}. Quantidade de domínios: {df[c].nunique()}. Valores do domínios: {np.unique(df[c])}') if imprimir else None
+        if perfil.cardinality[c] <= quantidade_minima:
+            print(f'\nColuna: {c}. Quantidade de domínios: {perfil.cardinality[c]}. Valores do domínios: {np.array(perfil.domain[c])}') if imprimir else None
             colunas_categoricas.append(c)
 
     return colunas_categoricas
@@ -51,74 +156,122 @@ def perc_registros_churn_invalidados(df: pd.DataFrame, lista_valores_invalidos =
     return num_invalidos / num_total 
 
 
-def tratar_valores_invalidados(df: pd.DataFrame, limite_delecao=0.05, imprimir=True):
-    lista_valores_invalidos = ['', ' ', None, 'Nan']
-    num_invalidos = len(df[df['Churn'].isin(lista_valores_invalidos)])
+def limpar_valores_invalidados(df: pd.DataFrame, limite_delecao=0.05, lista_valores_invalidos = ['', ' ', None, 'Nan'], deletar: bool = None,
+                               diagnostico_completo: bool = False):
+    # Etapa de limpeza sem impressão: as máscaras de valores inválidos são calculadas uma única vez,
+    # account_Charges_Total é convertida diretamente para float e as correções de tenure e do custo total
+    # são aplicadas sobre os arrays. Retorna o DataFrame tratado e um dicionário com o diagnóstico.
+    # Por padrão a deleção dos registros com Churn inválido depende do limite_delecao; deletar=True/False
+    # fixa a decisão (ex.: processamento em blocos, em que a proporção é conhecida para a base inteira).
+    # As contagens usadas apenas na impressão (inválidos depois do tratamento e consistência dos serviços)
+    # só são calculadas com diagnostico_completo=True
     num_total = len(df)
+    churn_invalido = df['Churn'].isin(lista_valores_invalidos).to_numpy()
+    total_invalido = df['account_Charges_Total'].isin(lista_valores_invalidos).to_numpy()
+    num_churn_invalidos = int(churn_invalido.sum())
+
+    diagnostico = {
+        'registros_total': num_total,
+        'churn_invalidos': num_churn_invalidos,
+        'registros_deletados': 0,
+    }
+
+    if deletar is None:
+        deletar = num_total > 0 and (num_churn_invalidos / num_total < limite_delecao)
+
+    if deletar and num_churn_invalidos > 0:
+        manter = ~churn_invalido
+        df = df.take(np.flatnonzero(manter))
+        total_invalido = total_invalido[manter]
+        churn_invalido = np.zeros(len(df), dtype=bool)
+        diagnostico['registros_deletados'] = num_churn_invalidos
+    elif num_churn_invalidos > 0:
+        df['Churn'] = df['Churn'].mask(churn_invalido, 'No')
+
+    diagnostico['charges_total_invalidos_antes'] = int(total_invalido.sum())
+
+    # Os inválidos conhecidos viram 0; outros valores não numéricos viram NaN na conversão
+    total = pd.to_numeric(df['account_Charges_Total'].mask(total_invalido), errors='coerce').to_numpy(dtype=float, copy=True)
+    total[total_invalido] = 0.0
+
+    tenure = df['customer_tenure'].to_numpy()
+    mensal = df['account_Charges_Monthly'].to_numpy()
+
+    tenure_corrigir = (tenure == 0) & (mensal != 0)
+    if tenure_corrigir.any():
+        tenure = tenure.copy()
+        tenure[tenure_corrigir] = 1
+        df['customer_tenure'] = tenure
+
+    total_corrigir = (total == 0) & (tenure == 1)
+    total[total_corrigir] = mensal[total_corrigir]
+    df['account_Charges_Total'] = total
+
+    diagnostico['tenure_corrigidos'] = int(tenure_corrigir.sum())
+    diagnostico['charges_total_corrigidos'] = int(total_corrigir.sum())
+    if not diagnostico_completo:
+        return df, diagnostico
+
+    diagnostico['churn_invalidos_depois'] = int(df['Churn'].isin(lista_valores_invalidos).sum())
+    diagnostico['charges_total_invalidos_depois'] = int(df['account_Charges_Total'].isin(lista_valores_invalidos).sum())
+
+    # Verificar se existe algum cliente na base que não assina nenhum serviço
+    diagnostico['clientes_sem_servicos'] = int(
+        ((df['phone_PhoneService'] == 'No') & (df['internet_InternetService'] == 'No')).sum()
+    )
+    diagnostico['multiplas_linhas_sem_telefone'] = int(
+        ((df['phone_MultipleLines'] == 'No phone service') & (df['phone_PhoneService'] == 'Yes')).sum()
+    )
 
-    if (num_invalidos / num_total < limite_delecao) & (num_invalidos > 0):
-        df = df[~df['Churn'].isin(lista_valores_invalidos)]
+    return df, diagnostico
+
+
+def imprimir_diagnostico_invalidados(diagnostico: dict, limite_delecao=0.05):
+    num_invalidos = diagnostico['churn_invalidos']
+    num_total = diagnostico['registros_total']
+
+    if diagnostico['registros_deletados'] > 0:
         texto_invalidos = f"""
         Foram encontrados {num_invalidos} registros inválidos na variável Churn 
         que representa {(num_invalidos/num_total*100):.2f}% do total de {num_total} registros e está 
         no limite da deleção que é de {(limite_delecao*100):.2f}% e por isso foram deletados.
         """
-        print(texto_invalidos) if imprimir else None
+        print(texto_invalidos)
 
-    if imprimir:
-        print('\nRegistros inválidos antes do tratamento:')
-        print(f'\nValores inválidos na variável Churn: {num_invalidos}')
-        num_invalidos = len(df[df['account_Charges_Total'].isin(lista_valores_invalidos)])
-        print(f'\nValores inválidos na variável account_Charges_Total: {num_invalidos}')
-
-    df.Churn = df.Churn.replace(lista_valores_invalidos, 'No')
-    df.account_Charges_Total = df.account_Charges_Total.replace(lista_valores_invalidos, '0')
-    df.account_Charges_Total = pd.to_numeric(df.account_Charges_Total, errors='coerce')
-    
-    df['customer_tenure'] = np.where(
-        (df['customer_tenure'] == 0) & (df['account_Charges_Monthly'] != 0), 
-        1, 
-        df['customer_tenure']
-    )
+    print('\nRegistros inválidos antes do tratamento:')
+    print(f'\nValores inválidos na variável Churn: {num_invalidos}')
+    print(f'\nValores inválidos na variável account_Charges_Total: {diagnostico["charges_total_invalidos_antes"]}')
 
-    df['account_Charges_Total'] = np.where(
-        (df['account_Charges_Total'] == 0) & (df['customer_tenure'] == 1), 
-        df['account_Charges_Monthly'], 
-        df['account_Charges_Total']
-    )
+    print('\nRegistros inválidos depois do tratamento:')
+    print(f'\nValores inválidos na variável Churn: {diagnostico["churn_invalidos_depois"]}')
+    print(f'\nValores inválidos na variável account_Charges_Total: {diagnostico["charges_total_invalidos_depois"]}')
 
+    print(f'\nClientes sem serviços de Telefone e Internet contratados: {diagnostico["clientes_sem_servicos"]}')
+    print(f'\nClientes com múltiplas linhas de Telefone sem serviço de Telefone contratado: {diagnostico["multiplas_linhas_sem_telefone"]}')
 
-    if imprimir:
-        print('\nRegistros inválidos depois do tratamento:')
-        num_invalidos = len(df[df['Churn'].isin(lista_valores_invalidos)])
-        print(f'\nValores inválidos na variável Churn: {num_invalidos}')
-        num_invalidos = len(df[df['account_Charges_Total'].isin(lista_valores_invalidos)])
-        print(f'\nValores inválidos na variável account_Charges_Total: {num_invalidos}')
-    
-        # Verificar se existe algum cliente na base que não assina nenhum serviço
-        num_inconsistentes = len(df[(df['phone_PhoneService'] == 'No') & (df['internet_InternetService'] == 'No')])
-        print(f'\nClientes sem serviços de Telefone e Internet contratados: {num_inconsistentes}')
-
-        num_inconsistentes = len(df[(df['phone_MultipleLines'] == 'No phone service') & (df['phone_PhoneService'] == 'Yes')])
-        print(f'\nClientes com múltiplas linhas de Telefone sem serviço de Telefone contratado: {num_inconsistentes}')
 
+def tratar_valores_invalidados(df: pd.DataFrame, limite_delecao=0.05, imprimir=True):
+    df, diagnostico = limpar_valores_invalidados(df, limite_delecao, diagnostico_completo=imprimir)
+    if imprimir:
+        imprimir_diagnostico_invalidados(diagnostico, limite_delecao)
     return df
 
 
 def identificar_colunas_valores_binarios(df: pd.DataFrame):
-    colunas = []
-    for c in df.columns:
-        if len(set(df[c].unique()).difference(set([0, 1]))) == 0:
-            colunas.append(c)                                         
-    return colunas
+    perfil = lt.profile_columns(df)
+    return list(perfil.index[perfil.is_binary])
 
 
 def tratar_colunas_valores_binarios(df: pd.DataFrame, imprimir=True):
-    # Como existe uma coluna de phone_PhoneService, não é necessário detalhar essa informação na coluna phone_MultipleLines. 
-    # Sendo possível transformar a mesma em dado binário
-    df.phone_MultipleLines = df.phone_MultipleLines.replace('No phone service', 'No')
-    
-    colunas_internet_additional_service = [
+    valores_binarios = {'No': 0, 'Yes': 1}
+
+    colunas_valores_binarios = [
+        'Churn',
+        'customer_Partner', 
+        'customer_Dependents', 
+        'phone_PhoneService', 
+        'phone_MultipleLines',
+        'account_PaperlessBilling', 
         'internet_OnlineSecurity', 
         'internet_OnlineBackup', 
         'internet_DeviceProtection', 
@@ -126,19 +279,13 @@ def tratar_colunas_valores_binarios(df: pd.DataFrame, imprimir=True):
         'internet_StreamingTV', 
         'internet_StreamingMovies', 
     ]
+    mapas = {c: valores_binarios for c in colunas_valores_binarios}
 
-    # Como existe uma coluna de internet_InternetService, não é necessário detalhar essa informação nas colunas de cada serviço de internet.
+    # Como existe uma coluna de phone_PhoneService, não é necessário detalhar essa informação na coluna phone_MultipleLines. 
     # Sendo possível transformar a mesma em dado binário
-    for c in colunas_internet_additional_service:
-        df[c] = df[c].replace('No internet service', 'No')
+    mapas['phone_MultipleLines'] = dict(valores_binarios, **{'No phone service': 0})
 
-    colunas_valores_binarios = [
-        'Churn',
-        'customer_Partner', 
-        'customer_Dependents', 
-        'phone_PhoneService', 
-        'phone_MultipleLines',
-        'account_PaperlessBilling', 
+    colunas_internet_additional_service = [
         'internet_OnlineSecurity', 
         'internet_OnlineBackup', 
         'internet_DeviceProtection', 
@@ -147,111 +294,227 @@ def tratar_colunas_valores_binarios(df: pd.DataFrame, imprimir=True):
         'internet_StreamingMovies', 
     ]
 
-    # Conversão numerica dos valores binários
-    for c in colunas_valores_binarios:
-        #print(f'Coluna: {c}. Quantidade de domínios: {df[c].nunique()}. Valores do domínios: {np.unique(df[c])}\n') if imprimir else None
-        df[c] = df[c].map({'No': 0, 'Yes': 1})
+    # Como existe uma coluna de internet_InternetService, não é necessário detalhar essa informação nas colunas de cada serviço de internet.
+    # Sendo possível transformar a mesma em dado binário
+    for c in colunas_internet_additional_service:
+        mapas[c] = dict(valores_binarios, **{'No internet service': 0})
 
     # Criação de uma coluna com descrição de serviço de internet para transformar internet_InternetService em coluna com valor binário
     df['internet_Service_Description'] = df['internet_InternetService']
-    df['internet_InternetService'] = df['internet_InternetService'].map({'No': 0, 'DSL': 1, 'Fiber optic': 1})
+    mapas['internet_InternetService'] = {'No': 0, 'DSL': 1, 'Fiber optic': 1}
+
+    # Conversão numérica (int8) de todas as colunas em um único lote por tabela de consulta.
+    # O perfil das colunas convertidas já fica registrado, sem nova varredura na identificação abaixo
+    df, _ = lt.convert_descriptive_to_binary(df, mapas)
 
     # Identificação de colunas com valores binários
     colunas_valores_binarios = identificar_colunas_valores_binarios(df)
 
     if imprimir:
+        perfil = lt.profile_columns(df)
         for c in colunas_valores_binarios:
-            print(f'Coluna: {c}. Quantidade de domínios: {df[c].nunique()}. Valores do domínios: {np.unique(df[c])}\n')
+            print(f'Coluna: {c}. Quantidade de domínios: {perfil.cardinality[c]}. Valores do domínios: {np.array(perfil.domain[c])}\n')
 
     return df, colunas_valores_binarios
 
 
-def criar_colunas_derivadas(df):
-    
-    #  Criação de coluna por faixa de tempo de contrato do cliente 
-    limite_bins = df.customer_tenure.max() + 13
-    bins = list(range(1, limite_bins, 12))
-    df['customer_tenure_bins'] = pd.cut(
-        df['customer_tenure'],
-        bins=bins,
-        right=False,  # intervalo fechado à esquerda, aberto à direita
-        labels=[f'{str(bins[i]).zfill(3)}-{str(bins[i+1]-1).zfill(3)}' for i in range(len(bins)-1)]
-    )
-
-    #  Criação de coluna por faixa de custo mensal do cliente 
-    limite_bins = df.account_Charges_Monthly.astype(int).max() + 21
-    bins = list(range(1, limite_bins, 20))
-    df['account_Charges_Monthly_bins'] = pd.cut(
-        df['account_Charges_Monthly'],
-        bins=bins,
-        right=False,  # intervalo fechado à esquerda, aberto à direita
-        labels=[f'R\${str(bins[i]).zfill(3)}-R\${str(bins[i+1]-1).zfill(3)}' for i in range(len(bins)-1)]
-    )
-
-    # #  Criação de coluna por faixa de custo mensal do total 
-    # # Usando Regra de Sturges
-    n = len(df)
-    k = int(1 + (10 / 3) * math.log10(n))
-
-    min_val = int(df['account_Charges_Total'].min())
-    max_val = int(df['account_Charges_Total'].max())
-
-    # Cria os bins manualmente com base no intervalo total e k
-    bin_width = (max_val - min_val) // k + 1
-    bins = list(range(min_val, max_val + bin_width, bin_width))
-
-    # Gerar os labels
-    labels = [f'R\${str(bins[i]).zfill(5)}-R\${str(bins[i+1]-1).zfill(5)}' for i in range(len(bins)-1)]
+def estatisticas_faixas_telecomx(df: pd.DataFrame):
+    # Estatísticas da base usadas no ajuste das faixas. Podem ser combinadas entre blocos (combinar_estatisticas_faixas)
+    return {
+        'registros': len(df),
+        'tenure_max': int(df['customer_tenure'].max()),
+        'mensal_max': int(df['account_Charges_Monthly'].astype(int).max()),
+        'total_min': float(df['account_Charges_Total'].min()),
+        'total_max': float(df['account_Charges_Total'].max()),
+    }
+
+
+def combinar_estatisticas_faixas(estatisticas: dict, estatisticas_novas: dict):
+    if estatisticas is None:
+        return estatisticas_novas
+    return {
+        'registros': estatisticas['registros'] + estatisticas_novas['registros'],
+        'tenure_max': max(estatisticas['tenure_max'], estatisticas_novas['tenure_max']),
+        'mensal_max': max(estatisticas['mensal_max'], estatisticas_novas['mensal_max']),
+        'total_min': min(estatisticas['total_min'], estatisticas_novas['total_min']),
+        'total_max': max(estatisticas['total_max'], estatisticas_novas['total_max']),
+    }
+
+
+# Colunas derivadas de faixas (lt.create_bins) ajustadas por ajustar_faixas_telecomx
+COLUNAS_FAIXAS_TELECOMX = ['customer_tenure_bins', 'account_Charges_Monthly_bins', 'account_Charges_Total_bins']
+
+
+def ajustar_faixas_telecomx(df: pd.DataFrame, colunas: list = None):
+    # Calcula uma única vez os limites e rótulos das faixas de tenure, custo mensal e custo total.
+    # O resultado pode ser gravado com lt.save_bins e reaplicado em novos lotes com criar_colunas_derivadas,
+    # mantendo as mesmas categorias entre lotes. Com colunas informadas, ajusta apenas as faixas pedidas
+    return ajustar_faixas_estatisticas(estatisticas_faixas_telecomx(df), colunas)
+
+
+def ajustar_faixas_estatisticas(estatisticas: dict, colunas: list = None):
+    colunas = COLUNAS_FAIXAS_TELECOMX if colunas is None else colunas
+    faixas = {}
+
+    if 'customer_tenure_bins' in colunas:
+        #  Faixa de tempo de contrato do cliente 
+        limite_bins = estatisticas['tenure_max'] + 13
+        bins = list(range(1, limite_bins, 12))
+        faixas['customer_tenure_bins'] = dict(
+            lt.create_bins(bins, [f'{str(bins[i]).zfill(3)}-{str(bins[i+1]-1).zfill(3)}' for i in range(len(bins)-1)]),
+            coluna='customer_tenure',
+        )
+
+    if 'account_Charges_Monthly_bins' in colunas:
+        #  Faixa de custo mensal do cliente 
+        limite_bins = estatisticas['mensal_max'] + 21
+        bins = list(range(1, limite_bins, 20))
+        faixas['account_Charges_Monthly_bins'] = dict(
+            lt.create_bins(bins, [f'R\${str(bins[i]).zfill(3)}-R\${str(bins[i+1]-1).zfill(3)}' for i in range(len(bins)-1)]),
+            coluna='account_Charges_Monthly',
+        )
+
+    if 'account_Charges_Total_bins' in colunas:
+        # #  Faixa de custo total 
+        # # Usando Regra de Sturges
+        n = estatisticas['registros']
+        k = int(1 + (10 / 3) * math.log10(n))
+
+        min_val = int(estatisticas['total_min'])
+        max_val = int(estatisticas['total_max'])
+
+        # Cria os bins manualmente com base no intervalo total e k
+        bin_width = (max_val - min_val) // k + 1
+        bins = list(range(min_val, max_val + bin_width, bin_width))
+
+        faixas['account_Charges_Total_bins'] = dict(
+            lt.create_bins(bins, [f'R\${str(bins[i]).zfill(5)}-R\${str(bins[i+1]-1).zfill(5)}' for i in range(len(bins)-1)]),
+            coluna='account_Charges_Total',
+        )
+
+    return faixas
+
+
+COLUNAS_SERVICOS_ADICIONAIS_INTERNET = [
+    'internet_OnlineSecurity', 
+    'internet_OnlineBackup', 
+    'internet_DeviceProtection', 
+    'internet_TechSupport', 
+    'internet_StreamingTV', 
+    'internet_StreamingMovies', 
+]
+
+
+def calcular_faixa(df: pd.DataFrame, coluna_bins: str, faixas: dict = None):
+    # Usa a faixa gravada quando informada; caso contrário ajusta apenas a faixa pedida no próprio DataFrame
+    if faixas is None or coluna_bins not in faixas:
+        faixas = ajustar_faixas_telecomx(df, [coluna_bins])
+    faixa = faixas[coluna_bins]
+    return lt.apply_bins(df[faixa['coluna']], faixa)
+
+
+# Registro das colunas derivadas: colunas de que cada uma depende e a função que a calcula.
+# As dependências podem ser outras colunas derivadas, que são calculadas antes automaticamente
+COLUNAS_DERIVADAS_TELECOMX = {
+    'customer_tenure_bins': {
+        'dependencias': ['customer_tenure'],
+        'calcular': lambda df, faixas: calcular_faixa(df, 'customer_tenure_bins', faixas),
+    },
+    'account_Charges_Monthly_bins': {
+        'dependencias': ['account_Charges_Monthly'],
+        'calcular': lambda df, faixas: calcular_faixa(df, 'account_Charges_Monthly_bins', faixas),
+    },
+    'account_Charges_Total_bins': {
+        'dependencias': ['account_Charges_Total'],
+        'calcular': lambda df, faixas: calcular_faixa(df, 'account_Charges_Total_bins', faixas),
+    },
+    # Informações de contratos mensais
+    'account_Contract_Monthly': {
+        'dependencias': ['account_Contract'],
+        'calcular': lambda df, faixas: np.where(df['account_Contract'].str.lower() == 'month-to-month', 1, 0),
+    },
+    # Total de serviços adicionais de internet
+    'additional_InternetService': {
+        'dependencias': COLUNAS_SERVICOS_ADICIONAIS_INTERNET,
+        'calcular': lambda df, faixas: np.sum(df[COLUNAS_SERVICOS_ADICIONAIS_INTERNET], axis=1),
+    },
+    # Informações sobre assinaturas combinadas entre Phone e Internet Service
+    'only_PhoneService': {
+        'dependencias': ['phone_PhoneService', 'internet_InternetService'],
+        'calcular': lambda df, faixas: np.where((df['phone_PhoneService'] == 1) & (df['internet_InternetService'] == 0), 1, 0),
+    },
+    'only_InternetService': {
+        'dependencias': ['phone_PhoneService', 'internet_InternetService'],
+        'calcular': lambda df, faixas: np.where((df['phone_PhoneService'] == 0) & (df['internet_InternetService'] == 1), 1, 0),
+    },
+    'both_Phone_InternetService': {
+        'dependencias': ['phone_PhoneService', 'internet_InternetService'],
+        'calcular': lambda df, faixas: np.where((df['phone_PhoneService'] == 1) & (df['internet_InternetService'] == 1), 1, 0),
+    },
+    # Valores diários
+    'account_Charges_Daily': {
+        'dependencias': ['account_Charges_Monthly'],
+        'calcular': lambda df, faixas: df['account_Charges_Monthly'] / 30,
+    },
+}
+
+
+def resolver_colunas_derivadas(colunas: list, registro: dict = None):
+    # Retorna as colunas derivadas pedidas e as derivadas de que dependem, em ordem de cálculo
+    registro = COLUNAS_DERIVADAS_TELECOMX if registro is None else registro
+    ordem = []
+    visitando = set()
+
+    def visitar(coluna):
+        if coluna in ordem or coluna not in registro:
+            return
+        if coluna in visitando:
+            raise ValueError(f'Dependência circular na coluna derivada {coluna}')
+        visitando.add(coluna)
+        for dependencia in registro[coluna]['dependencias']:
+            visitar(dependencia)
+        visitando.discard(coluna)
+        ordem.append(coluna)
+
+    for c in colunas:
+        visitar(c)
+    return ordem
+
+
+def garantir_colunas_derivadas(df: pd.DataFrame, colunas: list, faixas: dict = None, registro: dict = None, recalcular=False):
+    # Calcula sob demanda apenas as colunas derivadas pedidas (e suas dependências) que ainda não existem no DataFrame.
+    # As colunas calculadas ficam no DataFrame e são reaproveitadas nos próximos acessos
+    registro = COLUNAS_DERIVADAS_TELECOMX if registro is None else registro
+    desconhecidas = [c for c in colunas if c not in registro and c not in df.columns]
+    if desconhecidas:
+        raise KeyError(f'Colunas não encontradas no DataFrame nem no registro de colunas derivadas: {desconhecidas}')
+
+    for coluna in resolver_colunas_derivadas(colunas, registro):
+        if recalcular or coluna not in df.columns:
+            df[coluna] = registro[coluna]['calcular'](df, faixas)
 
-    # Aplicar no cut
-    df['account_Charges_Total_bins'] = pd.cut(
-        df['account_Charges_Total'],
-        bins=bins,
-        right=False,
-        labels=labels
-    )
+    return df
 
-    # Informações de contratos mensais
-    df['account_Contract_Monthly'] = np.where(
-        (df['account_Contract'].str.lower() == 'month-to-month') , 
-        1, 
-        0
-    )
 
-    colunas_internet_additional_service = [
-        'internet_OnlineSecurity', 
-        'internet_OnlineBackup', 
-        'internet_DeviceProtection', 
-        'internet_TechSupport', 
-        'internet_StreamingTV', 
-        'internet_StreamingMovies', 
-    ]
-    # Criação de coluna com total de serviços adicionais de internet
-    df['additional_InternetService'] = np.sum(df[colunas_internet_additional_service], axis=1)
+def obter_coluna_derivada(df: pd.DataFrame, coluna: str, faixas: dict = None):
+    return garantir_colunas_derivadas(df, [coluna], faixas)[coluna]
 
-    # Informações sobre assinaturas combinadas entre Phone e Internet Service
-    df['only_PhoneService'] = np.where(
-        (df['phone_PhoneService'] == 1) & (df['internet_InternetService'] == 0), 
-        1, 
-        0
-    )
 
-    df['only_InternetService'] = np.where(
-        (df['phone_PhoneService'] == 0) & (df['internet_InternetService'] == 1), 
-        1, 
-        0
-    )
+def calcular_coluna_derivada(df: pd.DataFrame, coluna: str, faixas: dict = None):
+    # Valores da coluna sem alterar o DataFrame: uma coluna ausente é calculada (com as dependências) sobre uma
+    # cópia rasa, que não copia os dados das colunas existentes
+    if coluna in df.columns:
+        return df[coluna]
+    return garantir_colunas_derivadas(df.copy(deep=False), [coluna], faixas)[coluna]
 
-    df['both_Phone_InternetService'] = np.where(
-        (df['phone_PhoneService'] == 1) & (df['internet_InternetService'] == 1), 
-        1, 
-        0
-    )
 
-    # Criação de coluna de valores diários
-    df['account_Charges_Daily'] = df['account_Charges_Monthly'] / 30
+def criar_colunas_derivadas(df, faixas: dict = None):
+    # Materializa todas as colunas do registro. Sem faixas informadas, os limites são ajustados a partir do próprio
+    # DataFrame; com faixas gravadas (lt.load_bins), a classificação é apenas uma busca por np.searchsorted
+    if faixas is None:
+        faixas = ajustar_faixas_telecomx(df)
 
-    return df
+    return garantir_colunas_derivadas(df, list(COLUNAS_DERIVADAS_TELECOMX), faixas, recalcular=True)
 
 
 def conversao_tipos(df):
@@ -264,13 +527,131 @@ def conversao_tipos(df):
     return df
 
 
-def calcular_percentual_churn_categoria(df: pd.DataFrame, categoria:str, totalizador:bool=True):
-    df_agg = df.groupby([categoria], observed=True).agg(
-        customer = ('Churn', 'count'),
-        churn = ('Churn', 'sum'),
-        perc_churn_customer = ('Churn', lt.apply_percent_category),
-    ).reset_index()
-    
+COLUNAS_FLAGS_TELECOMX = [
+    'Churn',
+    'customer_SeniorCitizen',
+    'customer_Partner',
+    'customer_Dependents',
+    'phone_PhoneService',
+    'phone_MultipleLines',
+    'internet_InternetService',
+    'internet_OnlineSecurity',
+    'internet_OnlineBackup',
+    'internet_DeviceProtection',
+    'internet_TechSupport',
+    'internet_StreamingTV',
+    'internet_StreamingMovies',
+    'account_PaperlessBilling',
+    'account_Contract_Monthly',
+    'only_PhoneService',
+    'only_InternetService',
+    'both_Phone_InternetService',
+]
+
+# Esquema compacto do DataFrame tratado da TelecomX. 
+# Colunas fora do esquema seguem as regras gerais de aplicar_esquema_compacto
+ESQUEMA_COMPACTO_TELECOMX = {
+    **{c: 'int8' for c in COLUNAS_FLAGS_TELECOMX},
+    'customer_tenure': 'int16',
+    'additional_InternetService': 'int8',
+    'customer_gender': 'category',
+    'account_Contract': 'category',
+    'account_PaymentMethod': 'category',
+    'internet_Service_Description': 'category',
+    'account_Charges_Monthly': 'float32',
+    'account_Charges_Total': 'float32',
+    'account_Charges_Daily': 'float32',
+    'customerID': 'string',
+}
+
+
+def aplicar_esquema_compacto(df: pd.DataFrame, esquema: dict = None, limite_cardinalidade=0.5, casas_decimais=2, imprimir=True):
+    # Reduz a memória do DataFrame aplicando o esquema de tipos compactos:
+    #  - int8/int16: flags 0/1 e contagens, desde que não existam nulos e os valores caibam no tipo
+    #  - category: textos com poucos domínios (até limite_cardinalidade da quantidade de registros)
+    #  - float32: valores monetários, desde que o erro de conversão não afete as casas decimais
+    #  - string: identificadores, armazenados com pyarrow quando disponível
+    # Retorna o DataFrame e o relatório de memória antes e depois por coluna
+    esquema = ESQUEMA_COMPACTO_TELECOMX if esquema is None else esquema
+    tolerancia = 0.5 * 10 ** -casas_decimais
+
+    try:
+        import pyarrow
+        tipo_texto = 'string[pyarrow]'
+    except ImportError:
+        tipo_texto = None
+
+    memoria_antes = df.memory_usage(index=False, deep=True)
+    tipos_antes = df.dtypes
+
+    for c in df.columns:
+        serie = df[c]
+        tipo = esquema.get(c)
+
+        if tipo is None:
+            if (pd.api.types.is_string_dtype(serie) or pd.api.types.is_object_dtype(serie)) and serie.nunique() <= limite_cardinalidade * len(serie):
+                tipo = 'category'
+            elif pd.api.types.is_integer_dtype(serie.dtype) and not isinstance(serie.dtype, pd.CategoricalDtype):
+                df[c] = pd.to_numeric(serie, downcast='integer')
+                continue
+            else:
+                continue
+
+        if tipo in ('int8', 'int16'):
+            info = np.iinfo(tipo)
+            if serie.isnull().any() or not pd.api.types.is_numeric_dtype(serie.dtype) or serie.min() < info.min or serie.max() > info.max:
+                continue
+            df[c] = serie.astype(tipo)
+        elif tipo == 'float32':
+            if not pd.api.types.is_float_dtype(serie.dtype):
+                continue
+            serie_float32 = serie.astype('float32')
+            if (serie_float32.astype('float64') - serie).abs().max() <= tolerancia:
+                df[c] = serie_float32
+        elif tipo == 'category':
+            df[c] = serie.astype('category')
+        elif tipo == 'string' and tipo_texto is not None:
+            df[c] = serie.astype(tipo_texto)
+
+    relatorio = pd.DataFrame({
+        'tipo_antes': tipos_antes.astype(str),
+        'tipo_depois': df.dtypes.astype(str),
+        'memoria_antes': memoria_antes,
+        'memoria_depois': df.memory_usage(index=False, deep=True),
+    })
+    relatorio.loc['Total'] = ['', '', relatorio.memoria_antes.sum(), relatorio.memoria_depois.sum()]
+    relatorio['reducao_perc'] = round((1 - relatorio.memoria_depois / relatorio.memoria_antes) * 100, 2)
+
+    if imprimir:
+        print(relatorio)
+
+    return df, relatorio
+
+
+def agregar_churn_coluna(serie: pd.Series, churn: pd.Series):
+    # Quantidade de clientes e soma de Churn por código de categoria, com a ordem de categorias do groupby
+    codigos, categorias = pd.factorize(serie, sort=True)
+    validos = (codigos >= 0) & churn.notna().to_numpy()
+    codigos = codigos[validos]
+
+    valores_churn = churn.to_numpy()[validos]
+    soma_churn = np.bincount(codigos, weights=valores_churn, minlength=len(categorias))
+    if pd.api.types.is_integer_dtype(churn.dtype) or pd.api.types.is_bool_dtype(churn.dtype):
+        soma_churn = soma_churn.astype('int64')
+
+    return pd.DataFrame(
+        {
+            'customer': np.bincount(codigos, minlength=len(categorias)),
+            'churn': soma_churn,
+        },
+        index=pd.Index(categorias, name=serie.name),
+    )
+
+
+def montar_percentual_churn(df_contagens: pd.DataFrame, categoria: str, totalizador:bool=True):
+    # Monta a tabela de percentuais a partir das contagens de clientes e de Churn por categoria
+    df_agg = df_contagens[['customer', 'churn']].rename_axis(categoria).reset_index()
+    df_agg['perc_churn_customer'] = df_agg.churn / df_agg.customer * 100
     
     df_agg.insert(2, 'perc_total_customer', df_agg.customer/ np.sum(df_agg.customer) *100)
     
@@ -287,163 +668,482 @@ def calcular_percentual_churn_categoria(df: pd.DataFrame, categoria:str, totaliz
     return df_agg
 
 
-def graf_percentual_chrun(df: pd.DataFrame):
-    ...
+def calcular_percentual_churn_categoria(df: pd.DataFrame, categoria:str, totalizador:bool=True, faixas: dict = None):
+    # Uma categoria derivada ausente é calculada sem alterar o DataFrame; com faixas gravadas (ex.: as faixas da base
+    # inteira, lt.load_bins), um recorte é classificado com os mesmos limites em vez de faixas ajustadas ao recorte
+    df_contagens = agregar_churn_coluna(calcular_coluna_derivada(df, categoria, faixas), df['Churn'])
+    return montar_percentual_churn(df_contagens, categoria, totalizador)
+
+
+def combinar_contagens_churn(df_contagens: pd.DataFrame, df_novas: pd.DataFrame):
+    # Soma as contagens por categoria; categorias novas são incluídas mantendo a ordenação
+    df_combinado = pd.concat([df_contagens, df_novas])
+    return df_combinado.groupby(level=0, sort=True, observed=True)[['customer', 'churn']].sum()
+
+
+def criar_agregados_churn(df: pd.DataFrame, colunas: list = None, quantidade_maxima=100, coluna_churn='Churn', faixas: dict = None):
+    # Pré-calcula, uma única vez, as contagens de clientes e de Churn por categoria de cada coluna categórica.
+    # Por padrão são consideradas as colunas com até quantidade_maxima domínios (perfil das colunas).
+    # As faixas das colunas de faixas ficam nos agregados para classificar os lotes seguintes com os mesmos limites
+    if colunas is None:
+        colunas = [c for c in extrair_colunas_categoricas(df, quantidade_maxima, imprimir=False) if c != coluna_churn]
+    colunas_faixas = [c for c in colunas if c in COLUNAS_FAIXAS_TELECOMX]
+    if colunas_faixas and (faixas is None or any(c not in faixas for c in colunas_faixas)):
+        faixas = dict(ajustar_faixas_telecomx(df, colunas_faixas), **(faixas or {}))
+    # Colunas derivadas calculadas sobre uma cópia rasa, sem alterar o DataFrame recebido
+    df = garantir_colunas_derivadas(df.copy(deep=False), colunas, faixas)
+
+    churn = df[coluna_churn]
+    return {
+        'coluna_churn': coluna_churn,
+        'faixas': {c: faixas[c] for c in colunas_faixas},
+        'contagens': {c: agregar_churn_coluna(df[c], churn) for c in colunas},
+    }
+
+
+def atualizar_agregados_churn(agregados: dict, df_novo: pd.DataFrame):
+    # Inclui um novo lote de clientes (ex.: carga mensal) somando apenas as contagens do lote. As colunas derivadas
+    # ausentes no lote são calculadas, sobre uma cópia rasa, com as faixas gravadas nos agregados e não ajustadas ao lote
+    df_novo = garantir_colunas_derivadas(df_novo.copy(deep=False), list(agregados['contagens']), agregados.get('faixas'))
+    churn = df_novo[agregados['coluna_churn']]
+    for c, df_contagens in agregados['contagens'].items():
+        df_novas = agregar_churn_coluna(df_novo[c], churn)
+        agregados['contagens'][c] = combinar_contagens_churn(df_contagens, df_novas)
+    return agregados
+
+
+def calcular_percentual_churn_agregados(agregados: dict, categoria: str, totalizador:bool=True):
+    # Mesmo resultado de calcular_percentual_churn_categoria, servido pelas contagens pré-calculadas
+    return montar_percentual_churn(agregados['contagens'][categoria], categoria, totalizador)
+
+
+# Dimensões padrão do cubo de Churn: faixas, categorias e flags de serviço usadas nos recortes da análise.
+# Valores numéricos entram apenas pelas faixas, pois cada valor distinto multiplica a quantidade de células
+DIMENSOES_CUBO_CHURN = [
+    'customer_tenure_bins',
+    'account_Charges_Monthly_bins',
+    'account_Contract',
+    'account_Contract_Monthly',
+    'account_PaymentMethod',
+    'account_PaperlessBilling',
+    'internet_Service_Description',
+    'internet_InternetService',
+    'additional_InternetService',
+    'phone_PhoneService',
+    'phone_MultipleLines',
+    'only_PhoneService',
+    'only_InternetService',
+    'both_Phone_InternetService',
+    'customer_gender',
+    'customer_SeniorCitizen',
+    'customer_Partner',
+    'customer_Dependents',
+]
+
+
+def criar_cubo_churn(df: pd.DataFrame, dimensoes: list = None, coluna_churn='Churn', faixas: dict = None):
+    # Pré-calcula as quantidades de clientes e de Churn para cada combinação observada das dimensões.
+    # Cada dimensão é guardada como código inteiro com o respectivo índice de categorias (valores nulos 
+    # formam uma categoria própria), de modo que os filtros são avaliados sobre as categorias e não sobre os registros.
+    # As faixas das dimensões de faixas ficam no cubo para os filtros por intervalo (filtrar_cubo_churn).
+    # As colunas derivadas são calculadas sobre uma cópia rasa, sem alterar o DataFrame recebido
+    dimensoes = DIMENSOES_CUBO_CHURN if dimensoes is None else list(dimensoes)
+    colunas_faixas = [d for d in dimensoes if d in COLUNAS_FAIXAS_TELECOMX]
+    if colunas_faixas and (faixas is None or any(d not in faixas for d in colunas_faixas)):
+        faixas = dict(ajustar_faixas_telecomx(df, colunas_faixas), **(faixas or {}))
+    df = garantir_colunas_derivadas(df.copy(deep=False), dimensoes, faixas)
+
+    churn = df[coluna_churn]
+    celulas = {}
+    categorias = {}
+    for d in dimensoes:
+        codigos, valores = pd.factorize(df[d], sort=True, use_na_sentinel=False)
+        celulas[d] = codigos.astype(np.min_scalar_type(max(len(valores) - 1, 0)))
+        categorias[d] = pd.Index(valores, name=d)
+
+    celulas['customer'] = churn.notna().to_numpy().astype('int64')
+    celulas['churn'] = churn.fillna(0).to_numpy()
+
+    celulas = pd.DataFrame(celulas).groupby(dimensoes, sort=False).sum().reset_index()
+
+    return {
+        'dimensoes': dimensoes,
+        'categorias': categorias,
+        'celulas': celulas,
+        'faixas': {d: faixas[d] for d in colunas_faixas},
+        'churn_inteiro': pd.api.types.is_integer_dtype(churn.dtype) or pd.api.types.is_bool_dtype(churn.dtype),
+    }
+
+
+def aceitar_intervalo_cubo(cubo: dict, dimensao: str, intervalo: pd.Interval):
+    # Categorias da dimensão dentro do intervalo. Em dimensões de faixas, são aceitas as faixas [início, fim)
+    # inteiramente contidas no intervalo. Como o cubo não separa os clientes de uma mesma faixa, um intervalo que
+    # corta alguma faixa ao meio gera ValueError, pois o resultado não seria o mesmo do filtro sobre os registros
+    categorias = cubo['categorias'][dimensao]
+    if dimensao not in cubo.get('faixas', {}):
+        return np.array([valor in intervalo for valor in categorias], dtype=bool)
+
+    faixa = cubo['faixas'][dimensao]
+    rotulos = pd.Index(faixa['labels'])
+    posicoes = rotulos.get_indexer(categorias)
+    if ((posicoes < 0) & ~np.asarray(categorias.isna())).any():
+        raise ValueError(f'As categorias de {dimensao} não correspondem às faixas gravadas no cubo')
+
+    bordas = np.asarray(faixa['edges'], dtype=float)
+    inicio = bordas[:-1] >= intervalo.left if intervalo.closed_left else bordas[:-1] > intervalo.left
+    # Os valores de uma faixa são menores que o seu fim, então basta o fim não passar do limite do intervalo.
+    # Ex.: com as faixas de custo mensal [1, 21), [21, 41), ..., pd.Interval(41, 101, closed='left') aceita R$041-R$100
+    contidas = inicio & (bordas[1:] <= intervalo.right)
+    fim = bordas[:-1] <= intervalo.right if intervalo.closed_right else bordas[:-1] < intervalo.right
+    cortadas = (bordas[1:] > intervalo.left) & fim & ~contidas
+    if cortadas.any():
+        raise ValueError(
+            f'O intervalo {intervalo} não coincide com as bordas das faixas de {dimensao} '
+            f'(corta {", ".join(np.asarray(faixa["labels"])[cortadas])})')
+
+    aceitas = np.append(contidas, False)
+    return aceitas[posicoes]
+
+
+def filtrar_cubo_churn(cubo: dict, filtros: dict = None):
+    # Máscara das células do cubo que atendem aos filtros. Cada filtro pode ser um valor, uma lista de valores,
+    # um intervalo (ex.: {'account_Charges_Monthly_bins': pd.Interval(41, 101, closed='left')}, ver aceitar_intervalo_cubo)
+    # ou uma função aplicada à Series de categorias da dimensão (ex.: lambda v: v.isin(['001-012', '013-024']))
+    celulas = cubo['celulas']
+    mascara = np.ones(len(celulas), dtype=bool)
+
+    for d, condicao in (filtros or {}).items():
+        categorias = cubo['categorias'][d]
+        if isinstance(condicao, pd.Interval):
+            aceitos = aceitar_intervalo_cubo(cubo, d, condicao)
+        elif callable(condicao):
+            aceitos = np.asarray(condicao(pd.Series(categorias)), dtype=bool)
+        elif isinstance(condicao, (list, tuple, set)):
+            aceitos = np.asarray(categorias.isin(list(condicao)), dtype=bool)
+        else:
+            aceitos = np.asarray(categorias == condicao, dtype=bool)
+        mascara &= aceitos[celulas[d].to_numpy()]
+
+    return mascara
+
+
+def consultar_cubo_churn(cubo: dict, categoria: str, filtros: dict = None, totalizador:bool=True):
+    # Mesmo resultado de calcular_percentual_churn_categoria(df[filtro], categoria), calculado apenas com as células do cubo
+    celulas = cubo['celulas']
+    mascara = filtrar_cubo_churn(cubo, filtros)
+    categorias = cubo['categorias'][categoria]
+
+    codigos = celulas[categoria].to_numpy()[mascara]
+    customer = np.bincount(codigos, weights=celulas['customer'].to_numpy()[mascara], minlength=len(categorias)).astype('int64')
+    churn = np.bincount(codigos, weights=celulas['churn'].to_numpy()[mascara], minlength=len(categorias))
+    if cubo['churn_inteiro']:
+        churn = churn.astype('int64')
+
+    # Como no groupby, apenas categorias observadas e não nulas
+    presentes = (customer > 0) & ~np.asarray(categorias.isna())
+    df_contagens = pd.DataFrame(
+        {'customer': customer[presentes], 'churn': churn[presentes]},
+        index=categorias[presentes],
+    )
+
+    return montar_percentual_churn(df_contagens, categoria, totalizador)
+
+
+def remover_bordas(ax):
+    for spine in ['top', 'right']:
+        ax.spines[spine].set_visible(False)
+
+
+ROTULOS_CHURN = {0: 'Não', 1: 'Sim'}
+
+
+def calcular_boxplot_churn(df: pd.DataFrame, variavel_numerica: str, whis: float = 1.5, max_outliers: int = 1000):
+    # Estatísticas do boxplot de variavel_numerica para cada valor de Churn: quartis, limites dos bigodes e 
+    # no máximo max_outliers outliers (incluindo os extremos). São memorizadas para o DataFrame e 
+    # substituem as linhas da base no desenho do gráfico
+    estatisticas = lt.cached_statistic(
+        df, [variavel_numerica, 'Churn'], lt.grouped_box_statistics, whis=whis, max_fliers=max_outliers)
+    return [dict(e, label=ROTULOS_CHURN.get(e['label'], e['label'])) for e in estatisticas]
+
+
+def calcular_densidade_churn(df: pd.DataFrame, variavel_numerica: str, gridsize: int = 200, cut: float = 3, bw_adjust: float = 1):
+    # Curvas de densidade (KDE) de variavel_numerica para cada valor de Churn, na mesma escala do 
+    # sns.kdeplot com hue (áreas proporcionais à participação de cada grupo), memorizadas para o DataFrame
+    densidades = lt.cached_statistic(
+        df, [variavel_numerica, 'Churn'], lt.grouped_kde, gridsize=gridsize, cut=cut, bw_adjust=bw_adjust)
+    return [dict(d, label=ROTULOS_CHURN.get(d['label'], d['label'])) for d in densidades]
+
+
+def desenhar_boxplot(ax, estatisticas: list):
+    # Desenha as estatísticas de calcular_boxplot_churn com o mesmo estilo do sns.boxplot
+    import seaborn as sns
+
+    cor = sns.desaturate(sns.color_palette()[0], .75)
+    luminancia = colorsys.rgb_to_hls(*cor)[1] * .6
+    cor_linha = (luminancia, luminancia, luminancia)
+
+    posicoes = list(range(len(estatisticas)))
+    ax.bxp(
+        estatisticas,
+        positions=posicoes,
+        widths=.8,
+        capwidths=.4,
+        patch_artist=True,
+        manage_ticks=False,
+        boxprops={'facecolor': cor, 'edgecolor': cor_linha},
+        medianprops={'color': cor_linha, 'solid_capstyle': 'butt'},
+        whiskerprops={'color': cor_linha, 'solid_capstyle': 'butt'},
+        capprops={'color': cor_linha},
+        flierprops={'markeredgecolor': cor_linha, 'markersize': 5},
+    )
+    ax.set_xticks(posicoes, [e['label'] for e in estatisticas])
+    ax.xaxis.grid(False)
+    ax.set_xlim(-.5, len(posicoes) - .5)
+
+
+def desenhar_densidade(ax, densidades: list):
+    # Desenha as curvas de calcular_densidade_churn com o mesmo estilo do sns.kdeplot(hue='Churn', fill=True): 
+    # o primeiro grupo fica por cima e o eixo y começa em 0
+    import seaborn as sns
+
+    areas = {}
+    for cor, densidade in reversed(list(zip(sns.color_palette(), densidades))):
+        if len(densidade['x']) == 0:
+            continue
+        area = ax.fill_between(densidade['x'], 0, densidade['density'], facecolor=(*cor, .25), edgecolor=cor)
+        area.sticky_edges.y[:] = (0, np.inf)
+        areas[densidade['label']] = area
+
+    rotulos = [d['label'] for d in densidades if d['label'] in areas]
+    ax.legend([areas[r] for r in rotulos], rotulos, title='Churn')
+    ax.set_ylabel('Density')
+
+
+# Cada gráfico é dividido em duas partes: dados_graf_* calcula a partir do DataFrame apenas as entradas 
+# pequenas do gráfico (tabelas agregadas ou as colunas usadas) e desenhar_graf_* desenha essas entradas 
+# em uma figura do matplotlib recebida, sem o estado global do pyplot. As funções graf_* mantêm o uso 
+# no notebook (figura do pyplot e retorno de plt) e o renderizador em lote (telecomx_graficos) reaproveita figuras
+
+def dados_graf_percentual_chrun(df: pd.DataFrame):
     # Calcular percentual
     churn_percent = df['Churn'].value_counts(normalize=True).reset_index()
     churn_percent.columns = ['Churn', 'Percent']
     churn_percent['Churn'] = churn_percent['Churn'].map({0: 'Não', 1: 'Sim'})
     churn_percent['Percent'] *= 100
+    return {'tamanho': (7, 5), 'tabela': churn_percent}
 
-    sns.set(style='whitegrid')
-    plt.figure(figsize=(7, 5))
-    ax = sns.barplot(data=churn_percent, x='Churn', y='Percent', palette='Blues_d')
 
-    # Adicionar rótulos de valor no topo das barras
-    for i in ax.containers:
-        ax.bar_label(i, fmt='%.1f%%')
+def desenhar_graf_percentual_chrun(fig, dados: dict):
+    import seaborn as sns
 
-    #Remover bordas
-    for spine in ['top', 'right']:
-        ax.spines[spine].set_visible(False)
+    # Estilo e contexto do seaborn aplicados apenas a este gráfico, sem alterar o rcParams global
+    with sns.axes_style('whitegrid'), sns.plotting_context('notebook'):
+        ax = fig.add_subplot()
+        sns.barplot(data=dados['tabela'], x='Churn', y='Percent', palette='Blues_d', ax=ax)
+
+        # Adicionar rótulos de valor no topo das barras
+        for i in ax.containers:
+            ax.bar_label(i, fmt='%.1f%%')
+
+        #Remover bordas
+        remover_bordas(ax)
+
+        # Grid Y ao fundo
+        ax.set_axisbelow(True)
+        ax.yaxis.grid(True, linestyle='--', linewidth=0.7)
 
-    # Grid Y ao fundo
-    ax.set_axisbelow(True)
-    ax.yaxis.grid(True, linestyle='--', linewidth=0.7)
 
+        ax.set_title('Percentual de Clientes com Churn')
+        ax.set_xlabel('Churn')
+        ax.set_ylabel('Percentual (%)')
+        ax.set_ylim(0, 100)
 
-    ax.set_title('Percentual de Clientes com Churn')
-    ax.set_xlabel('Churn')
-    ax.set_ylabel('Percentual (%)')
-    ax.set_ylim(0, 100)
 
+def graf_percentual_chrun(df: pd.DataFrame):
+    import matplotlib.pyplot as plt
+
+    dados = dados_graf_percentual_chrun(df)
+    desenhar_graf_percentual_chrun(plt.figure(figsize=dados['tamanho']), dados)
     return plt
 
 
-def graf_boxplot_churn(df: pd.DataFrame):
+def dados_graf_boxplot_churn(df: pd.DataFrame):
     # Gráficos com variáveis numéricas pré-definidas
-    df = df.copy()
-    df.Churn = df.Churn.map({0: 'Não', 1: 'Sim'})
+    return {
+        'tamanho': (14, 5),
+        'account_Charges_Monthly': calcular_boxplot_churn(df, 'account_Charges_Monthly'),
+        'customer_tenure': calcular_boxplot_churn(df, 'customer_tenure'),
+    }
 
+
+def desenhar_graf_boxplot_churn(fig, dados: dict):
     # Boxplot para Charges Monthly
-    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
-    sns.boxplot(x='Churn', y='account_Charges_Monthly', data=df, ax=axes[0])
+    axes = fig.subplots(1, 2)
+    desenhar_boxplot(axes[0], dados['account_Charges_Monthly'])
     axes[0].set_title('Frequência    de Custo Mensal por Churn')
     axes[0].set_xlabel('Churn')
     axes[0].set_ylabel('Custo Mensal')
 
     # Boxplot para Tenure
-    sns.boxplot(x='Churn', y='customer_tenure', data=df, ax=axes[1])
+    desenhar_boxplot(axes[1], dados['customer_tenure'])
     axes[1].set_title('Frequência de Tempo de Contrato por Churn')
     axes[1].set_xlabel('Churn')
     axes[1].set_ylabel('\n\nTempo de Contrato (meses)')
 
-    plt.tight_layout()
+    fig.tight_layout()
 
     # Remover bordas
-    for spine in ['top', 'right']:
-        plt.gca().spines[spine].set_visible(False)
+    remover_bordas(axes[1])
+
 
+def graf_boxplot_churn(df: pd.DataFrame):
+    import matplotlib.pyplot as plt
+
+    dados = dados_graf_boxplot_churn(df)
+    desenhar_graf_boxplot_churn(plt.figure(figsize=dados['tamanho']), dados)
     return plt
 
 
-def graf_distribuicao_churn(df: pd.DataFrame):
+def dados_graf_distribuicao_churn(df: pd.DataFrame):
     # Gráficos com variáveis numéricas pré-definidas
-    df = df.copy()
-    df.Churn = df.Churn.map({0: 'Não', 1: 'Sim'})
-    
+    return {
+        'tamanho': (14, 5),
+        'account_Charges_Monthly': calcular_densidade_churn(df, 'account_Charges_Monthly'),
+        'customer_tenure': calcular_densidade_churn(df, 'customer_tenure'),
+    }
+
+
+def desenhar_graf_distribuicao_churn(fig, dados: dict):
     # KDEplot para Charges Monthly e customer_tenure
-    plt.figure(figsize=(14, 5))
 
     # Valor mensal
-    plt.subplot(1, 2, 1)
-    sns.kdeplot(data=df, x='account_Charges_Monthly', hue='Churn', fill=True)
-    plt.title('Distribuição de Churn por Custo Mensal')
-    plt.xlabel('Custo Mensal')
+    ax = fig.add_subplot(1, 2, 1)
+    desenhar_densidade(ax, dados['account_Charges_Monthly'])
+    ax.set_title('Distribuição de Churn por Custo Mensal')
+    ax.set_xlabel('Custo Mensal')
 
     # Tempo de contrato
-    plt.subplot(1, 2, 2)
-    sns.kdeplot(data=df, x='customer_tenure', hue='Churn', fill=True)
-    plt.title('Distribuição de Churn por Tempo de Contrato')
-    plt.xlabel('Tempo de Contrato (meses)')
+    ax = fig.add_subplot(1, 2, 2)
+    desenhar_densidade(ax, dados['customer_tenure'])
+    ax.set_title('Distribuição de Churn por Tempo de Contrato')
+    ax.set_xlabel('Tempo de Contrato (meses)')
 
-    plt.tight_layout()
+    fig.tight_layout()
 
     # Remover bordas
-    for spine in ['top', 'right']:
-        plt.gca().spines[spine].set_visible(False)
+    remover_bordas(ax)
+
 
+def graf_distribuicao_churn(df: pd.DataFrame):
+    import matplotlib.pyplot as plt
+
+    dados = dados_graf_distribuicao_churn(df)
+    desenhar_graf_distribuicao_churn(plt.figure(figsize=dados['tamanho']), dados)
     return plt
 
 
-def graf_boxplot_churn_varialvel_numerica(df: pd.DataFrame, variavel_numerica:str, titulo:str, x_label:str='', y_label:str=''):
-    # Gráficos com variáveis numéricas pré-definidas
-    df = df.copy()
-    df.Churn = df.Churn.map({0: 'Não', 1: 'Sim'})
+def dados_graf_boxplot_churn_varialvel_numerica(df: pd.DataFrame, variavel_numerica:str, titulo:str, x_label:str='', y_label:str=''):
+    return {
+        'tamanho': (7, 5), 
+        'estatisticas': calcular_boxplot_churn(df, variavel_numerica), 
+        'titulo': titulo, 
+        'y_label': y_label,
+    }
+
 
+def desenhar_graf_boxplot_churn_varialvel_numerica(fig, dados: dict):
     # Boxplot para variável numérica
-    fig, axes = plt.subplots(figsize=(7, 5))
-    sns.boxplot(x='Churn', y=variavel_numerica, data=df, ax=axes)
-    axes.set_title(titulo)
+    axes = fig.subplots()
+    desenhar_boxplot(axes, dados['estatisticas'])
+    axes.set_title(dados['titulo'])
     axes.set_xlabel('Churn')
-    axes.set_ylabel(y_label)
+    axes.set_ylabel(dados['y_label'])
 
-    plt.tight_layout()
+    fig.tight_layout()
 
     # Remover bordas
-    for spine in ['top', 'right']:
-        plt.gca().spines[spine].set_visible(False)
+    remover_bordas(axes)
+
+
+def graf_boxplot_churn_varialvel_numerica(df: pd.DataFrame, variavel_numerica:str, titulo:str, x_label:str='', y_label:str=''):
+    import matplotlib.pyplot as plt
 
+    dados = dados_graf_boxplot_churn_varialvel_numerica(df, variavel_numerica, titulo, x_label, y_label)
+    desenhar_graf_boxplot_churn_varialvel_numerica(plt.figure(figsize=dados['tamanho']), dados)
     return plt
 
 
-def graf_distribuicao_churn_varialvel_numerica(df: pd.DataFrame, variavel_numerica:str, titulo:str, x_label:str, y_label:str):
-    ...
-    warnings.simplefilter(action='ignore', category=FutureWarning)
+def dados_graf_distribuicao_churn_varialvel_numerica(df: pd.DataFrame, variavel_numerica:str, titulo:str, x_label:str, y_label:str):
+    return {
+        'tamanho': (14, 5), 
+        'densidades': calcular_densidade_churn(df, variavel_numerica), 
+        'titulo': titulo, 
+        'x_label': x_label,
+    }
 
-    df_temp = df.copy()
-    df_temp.Churn = df_temp.Churn.map({0: 'Não', 1: 'Sim'})
-    
-    # KDEplot para variavel_numerica
-    plt.figure(figsize=(14, 5))
 
-    # Tempo de contrato
-    plt.subplot(1, 2, 2)
-    sns.kdeplot(data=df_temp, x=variavel_numerica, hue='Churn', fill=True)
-    plt.title(titulo)
+def desenhar_graf_distribuicao_churn_varialvel_numerica(fig, dados: dict):
+    # KDEplot para variavel_numerica
+    ax = fig.add_subplot(1, 2, 2)
+    desenhar_densidade(ax, dados['densidades'])
+    ax.set_title(dados['titulo'])
 
-    plt.xlabel(x_label)
+    ax.set_xlabel(dados['x_label'])
 
-    plt.tight_layout()
+    fig.tight_layout()
 
     # Remover bordas
-    for spine in ['top', 'right']:
-        plt.gca().spines[spine].set_visible(False)
+    remover_bordas(ax)
 
-    return plt
 
+def graf_distribuicao_churn_varialvel_numerica(df: pd.DataFrame, variavel_numerica:str, titulo:str, x_label:str, y_label:str):
+    import matplotlib.pyplot as plt
+
+    dados = dados_graf_distribuicao_churn_varialvel_numerica(df, variavel_numerica, titulo, x_label, y_label)
+    desenhar_graf_distribuicao_churn_varialvel_numerica(plt.figure(figsize=dados['tamanho']), dados)
+    return plt
 
-def graf_barra_customer_churn(df, var_categorica:str, titulo:str, x_label:str, y_label1:str, y_label2:str, paleta_cor='Blues', converte_bin=False):
 
-    df_temp = calcular_percentual_churn_categoria(df, var_categorica, False)
+def dados_graf_barra_customer_churn(df, var_categorica:str, titulo:str, x_label:str, y_label1:str, y_label2:str, paleta_cor='Blues', converte_bin=False, filtros:dict=None):
+    # df pode ser o DataFrame de clientes ou um cubo de criar_cubo_churn, recortado pelos filtros
+    if isinstance(df, dict):
+        df_temp = consultar_cubo_churn(df, var_categorica, filtros, False)
+    else:
+        df_temp = calcular_percentual_churn_categoria(df, var_categorica, False)
     if converte_bin:
         df_temp = lt.convert_binary_to_descriptive(df_temp, [var_categorica])
         rotacao=0
     else:
         df_temp[var_categorica] = df_temp[var_categorica].astype(str)
         rotacao=45
-    
-    top_ylim = lt.round_magnitude(df_temp.customer.max() *1.1)
 
-    plt.figure(figsize=(14, 5))
+    return {
+        'tamanho': (14, 5),
+        'tabela': df_temp,
+        'var_categorica': var_categorica,
+        'titulo': titulo,
+        'x_label': x_label,
+        'y_label1': y_label1,
+        'y_label2': y_label2,
+        'rotacao': rotacao,
+        'top_ylim': lt.round_magnitude(df_temp.customer.max() *1.1),
+    }
+
+
+def desenhar_graf_barra_customer_churn(fig, dados: dict):
+    import seaborn as sns
+
+    df_temp = dados['tabela']
+    var_categorica = dados['var_categorica']
 
     # % Base cliente
-    plt.subplot(1, 2, 1)
-    ax1 = sns.barplot(
+    ax1 = fig.add_subplot(1, 2, 1)
+    sns.barplot(
         data=df_temp,
         x=var_categorica,
         y='customer',
-        palette='Blues'
+        palette='Blues',
+        ax=ax1,
     )
 
     # Adicionar rótulos no topo das barras
@@ -451,19 +1151,20 @@ def graf_barra_customer_churn(df, var_categorica:str, titulo:str, x_label:str, y
         ax1.bar_label(container, padding=3)
     
     # Títulos e rótulos
-    plt.title(titulo)
-    plt.xlabel(x_label)
-    plt.xticks(rotation=rotacao)
-    plt.ylabel(y_label1)
-    plt.ylim(0, top_ylim)
+    ax1.set_title(dados['titulo'])
+    ax1.set_xlabel(dados['x_label'])
+    ax1.tick_params(axis='x', labelrotation=dados['rotacao'])
+    ax1.set_ylabel(dados['y_label1'])
+    ax1.set_ylim(0, dados['top_ylim'])
 
     # % Churn
-    ax2 = plt.subplot(1, 2, 2)
+    ax2 = fig.add_subplot(1, 2, 2)
     sns.barplot(
         data=df_temp,
         x=var_categorica,
         y='perc_churn_customer',
-        palette='Blues'
+        palette='Blues',
+        ax=ax2,
     )
 
     # Adicionar rótulos no topo das barras
@@ -471,31 +1172,76 @@ def graf_barra_customer_churn(df, var_categorica:str, titulo:str, x_label:str, y
         ax2.bar_label(container, fmt='%.1f%%', padding=3)
 
     # Títulos e rótulos
-    plt.title(titulo)
-    plt.xlabel(x_label)
-    plt.xticks(rotation=rotacao)
-    plt.ylabel(f'\n\n{y_label2}')
-    plt.ylim(0, 100)
+    ax2.set_title(dados['titulo'])
+    ax2.set_xlabel(dados['x_label'])
+    ax2.tick_params(axis='x', labelrotation=dados['rotacao'])
+    ax2.set_ylabel(f"\n\n{dados['y_label2']}")
+    ax2.set_ylim(0, 100)
 
     # Ajuste da distância entre os subplots
-    plt.subplots_adjust(wspace=0.4)  # Aumenta o espaço horizontal
-    plt.tight_layout()
-    
+    fig.subplots_adjust(wspace=0.4)  # Aumenta o espaço horizontal
+    fig.tight_layout()
+
+
+def graf_barra_customer_churn(df, var_categorica:str, titulo:str, x_label:str, y_label1:str, y_label2:str, paleta_cor='Blues', converte_bin=False, filtros:dict=None):
+    import matplotlib.pyplot as plt
+
+    dados = dados_graf_barra_customer_churn(df, var_categorica, titulo, x_label, y_label1, y_label2, paleta_cor, converte_bin, filtros)
+    desenhar_graf_barra_customer_churn(plt.figure(figsize=dados['tamanho']), dados)
     return plt
 
 
-def graf_matriz_correlacao(df: pd.DataFrame, colunas_numericas: list, titulo:str):
-    # Matriz de correlação
-    plt.figure(figsize=(10, 6))
-    corr = df[colunas_numericas].corr()
-    sns.heatmap(corr, annot=True, fmt='.2f', cmap='coolwarm', square=True, cbar_kws={"shrink": .8})
+def calcular_correlacao_telecomx(df: pd.DataFrame, colunas_numericas: list, metodo: str = 'pearson', maximo_faixas_rank: int = 256):
+    # Matriz de correlação pelos co-momentos combináveis de lt.partial_correlation (Pearson) ou pelas faixas 
+    # de rank de lt.partial_rank_correlation (Spearman, exato para colunas com até maximo_faixas_rank valores distintos).
+    # Para bases maiores que a memória, os parciais são acumulados bloco a bloco em telecomx_blocos
+    if metodo == 'pearson':
+        return lt.correlation_from_partial(lt.partial_correlation(df, colunas_numericas))
+    if metodo == 'spearman':
+        faixas_rank = {c: lt.rank_bin_edges(df[c], maximo_faixas_rank) for c in colunas_numericas}
+        return lt.spearman_from_partial(lt.partial_rank_correlation(df, faixas_rank))
+    raise ValueError(f'Método de correlação {metodo} inválido, utilize pearson ou spearman')
+
+
+def dados_graf_matriz_correlacao(df: pd.DataFrame, colunas_numericas: list, titulo:str, correlacao: pd.DataFrame = None):
+    # Matriz de correlação. Uma matriz já calculada (por exemplo, com telecomx_blocos.calcular_correlacao_blocos) 
+    # pode ser informada em correlacao, sem o DataFrame; colunas_numericas seleciona as colunas exibidas
+    if correlacao is None:
+        correlacao = calcular_correlacao_telecomx(df, colunas_numericas)
+    elif colunas_numericas is not None:
+        correlacao = correlacao.loc[colunas_numericas, colunas_numericas]
+    return {'tamanho': (10, 6), 'correlacao': correlacao, 'titulo': titulo}
+
+
+def desenhar_graf_matriz_correlacao(fig, dados: dict):
+    import seaborn as sns
+
+    ax = fig.add_subplot()
+    sns.heatmap(dados['correlacao'], annot=True, fmt='.2f', cmap='coolwarm', square=True, cbar_kws={"shrink": .8}, ax=ax)
     
-    plt.title(titulo)
-    plt.xticks(rotation=45)
-    plt.yticks(rotation=0)
+    ax.set_title(dados['titulo'])
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.tick_params(axis='y', labelrotation=0)
 
     # Remover bordas
-    for spine in ['top', 'right']:
-        plt.gca().spines[spine].set_visible(False)
+    remover_bordas(ax)
+
+
+def graf_matriz_correlacao(df: pd.DataFrame, colunas_numericas: list, titulo:str, correlacao: pd.DataFrame = None):
+    import matplotlib.pyplot as plt
+
+    dados = dados_graf_matriz_correlacao(df, colunas_numericas, titulo, correlacao)
+    desenhar_graf_matriz_correlacao(plt.figure(figsize=dados['tamanho']), dados)
+    return plt
+
 
-    return plt
\ No newline at end of file
+# Gráficos disponíveis para o renderizador em lote: nome da função graf_* -> (dados, desenho)
+GRAFICOS_TELECOMX = {
+    'graf_percentual_chrun': (dados_graf_percentual_chrun, desenhar_graf_percentual_chrun),
+    'graf_boxplot_churn': (dados_graf_boxplot_churn, desenhar_graf_boxplot_churn),
+    'graf_distribuicao_churn': (dados_graf_distribuicao_churn, desenhar_graf_distribuicao_churn),
+    'graf_boxplot_churn_varialvel_numerica': (dados_graf_boxplot_churn_varialvel_numerica, desenhar_graf_boxplot_churn_varialvel_numerica),
+    'graf_distribuicao_churn_varialvel_numerica': (dados_graf_distribuicao_churn_varialvel_numerica, desenhar_graf_distribuicao_churn_varialvel_numerica),
+    'graf_barra_customer_churn': (dados_graf_barra_customer_churn, desenhar_graf_barra_customer_churn),
+    'graf_matriz_correlacao': (dados_graf_matriz_correlacao, desenhar_graf_matriz_correlacao),
+}
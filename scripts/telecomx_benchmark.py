@@ -0,0 +1,284 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+
+import pandas as pd
+import numpy as np
+
+import scripts.local_tools as lt
+import scripts.telecomx_analysis as ta
+
+
+ARQUIVO_FONTE_TELECOMX = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'TelecomX_Data.json')
+ARQUIVO_BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'baseline.json')
+
+# Módulos do tratamento sem gráficos (caminho dos processos em lote) e dependências que só devem ser
+# importadas no primeiro uso de gráficos, notebook, HTTP ou testes estatísticos
+MODULOS_ETL = ['scripts.local_tools', 'scripts.telecomx_analysis', 'scripts.telecomx_blocos', 'scripts.telecomx_pipeline']
+MODULOS_PESADOS = ['scipy', 'seaborn', 'matplotlib', 'requests', 'jupyterlab', 'ipykernel']
+
+# Executado em um novo interpretador: importa pandas e numpy (base comum a todos os módulos) e depois o módulo
+# medido, informando o tempo de cada parte e os módulos pesados carregados
+CODIGO_MEDICAO_IMPORTACAO = '''
+import sys, json, time, importlib
+inicio = time.perf_counter()
+import pandas, numpy
+meio = time.perf_counter()
+importlib.import_module(sys.argv[1])
+fim = time.perf_counter()
+pesados = [m for m in sys.argv[2].split(',') if m in sys.modules]
+print(json.dumps({'pandas_numpy_s': meio - inicio, 'importacao_s': fim - meio, 'modulos_pesados': pesados}))
+'''
+
+METRICAS_NUMERICAS = ['customer_tenure', 'account_Charges_Monthly', 'account_Charges_Total']
+
+# Modelo de um registro no mesmo esquema aninhado do JSON original da TelecomX
+MODELO_REGISTRO_JSON = (
+    '{{"customerID":"{customerID}","Churn":"{Churn}",'
+    '"customer":{{"gender":"{customer_gender}","SeniorCitizen":{customer_SeniorCitizen},'
+    '"Partner":"{customer_Partner}","Dependents":"{customer_Dependents}","tenure":{customer_tenure}}},'
+    '"phone":{{"PhoneService":"{phone_PhoneService}","MultipleLines":"{phone_MultipleLines}"}},'
+    '"internet":{{"InternetService":"{internet_InternetService}","OnlineSecurity":"{internet_OnlineSecurity}",'
+    '"OnlineBackup":"{internet_OnlineBackup}","DeviceProtection":"{internet_DeviceProtection}",'
+    '"TechSupport":"{internet_TechSupport}","StreamingTV":"{internet_StreamingTV}","StreamingMovies":"{internet_StreamingMovies}"}},'
+    '"account":{{"Contract":"{account_Contract}","PaperlessBilling":"{account_PaperlessBilling}",'
+    '"PaymentMethod":"{account_PaymentMethod}","Charges":{{"Monthly":{account_Charges_Monthly},"Total":"{account_Charges_Total}"}}}}}}'
+)
+
+
+def gerar_dados_telecomx_sinteticos(quantidade: int, semente: int = 0, df_fonte: pd.DataFrame = None):
+    # Gera um DataFrame no formato de carregar_dados_telecomx_normalizado com quantidade registros, sorteando
+    # (com reposição) registros completos da base original. Assim as distribuições de cada coluna, as relações
+    # entre colunas e a proporção de valores inválidos são preservadas. Apenas customerID é gerado novamente
+    if df_fonte is None:
+        df_fonte = ta.carregar_dados_telecomx_normalizado(ARQUIVO_FONTE_TELECOMX, imprimir=False)
+
+    gerador = np.random.default_rng(semente)
+    df = df_fonte.take(gerador.integers(0, len(df_fonte), quantidade)).reset_index(drop=True)
+    df['customerID'] = pd.Series(np.arange(quantidade)).astype(str).str.zfill(10)
+    return df
+
+
+def gravar_json_telecomx(df: pd.DataFrame, caminho_arquivo: str, tamanho_bloco: int = 100_000):
+    # Grava o DataFrame sintético como lista JSON no esquema aninhado original, em blocos de registros
+    colunas = list(df.columns)
+    with open(caminho_arquivo, 'w', encoding='utf-8') as arquivo:
+        arquivo.write('[')
+        for inicio in range(0, len(df), tamanho_bloco):
+            bloco = df.iloc[inicio:inicio + tamanho_bloco]
+            registros = (
+                MODELO_REGISTRO_JSON.format(**dict(zip(colunas, valores)))
+                for valores in zip(*(bloco[c].tolist() for c in colunas))
+            )
+            arquivo.write((',' if inicio else '') + ','.join(registros))
+        arquivo.write(']')
+
+
+def medir_tempo(funcao, preparar=None, repeticoes: int = 3):
+    # Menor tempo entre as repetições (como no timeit). preparar gera, fora da medição, o argumento de cada execução
+    tempos = []
+    for _ in range(repeticoes):
+        argumento = preparar() if preparar is not None else None
+        inicio = time.perf_counter()
+        funcao(argumento)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def medir_importacao(modulo: str, repeticoes: int = 5):
+    # Tempo de importação do módulo em um novo interpretador a cada repetição (menor tempo entre elas),
+    # descontada a importação de pandas e numpy, e os módulos de MODULOS_PESADOS carregados por ele
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    medicoes = []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, '-c', CODIGO_MEDICAO_IMPORTACAO, modulo, ','.join(MODULOS_PESADOS)],
+            cwd=raiz, capture_output=True, text=True, check=True,
+        )
+        medicoes.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+
+    return {
+        'modulo': modulo,
+        'pandas_numpy_s': round(min(m['pandas_numpy_s'] for m in medicoes), 6),
+        'importacao_s': round(min(m['importacao_s'] for m in medicoes), 6),
+        'modulos_pesados': medicoes[-1]['modulos_pesados'],
+    }
+
+
+def verificar_importacao(modulos: list = None, orcamento_s: float = 0.5, repeticoes: int = 5):
+    # Verifica se cada módulo do tratamento importa dentro do orçamento de tempo e sem dependências pesadas
+    modulos = MODULOS_ETL if modulos is None else modulos
+    df_importacao = pd.DataFrame([medir_importacao(m, repeticoes) for m in modulos])
+    df_importacao['dentro_orcamento'] = (
+        (df_importacao['importacao_s'] <= orcamento_s) & (df_importacao['modulos_pesados'].str.len() == 0)
+    )
+    return df_importacao
+
+
+def criar_benchmarks(df_bruto: pd.DataFrame):
+    # Prepara as entradas de cada benchmark a partir do DataFrame bruto, na mesma sequência do tratamento
+    df_limpo = ta.tratar_valores_invalidados(df_bruto.copy(), imprimir=False)
+    df_binario, colunas_valores_binarios = ta.tratar_colunas_valores_binarios(df_limpo.copy(), imprimir=False)
+    df_binario = lt.convert_types(df_binario, ['account_Charges_Total'], ['float'])
+    df_final = ta.criar_colunas_derivadas(df_binario.copy())
+    df_churn_yes = df_final[df_final['Churn'] == 1]
+
+    return {
+        'tratar_valores_invalidados': (
+            lambda df: ta.tratar_valores_invalidados(df, imprimir=False), lambda: df_bruto.copy()),
+        'tratar_colunas_valores_binarios': (
+            lambda df: ta.tratar_colunas_valores_binarios(df, imprimir=False), lambda: df_limpo.copy()),
+        'criar_colunas_derivadas': (
+            lambda df: ta.criar_colunas_derivadas(df), lambda: df_binario.copy()),
+        'describe_full_df': (
+            lambda _: lt.describe_full_df(df_churn_yes[METRICAS_NUMERICAS]), None),
+        'describe_full_df_segmented': (
+            lambda _: lt.describe_full_df_segmented(df_final, 'account_Charges_Monthly', 'account_Contract'), None),
+        'get_chi_square': (
+            lambda _: lt.get_chi_square(df_final, 'Churn', colunas_valores_binarios[1:]), None),
+        'calcular_percentual_churn_categoria': (
+            lambda _: ta.calcular_percentual_churn_categoria(df_final, 'account_Charges_Monthly_bins'), None),
+    }
+
+
+def executar_benchmarks(tamanhos: list, repeticoes: int = 3, limite_carga: int = 1_000_000, semente: int = 0, imprimir=True):
+    # Executa os benchmarks para cada quantidade de registros e retorna os resultados (serializáveis em JSON).
+    # A carga do JSON só é medida até limite_carga registros, pois exige gravar o arquivo sintético em disco
+    df_fonte = ta.carregar_dados_telecomx_normalizado(ARQUIVO_FONTE_TELECOMX, imprimir=False)
+
+    resultados = {
+        'ambiente': {
+            'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'sistema': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'repeticoes': repeticoes,
+        'tempos_s': {},
+    }
+
+    for tamanho in tamanhos:
+        df_bruto = gerar_dados_telecomx_sinteticos(tamanho, semente, df_fonte)
+        tempos = {}
+
+        if tamanho <= limite_carga:
+            with tempfile.TemporaryDirectory() as diretorio:
+                caminho = os.path.join(diretorio, 'telecomx_sintetico.json')
+                gravar_json_telecomx(df_bruto, caminho)
+                tempos['carregar_dados_telecomx_normalizado'] = medir_tempo(
+                    lambda _: ta.carregar_dados_telecomx_normalizado(caminho, imprimir=False), repeticoes=repeticoes)
+
+        for nome, (funcao, preparar) in criar_benchmarks(df_bruto).items():
+            tempos[nome] = medir_tempo(funcao, preparar, repeticoes)
+
+        for nome, tempo in tempos.items():
+            print(f'{tamanho:>10} {nome:<40} {tempo:10.4f}s') if imprimir else None
+
+        resultados['tempos_s'][str(tamanho)] = {nome: round(tempo, 6) for nome, tempo in tempos.items()}
+
+    return resultados
+
+
+def comparar_com_baseline(resultados: dict, baseline: dict, tolerancia: float = 0.2):
+    # Compara os tempos com a baseline. Retorna um DataFrame com a razão atual/baseline e a indicação de regressão
+    # (razão acima de 1 + tolerancia). Benchmarks sem tempo na baseline (ex.: tamanho não gravado) são indicados
+    # em sem_baseline, em vez de ignorados
+    linhas = []
+    for tamanho, tempos in resultados['tempos_s'].items():
+        for nome, tempo in tempos.items():
+            tempo_baseline = baseline['tempos_s'].get(tamanho, {}).get(nome)
+            if tempo_baseline is None:
+                razao = np.nan
+            else:
+                razao = round(tempo / tempo_baseline if tempo_baseline > 0 else np.inf, 3)
+            linhas.append({
+                'tamanho': int(tamanho),
+                'benchmark': nome,
+                'baseline_s': tempo_baseline,
+                'atual_s': tempo,
+                'razao': razao,
+                'regressao': bool(razao > 1 + tolerancia),
+                'sem_baseline': tempo_baseline is None,
+            })
+    return pd.DataFrame(
+        linhas, columns=['tamanho', 'benchmark', 'baseline_s', 'atual_s', 'razao', 'regressao', 'sem_baseline'])
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(
+        description='Mede o tempo das funções de tratamento e análise da TelecomX em dados sintéticos.'
+    )
+    parser.add_argument('--tamanhos', default='10000,1000000,10000000',
+                        help='Quantidades de registros separadas por vírgula')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--limite-carga', type=int, default=1_000_000,
+                        help='Maior quantidade de registros para o benchmark de carga do JSON')
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--saida', help='Arquivo JSON onde os resultados são gravados')
+    parser.add_argument('--gravar-baseline', action='store_true', help=f'Grava os resultados como baseline em {ARQUIVO_BASELINE}')
+    parser.add_argument('--baseline', default=ARQUIVO_BASELINE, help='Arquivo de baseline para comparação')
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help='Aumento relativo de tempo acima do qual o benchmark é indicado como regressão')
+    parser.add_argument('--importacao', action='store_true',
+                        help='Mede apenas o tempo de importação dos módulos do tratamento')
+    parser.add_argument('--orcamento-importacao', type=float, default=0.5,
+                        help='Tempo máximo (s) de importação de cada módulo do tratamento, além de pandas e numpy')
+    args = parser.parse_args(argv)
+
+    if args.importacao:
+        df_importacao = verificar_importacao(orcamento_s=args.orcamento_importacao, repeticoes=args.repeticoes)
+        print(df_importacao.to_string(index=False))
+        fora_orcamento = df_importacao[~df_importacao['dentro_orcamento']]
+        if len(fora_orcamento) > 0:
+            print(f'\n{len(fora_orcamento)} módulo(s) acima do orçamento de {args.orcamento_importacao}s ou com dependências pesadas.')
+            return 1
+        return 0
+
+    tamanhos = [int(t) for t in args.tamanhos.split(',')]
+    resultados = executar_benchmarks(tamanhos, args.repeticoes, args.limite_carga, args.semente)
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+
+    if args.gravar_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f'\nBaseline {args.baseline} não encontrada; use --gravar-baseline para criá-la.')
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as arquivo:
+        baseline = json.load(arquivo)
+
+    comparacao = comparar_com_baseline(resultados, baseline, args.tolerancia)
+    print('\n' + comparacao.to_string(index=False))
+
+    cpus_baseline = baseline.get('ambiente', {}).get('cpus')
+    if cpus_baseline != resultados['ambiente']['cpus']:
+        print(f'\nA baseline foi gravada com {cpus_baseline} CPU(s) e esta execução tem {resultados["ambiente"]["cpus"]}.')
+
+    regressoes = comparacao[comparacao['regressao']]
+    sem_baseline = comparacao[comparacao['sem_baseline']]
+    if len(regressoes) > 0:
+        print(f'\n{len(regressoes)} benchmark(s) com regressão acima de {args.tolerancia:.0%}.')
+    if len(sem_baseline) > 0:
+        tamanhos_sem_baseline = sorted(int(t) for t in sem_baseline['tamanho'].unique())
+        print(f'\n{len(sem_baseline)} benchmark(s) sem tempo na baseline (tamanhos {tamanhos_sem_baseline}); '
+              'grave a baseline com esses tamanhos usando --gravar-baseline.')
+    return 1 if len(regressoes) > 0 or len(sem_baseline) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,184 @@
+import pandas as pd
+
+import scripts.local_tools as lt
+import scripts.telecomx_analysis as ta
+
+
+VALORES_INVALIDOS_CHURN = ['', ' ', None, 'Nan']
+
+METRICAS_NUMERICAS_BLOCOS = ['customer_tenure', 'account_Charges_Monthly', 'account_Charges_Total', 'account_Charges_Daily']
+
+
+def levantar_parametros_blocos(caminho_arquivo_json: str, limite_delecao=0.05, tamanho_bloco: int = 100_000):
+    # Primeira passada pela fonte, bloco a bloco, para obter as decisões que dependem da base inteira:
+    # se os registros com Churn inválido serão deletados (limite_delecao) e os limites das faixas.
+    # As estatísticas das faixas são acumuladas para todos os registros e apenas para os de Churn válido,
+    # pois a decisão de deleção só é conhecida no final
+    registros = 0
+    churn_invalidos = 0
+    estatisticas_todos = None
+    estatisticas_validos = None
+
+    for bloco in ta.carregar_dados_telecomx_em_blocos(caminho_arquivo_json, tamanho_bloco):
+        churn_invalido = bloco['Churn'].isin(VALORES_INVALIDOS_CHURN).to_numpy()
+        registros += len(bloco)
+        churn_invalidos += int(churn_invalido.sum())
+
+        bloco, _ = ta.limpar_valores_invalidados(bloco, deletar=False)
+        estatisticas_todos = ta.combinar_estatisticas_faixas(estatisticas_todos, ta.estatisticas_faixas_telecomx(bloco))
+        if not churn_invalido.all():
+            estatisticas_validos = ta.combinar_estatisticas_faixas(
+                estatisticas_validos, ta.estatisticas_faixas_telecomx(bloco[~churn_invalido]))
+
+    if registros == 0:
+        return False, {}
+
+    deletar = churn_invalidos / registros < limite_delecao
+    estatisticas = estatisticas_validos if deletar and churn_invalidos > 0 else estatisticas_todos
+    faixas = ta.ajustar_faixas_estatisticas(estatisticas) if estatisticas is not None else {}
+    return deletar, faixas
+
+
+def processar_bloco_telecomx(bloco: pd.DataFrame, deletar: bool, faixas: dict, diagnostico_completo: bool = False):
+    # Tratamento de um bloco com as decisões já fixadas para a base inteira: valores inválidos, codificação binária,
+    # colunas derivadas e conversão de tipos, nas mesmas etapas (e tipos, como Churn int64) de telecomx_pipeline
+    bloco, diagnostico = ta.limpar_valores_invalidados(bloco, deletar=deletar, diagnostico_completo=diagnostico_completo)
+    bloco, colunas_valores_binarios = ta.tratar_colunas_valores_binarios(bloco, imprimir=False)
+    bloco = lt.convert_types(bloco, ['account_Charges_Total'], ['float'])
+    bloco = ta.criar_colunas_derivadas(bloco, faixas)
+    bloco = ta.conversao_tipos(bloco)
+    return bloco, diagnostico, colunas_valores_binarios
+
+
+def combinar_diagnosticos(diagnostico: dict, diagnostico_novo: dict):
+    if diagnostico is None:
+        return dict(diagnostico_novo)
+    return {chave: valor + diagnostico_novo[chave] for chave, valor in diagnostico.items()}
+
+
+def executar_etl_em_blocos(
+        caminho_arquivo_json: str,
+        arquivo_saida: str = None,
+        limite_delecao=0.05,
+        tamanho_bloco: int = 100_000,
+        deletar: bool = None,
+        faixas: dict = None,
+        colunas_agregados: list = None,
+        metricas_numericas: list = None,
+        spearman=False,
+        maximo_faixas_rank: int = 256,
+        imprimir=False):
+    # Executa o tratamento completo bloco a bloco, com memória limitada pelo tamanho do bloco.
+    # Cada bloco tratado é gravado de forma incremental em Parquet (arquivo_saida) e contribui com resultados
+    # parciais combináveis: contagens de Churn por categoria, tabelas de contingência do qui-quadrado e
+    # estatísticas descritivas. Sem deletar e faixas informados, uma primeira passada pela fonte os define.
+    # Sem colunas_agregados, as contagens de Churn usam as colunas categóricas identificadas no primeiro bloco.
+    # Os co-momentos das métricas numéricas e do Churn dão as correlações de Pearson e ponto-bisserial; com spearman,
+    # as faixas de rank são definidas no primeiro bloco (exatas para colunas com até maximo_faixas_rank valores)
+    if deletar is None or faixas is None:
+        deletar_ajustado, faixas_ajustadas = levantar_parametros_blocos(caminho_arquivo_json, limite_delecao, tamanho_bloco)
+        deletar = deletar_ajustado if deletar is None else deletar
+        faixas = faixas_ajustadas if faixas is None else faixas
+
+    metricas_numericas = METRICAS_NUMERICAS_BLOCOS if metricas_numericas is None else metricas_numericas
+
+    writer = None
+    esquema = None
+    resultados = {
+        'blocos': 0,
+        'deletar': deletar,
+        'faixas': faixas,
+        'diagnostico': None,
+        'colunas_valores_binarios': None,
+        'agregados_churn': None,
+        'colunas_contingencia': None,
+        'contingencias': None,
+        'estatisticas': None,
+        'correlacoes': None,
+        'correlacoes_rank': None,
+    }
+    colunas_correlacao = metricas_numericas + ['Churn']
+
+    try:
+        for bloco in ta.carregar_dados_telecomx_em_blocos(caminho_arquivo_json, tamanho_bloco):
+            bloco, diagnostico, colunas_valores_binarios = processar_bloco_telecomx(bloco, deletar, faixas, imprimir)
+
+            if arquivo_saida is not None:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                tabela = pa.Table.from_pandas(bloco, schema=esquema, preserve_index=False)
+                if writer is None:
+                    esquema = tabela.schema
+                    writer = pq.ParquetWriter(arquivo_saida, esquema)
+                writer.write_table(tabela)
+
+            resultados['blocos'] += 1
+            resultados['diagnostico'] = combinar_diagnosticos(resultados['diagnostico'], diagnostico)
+
+            if resultados['colunas_valores_binarios'] is None:
+                resultados['colunas_valores_binarios'] = colunas_valores_binarios
+                resultados['agregados_churn'] = ta.criar_agregados_churn(bloco, colunas_agregados, faixas=faixas)
+                resultados['colunas_contingencia'] = [c for c in colunas_valores_binarios if c != 'Churn']
+                resultados['contingencias'] = lt.contingency_counts(bloco, 'Churn', resultados['colunas_contingencia'])
+                resultados['estatisticas'] = lt.partial_describe(bloco[metricas_numericas])
+                resultados['correlacoes'] = lt.partial_correlation(bloco, colunas_correlacao)
+                if spearman:
+                    faixas_rank = {c: lt.rank_bin_edges(bloco[c], maximo_faixas_rank) for c in colunas_correlacao}
+                    resultados['correlacoes_rank'] = lt.partial_rank_correlation(bloco, faixas_rank)
+            else:
+                ta.atualizar_agregados_churn(resultados['agregados_churn'], bloco)
+                resultados['contingencias'] = lt.merge_contingency_counts(
+                    resultados['contingencias'],
+                    lt.contingency_counts(bloco, 'Churn', resultados['colunas_contingencia']),
+                )
+                resultados['estatisticas'] = lt.merge_partial_describe(
+                    resultados['estatisticas'], lt.partial_describe(bloco[metricas_numericas]))
+                resultados['correlacoes'] = lt.merge_partial_correlation(
+                    resultados['correlacoes'], lt.partial_correlation(bloco, colunas_correlacao))
+                if spearman:
+                    resultados['correlacoes_rank'] = lt.merge_partial_rank_correlation(
+                        resultados['correlacoes_rank'], 
+                        lt.partial_rank_correlation(bloco, resultados['correlacoes_rank']['edges']),
+                    )
+
+            print(f"Bloco {resultados['blocos']}: {len(bloco)} registros tratados") if imprimir else None
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if imprimir and resultados['diagnostico'] is not None:
+        ta.imprimir_diagnostico_invalidados(resultados['diagnostico'], limite_delecao)
+
+    return resultados
+
+
+def calcular_percentual_churn_blocos(resultados: dict, categoria: str, totalizador: bool = True):
+    # Mesmo resultado de calcular_percentual_churn_categoria sobre a base inteira
+    return ta.calcular_percentual_churn_agregados(resultados['agregados_churn'], categoria, totalizador)
+
+
+def calcular_qui_quadrado_blocos(resultados: dict):
+    # Mesmo resultado de lt.get_chi_square(df, 'Churn', colunas binárias exceto Churn) sobre a base inteira
+    return lt.get_chi_square_from_counts(resultados['contingencias'])
+
+
+def descrever_blocos(resultados: dict):
+    # Métricas de lt.describe_full_df que podem ser calculadas exatamente a partir das estatísticas parciais
+    return lt.finalize_partial_describe(resultados['estatisticas'])
+
+
+def calcular_correlacao_blocos(resultados: dict, metodo: str = 'pearson'):
+    # Matriz de correlação das métricas numéricas e do Churn, para ta.graf_matriz_correlacao(None, None, titulo, correlacao)
+    if metodo == 'pearson':
+        return lt.correlation_from_partial(resultados['correlacoes'])
+    if metodo == 'spearman':
+        if resultados['correlacoes_rank'] is None:
+            raise ValueError('Execute executar_etl_em_blocos com spearman=True para a correlação de Spearman')
+        return lt.spearman_from_partial(resultados['correlacoes_rank'])
+    raise ValueError(f'Método de correlação {metodo} inválido, utilize pearson ou spearman')
+
+
+def calcular_ponto_bisserial_blocos(resultados: dict):
+    # Correlação ponto-bisserial (e p-valor) de cada métrica numérica com o Churn
+    return lt.point_biserial_from_partial(resultados['correlacoes'], 'Churn')
@@ -0,0 +1,200 @@
+import os
+import json
+import hashlib
+import inspect
+
+import pandas as pd
+
+import scripts.local_tools as lt
+import scripts.telecomx_fontes as tf
+import scripts.telecomx_analysis as ta
+
+
+def calcular_impressao_digital(caminho_arquivo: str, tamanho_leitura: int = 1 << 20):
+    # Hash SHA-256 do conteúdo da fonte de dados, lido em pedaços para não carregar o arquivo inteiro.
+    # Para URLs HTTP, vem do cache de downloads, que só transfere o arquivo novamente quando ele muda
+    return tf.calcular_sha256_fonte(caminho_arquivo, tamanho_leitura=tamanho_leitura)
+
+
+# Versão de cada etapa: deve ser incrementada quando o resultado da etapa muda, o que invalida o cache dela e das seguintes
+VERSOES_ETAPAS_CACHE = {
+    'normalizado': 1,
+    'valores_invalidados': 1,
+    'valores_binarios': 1,
+    'colunas_derivadas': 1,
+}
+
+# Hash do código de cada etapa, calculado uma única vez por processo
+HASHES_CODIGO_ETAPAS = {}
+
+
+def eh_objeto_projeto(objeto):
+    return str(getattr(objeto, '__module__', '')).startswith('scripts.')
+
+
+def coletar_codigo_funcao(funcao, trechos: dict):
+    # Adiciona a trechos o código-fonte da função e, recursivamente, o das funções e constantes do projeto
+    # referenciadas por ela, seja pelo nome (calcular_faixa) ou pelo módulo (lt.create_bins)
+    if not eh_objeto_projeto(funcao) or ('funcao', funcao) in trechos:
+        return
+    trechos[('funcao', funcao)] = inspect.getsource(funcao)
+
+    nomes = set()
+    codigos = [funcao.__code__]
+    while codigos:
+        codigo = codigos.pop()
+        nomes.update(codigo.co_names)
+        codigos.extend(c for c in codigo.co_consts if inspect.iscode(c))
+
+    globais = funcao.__globals__
+    modulos = [m for m in globais.values() if inspect.ismodule(m) and m.__name__.startswith('scripts.')]
+    for nome in sorted(nomes):
+        candidatos = [globais[nome]] if nome in globais else []
+        candidatos += [getattr(m, nome) for m in modulos if hasattr(m, nome)]
+        for objeto in candidatos:
+            if inspect.isfunction(objeto):
+                coletar_codigo_funcao(objeto, trechos)
+            elif nome.isupper() and ('constante', nome, id(objeto)) not in trechos:
+                trechos[('constante', nome, id(objeto))] = f'{nome} = {representar_constante(objeto)}'
+                for valor in funcoes_em_constante(objeto):
+                    coletar_codigo_funcao(valor, trechos)
+
+
+def representar_constante(objeto):
+    # Representação estável entre processos: as funções guardadas na constante entram pelo código-fonte
+    return json.dumps(objeto, sort_keys=True, default=lambda valor: '<função>' if callable(valor) else str(valor))
+
+
+def funcoes_em_constante(objeto):
+    # Funções guardadas em constantes (ex.: as lambdas de COLUNAS_DERIVADAS_TELECOMX)
+    if inspect.isfunction(objeto):
+        return [objeto]
+    if isinstance(objeto, dict):
+        objeto = list(objeto.values())
+    if isinstance(objeto, (list, tuple)):
+        return [f for valor in objeto for f in funcoes_em_constante(valor)]
+    return []
+
+
+def calcular_hash_codigo(etapa: str):
+    # SHA-256 do código usado pela etapa. Alterações em funções que a etapa não chama não invalidam o cache dela
+    if etapa not in HASHES_CODIGO_ETAPAS:
+        trechos = {}
+        coletar_codigo_funcao(FUNCOES_ETAPAS_CACHE[etapa], trechos)
+        hash_codigo = hashlib.sha256()
+        for trecho in sorted(trechos.values()):
+            hash_codigo.update(trecho.encode())
+        HASHES_CODIGO_ETAPAS[etapa] = hash_codigo.hexdigest()
+    return HASHES_CODIGO_ETAPAS[etapa]
+
+
+def calcular_chave_etapa(chave_anterior: str, etapa: str, versao: int, parametros: dict, hash_codigo: str):
+    # A chave de cada etapa encadeia a chave da etapa anterior, a versão da etapa, os parâmetros e o código da etapa.
+    # Assim, alterar um parâmetro invalida apenas a etapa alterada e as seguintes
+    conteudo = json.dumps(
+        {'anterior': chave_anterior, 'etapa': etapa, 'versao': versao, 'parametros': parametros, 'codigo': hash_codigo},
+        sort_keys=True,
+        default=lambda valor: valor.tolist() if hasattr(valor, 'tolist') else str(valor),
+    ).encode()
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def caminho_cache(diretorio_cache: str, etapa: str, chave: str):
+    return os.path.join(diretorio_cache, f'{etapa}_{chave[:16]}')
+
+
+def ler_cache(diretorio_cache: str, etapa: str, chave: str):
+    # Retorna o DataFrame e os metadados gravados da etapa, ou None quando não existe cache para a chave
+    caminho = caminho_cache(diretorio_cache, etapa, chave)
+    if not (os.path.exists(f'{caminho}.parquet') and os.path.exists(f'{caminho}.json')):
+        return None
+
+    with open(f'{caminho}.json', encoding='utf-8') as arquivo:
+        metadados = json.load(arquivo)
+    if metadados.get('chave') != chave:
+        return None
+
+    return pd.read_parquet(f'{caminho}.parquet'), metadados
+
+
+def gravar_cache(diretorio_cache: str, etapa: str, chave: str, df: pd.DataFrame, metadados: dict = None):
+    # Grava o resultado da etapa em Parquet (tipos categóricos preservados) e os metadados em JSON.
+    # O JSON é gravado por último e marca o cache como completo
+    os.makedirs(diretorio_cache, exist_ok=True)
+    caminho = caminho_cache(diretorio_cache, etapa, chave)
+
+    df.to_parquet(f'{caminho}.parquet.tmp')
+    os.replace(f'{caminho}.parquet.tmp', f'{caminho}.parquet')
+
+    metadados = dict(metadados or {}, chave=chave, etapa=etapa)
+    with open(f'{caminho}.json', 'w', encoding='utf-8') as arquivo:
+        json.dump(metadados, arquivo)
+
+
+def etapa_valores_invalidados(df: pd.DataFrame, limite_delecao=0.05, imprimir=False):
+    df, diagnostico = ta.limpar_valores_invalidados(df, limite_delecao, diagnostico_completo=imprimir)
+    if imprimir:
+        ta.imprimir_diagnostico_invalidados(diagnostico, limite_delecao)
+    return df, {'diagnostico_invalidados': diagnostico}
+
+
+def etapa_valores_binarios(df: pd.DataFrame, imprimir=False):
+    df, colunas_valores_binarios = ta.tratar_colunas_valores_binarios(df, imprimir)
+    return df, {'colunas_valores_binarios': colunas_valores_binarios}
+
+
+def etapa_colunas_derivadas(df: pd.DataFrame, faixas: dict = None):
+    df = lt.convert_types(df, ['account_Charges_Total'], ['float'])
+    df = ta.criar_colunas_derivadas(df, faixas)
+    return df, {}
+
+
+# Função de entrada de cada etapa. Entram na chave o código-fonte dela, das funções do projeto que ela chama
+# (direta ou indiretamente) e as constantes em maiúsculas que usa, como o registro de colunas derivadas
+FUNCOES_ETAPAS_CACHE = {
+    'normalizado': ta.carregar_dados_telecomx_normalizado,
+    'valores_invalidados': etapa_valores_invalidados,
+    'valores_binarios': etapa_valores_binarios,
+    'colunas_derivadas': etapa_colunas_derivadas,
+}
+
+
+def carregar_dados_telecomx_com_cache(caminho_arquivo_json: str, diretorio_cache: str = './cache', limite_delecao=0.05, imprimir=False, faixas: dict = None):
+    # Executa carga, tratamento de inválidos, tratamento dos binários e criação das colunas derivadas,
+    # reaproveitando o resultado em cache da última etapa cuja chave não mudou.
+    # Faixas gravadas (lt.load_bins) são usadas nas colunas derivadas e entram na chave da etapa
+    etapas = [
+        ('normalizado', lambda _: (ta.carregar_dados_telecomx_normalizado(caminho_arquivo_json, imprimir), {}), {}),
+        ('valores_invalidados', lambda df: etapa_valores_invalidados(df, limite_delecao, imprimir),
+         {'limite_delecao': limite_delecao}),
+        ('valores_binarios', lambda df: etapa_valores_binarios(df, imprimir), {}),
+        ('colunas_derivadas', lambda df: etapa_colunas_derivadas(df, faixas), {'faixas': faixas}),
+    ]
+
+    chave = calcular_impressao_digital(caminho_arquivo_json)
+    chaves = []
+    for etapa, _, parametros in etapas:
+        chave = calcular_chave_etapa(chave, etapa, VERSOES_ETAPAS_CACHE[etapa], parametros, calcular_hash_codigo(etapa))
+        chaves.append(chave)
+
+    # Procura a partir da última etapa o resultado mais adiantado já gravado
+    df = None
+    metadados = {}
+    inicio = 0
+    for i in range(len(etapas) - 1, -1, -1):
+        resultado = ler_cache(diretorio_cache, etapas[i][0], chaves[i])
+        if resultado is not None:
+            df, metadados = resultado
+            inicio = i + 1
+            print(f'Etapa {etapas[i][0]} carregada do cache') if imprimir else None
+            break
+
+    for i in range(inicio, len(etapas)):
+        etapa, executar, _ = etapas[i]
+        df, novos_metadados = executar(df)
+        if df is None:
+            return None, []
+        metadados.update(novos_metadados)
+        gravar_cache(diretorio_cache, etapa, chaves[i], df, metadados)
+
+    return df, metadados.get('colunas_valores_binarios', [])
@@ -0,0 +1,227 @@
+import os
+import json
+import zlib
+import hashlib
+import itertools
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+
+# Downloads HTTP gravados por conteúdo (SHA-256) e índice por URL com ETag/Last-Modified para revalidação
+DIRETORIO_CACHE_DOWNLOADS = os.path.join('.', 'cache', 'downloads')
+
+ASSINATURA_GZIP = b'\x1f\x8b'
+ASSINATURA_ZSTD = b'\x28\xb5\x2f\xfd'
+
+# Sessão HTTP compartilhada pelas cargas do processo, criada no primeiro uso
+sessao_http = None
+
+
+def criar_sessao_http(tentativas: int = 3, fator_espera: float = 0.5, conexoes: int = 10):
+    # Sessão com pool de conexões reaproveitadas e novas tentativas (com espera exponencial) para falhas de
+    # conexão e respostas 429/5xx. O cabeçalho Accept-Encoding padrão do requests já solicita gzip.
+    # O requests só é importado no primeiro acesso HTTP, para não pesar na carga de arquivos locais
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=tentativas,
+        backoff_factor=fator_espera,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=('GET', 'HEAD'),
+        raise_on_status=False,
+    )
+    adaptador = HTTPAdapter(pool_connections=conexoes, pool_maxsize=conexoes, max_retries=retry)
+
+    sessao = requests.Session()
+    sessao.mount('http://', adaptador)
+    sessao.mount('https://', adaptador)
+    return sessao
+
+
+def obter_sessao_http():
+    global sessao_http
+    if sessao_http is None:
+        sessao_http = criar_sessao_http()
+    return sessao_http
+
+
+def fonte_http(caminho: str):
+    return caminho.startswith(('http://', 'https://'))
+
+
+def caminho_local_fonte(caminho: str):
+    # Caminho local de um endereço file:// ou de um caminho de arquivo
+    if caminho.startswith('file://'):
+        url = urlparse(caminho)
+        return url2pathname(url.path) if not url.netloc else url2pathname(f'//{url.netloc}{url.path}')
+    return caminho
+
+
+def descomprimir_pedacos(pedacos):
+    # Identifica pela assinatura dos primeiros bytes se o conteúdo está em gzip ou zstd e o descomprime em fluxo,
+    # pedaço a pedaço; outros conteúdos são repassados sem alteração
+    pedacos = iter(pedacos)
+    inicio = b''
+    for pedaco in pedacos:
+        inicio += pedaco
+        if len(inicio) >= len(ASSINATURA_ZSTD):
+            break
+    pedacos = itertools.chain([inicio], pedacos)
+
+    if inicio.startswith(ASSINATURA_GZIP):
+        descompressor = zlib.decompressobj(wbits=31)
+        for pedaco in pedacos:
+            # Arquivos gzip podem ter vários membros concatenados
+            while pedaco:
+                yield descompressor.decompress(pedaco)
+                if not descompressor.eof:
+                    break
+                pedaco = descompressor.unused_data
+                descompressor = zlib.decompressobj(wbits=31)
+        yield descompressor.flush()
+    elif inicio.startswith(ASSINATURA_ZSTD):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError('O pacote zstandard é necessário para fontes comprimidas em zstd: pip install zstandard')
+        descompressor = zstandard.ZstdDecompressor().decompressobj()
+        for pedaco in pedacos:
+            yield descompressor.decompress(pedaco)
+    else:
+        yield from pedacos
+
+
+def caminho_indice_download(diretorio_cache: str, url: str):
+    return os.path.join(diretorio_cache, 'indice', f"{hashlib.sha256(url.encode()).hexdigest()}.json")
+
+
+def caminho_objeto_download(diretorio_cache: str, sha256: str):
+    return os.path.join(diretorio_cache, 'objetos', sha256)
+
+
+def ler_indice_download(diretorio_cache: str, url: str):
+    # Registro do último download da URL, ou None quando não há cópia completa em cache
+    caminho = caminho_indice_download(diretorio_cache, url)
+    if not os.path.exists(caminho):
+        return None
+
+    with open(caminho, encoding='utf-8') as arquivo:
+        indice = json.load(arquivo)
+    if indice.get('url') != url or not os.path.exists(caminho_objeto_download(diretorio_cache, indice['sha256'])):
+        return None
+    return indice
+
+
+def gravar_indice_download(diretorio_cache: str, indice: dict):
+    caminho = caminho_indice_download(diretorio_cache, indice['url'])
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(f'{caminho}.tmp', 'w', encoding='utf-8') as arquivo:
+        json.dump(indice, arquivo, ensure_ascii=False, indent=2)
+    os.replace(f'{caminho}.tmp', caminho)
+
+
+def baixar_fonte_http(url: str, diretorio_cache: str = DIRETORIO_CACHE_DOWNLOADS, sessao=None,
+                      timeout: float = 30, tamanho_leitura: int = 1 << 20):
+    # Garante uma cópia local atualizada da URL e retorna seu registro no índice (com o caminho do objeto).
+    # Com uma cópia em cache, a requisição é condicional (If-None-Match/If-Modified-Since) e a resposta 304
+    # não transfere o conteúdo. O conteúdo é descomprimido em fluxo, gravado pelo seu SHA-256 e o índice
+    # é gravado por último, marcando o download como completo. Sem conexão, a cópia em cache é utilizada
+    import requests
+
+    sessao = obter_sessao_http() if sessao is None else sessao
+    indice = ler_indice_download(diretorio_cache, url)
+
+    cabecalhos = {}
+    if indice is not None:
+        if indice.get('etag'):
+            cabecalhos['If-None-Match'] = indice['etag']
+        if indice.get('last_modified'):
+            cabecalhos['If-Modified-Since'] = indice['last_modified']
+
+    try:
+        response = sessao.get(url, headers=cabecalhos, stream=True, timeout=timeout)
+    except requests.ConnectionError:
+        if indice is None:
+            raise
+        return dict(indice, caminho=caminho_objeto_download(diretorio_cache, indice['sha256']), revalidado=False)
+
+    with response:
+        if response.status_code == 304 and indice is not None:
+            indice['verificado_em'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+            gravar_indice_download(diretorio_cache, indice)
+            return dict(indice, caminho=caminho_objeto_download(diretorio_cache, indice['sha256']), revalidado=True)
+
+        if response.status_code != 200:
+            raise requests.HTTPError(response.status_code, response=response)
+
+        diretorio_objetos = os.path.dirname(caminho_objeto_download(diretorio_cache, 'x'))
+        os.makedirs(diretorio_objetos, exist_ok=True)
+        hash_conteudo = hashlib.sha256()
+        tamanho = 0
+        with tempfile.NamedTemporaryFile('wb', dir=diretorio_objetos, delete=False) as arquivo:
+            try:
+                for pedaco in descomprimir_pedacos(response.iter_content(tamanho_leitura)):
+                    hash_conteudo.update(pedaco)
+                    tamanho += len(pedaco)
+                    arquivo.write(pedaco)
+            except BaseException:
+                arquivo.close()
+                os.remove(arquivo.name)
+                raise
+        sha256 = hash_conteudo.hexdigest()
+        os.replace(arquivo.name, caminho_objeto_download(diretorio_cache, sha256))
+
+        agora = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        indice = {
+            'url': url,
+            'sha256': sha256,
+            'tamanho': tamanho,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'baixado_em': agora,
+            'verificado_em': agora,
+        }
+    gravar_indice_download(diretorio_cache, indice)
+    return dict(indice, caminho=caminho_objeto_download(diretorio_cache, sha256), revalidado=False)
+
+
+@contextmanager
+def abrir_fonte(caminho: str, diretorio_cache: str = DIRETORIO_CACHE_DOWNLOADS, sessao=None,
+                timeout: float = 30, tamanho_leitura: int = 1 << 20):
+    # Fornece o conteúdo descomprimido da fonte em pedaços de bytes, seja uma URL HTTP, um endereço file://
+    # ou um caminho local. URLs HTTP passam pelo cache de downloads; com diretorio_cache=None o conteúdo
+    # é lido diretamente da resposta, sem gravação em disco
+    if fonte_http(caminho) and diretorio_cache is None:
+        import requests
+
+        sessao = obter_sessao_http() if sessao is None else sessao
+        with sessao.get(caminho, stream=True, timeout=timeout) as response:
+            if response.status_code != 200:
+                raise requests.HTTPError(response.status_code, response=response)
+            yield descomprimir_pedacos(response.iter_content(tamanho_leitura))
+        return
+
+    if fonte_http(caminho):
+        caminho_arquivo = baixar_fonte_http(caminho, diretorio_cache, sessao, timeout, tamanho_leitura)['caminho']
+    else:
+        caminho_arquivo = caminho_local_fonte(caminho)
+
+    with open(caminho_arquivo, 'rb') as arquivo:
+        yield descomprimir_pedacos(iter(lambda: arquivo.read(tamanho_leitura), b''))
+
+
+def calcular_sha256_fonte(caminho: str, diretorio_cache: str = DIRETORIO_CACHE_DOWNLOADS, tamanho_leitura: int = 1 << 20):
+    # SHA-256 do conteúdo descomprimido da fonte. Para URLs HTTP em cache, vem do índice após a revalidação
+    if fonte_http(caminho) and diretorio_cache is not None:
+        return baixar_fonte_http(caminho, diretorio_cache, tamanho_leitura=tamanho_leitura)['sha256']
+
+    hash_fonte = hashlib.sha256()
+    with abrir_fonte(caminho, diretorio_cache, tamanho_leitura=tamanho_leitura) as pedacos:
+        for pedaco in pedacos:
+            hash_fonte.update(pedaco)
+    return hash_fonte.hexdigest()
@@ -0,0 +1,80 @@
+import os
+import time
+
+import pandas as pd
+import numpy as np
+
+import scripts.telecomx_analysis as ta
+
+
+def preparar_graficos(df, especificacoes: list):
+    # Calcula no processo principal as entradas pequenas de cada gráfico (ta.dados_graf_*), sem copiar o DataFrame.
+    # Cada especificação é um dicionário com 'grafico' (nome da função graf_*), 'parametros' (argumentos da
+    # função, exceto o DataFrame) e 'arquivo' (caminho de saída; a extensão .png ou .svg define o formato)
+    tarefas = []
+    for i, especificacao in enumerate(especificacoes):
+        nome = especificacao['grafico']
+        if nome not in ta.GRAFICOS_TELECOMX:
+            raise KeyError(f'Gráfico {nome} não encontrado em GRAFICOS_TELECOMX')
+
+        inicio = time.perf_counter()
+        dados = ta.GRAFICOS_TELECOMX[nome][0](df, **especificacao.get('parametros', {}))
+        tarefas.append({
+            'ordem': i,
+            'grafico': nome,
+            'arquivo': especificacao['arquivo'],
+            'dados': dados,
+            'tempo_dados_s': time.perf_counter() - inicio,
+        })
+    return tarefas
+
+
+def renderizar_tarefas(tarefas: list, dpi: int = 100):
+    # Desenha e grava os gráficos com o backend Agg, sem o pyplot: uma única figura é reaproveitada
+    # (limpa e redimensionada) para todos os gráficos do lote, então nenhuma figura fica aberta
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure()
+    FigureCanvasAgg(fig)
+
+    resultados = []
+    for tarefa in tarefas:
+        inicio = time.perf_counter()
+        fig.clear()
+        fig.set_size_inches(tarefa['dados']['tamanho'])
+        ta.GRAFICOS_TELECOMX[tarefa['grafico']][1](fig, tarefa['dados'])
+
+        diretorio = os.path.dirname(tarefa['arquivo'])
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        fig.savefig(tarefa['arquivo'], dpi=dpi)
+
+        resultados.append({
+            'ordem': tarefa['ordem'],
+            'grafico': tarefa['grafico'],
+            'arquivo': tarefa['arquivo'],
+            'tempo_dados_s': tarefa['tempo_dados_s'],
+            'tempo_render_s': time.perf_counter() - inicio,
+            'processo': os.getpid(),
+        })
+    return resultados
+
+
+def renderizar_graficos(df, especificacoes: list, n_jobs: int = None, dpi: int = 100):
+    # Renderiza um lote de gráficos em PNG/SVG e retorna um DataFrame com o tempo de cada gráfico.
+    # Com n_jobs > 1 os gráficos são divididos entre processos; apenas as entradas pequenas são enviadas
+    tarefas = preparar_graficos(df, especificacoes)
+
+    if n_jobs is not None and n_jobs > 1 and len(tarefas) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        lotes = [list(lote) for lote in np.array_split(np.array(tarefas, dtype=object), min(n_jobs, len(tarefas))) if len(lote)]
+        with ProcessPoolExecutor(max_workers=len(lotes)) as executor:
+            resultados = [r for lote in executor.map(renderizar_tarefas, lotes, [dpi] * len(lotes)) for r in lote]
+    else:
+        resultados = renderizar_tarefas(tarefas, dpi)
+
+    df_resultados = pd.DataFrame(resultados).sort_values('ordem').drop(columns='ordem').reset_index(drop=True)
+    df_resultados['tempo_total_s'] = df_resultados['tempo_dados_s'] + df_resultados['tempo_render_s']
+    return df_resultados
@@ -0,0 +1,199 @@
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+from datetime import datetime, timezone
+
+import pandas as pd
+import numpy as np
+
+import scripts.local_tools as lt
+import scripts.telecomx_analysis as ta
+
+
+def ler_memoria_linux():
+    # RSS atual (VmRSS) e pico de RSS (VmHWM) do processo em MB, lidos de /proc/self/status
+    memoria = {}
+    with open('/proc/self/status', encoding='ascii') as arquivo:
+        for linha in arquivo:
+            if linha.startswith(('VmRSS:', 'VmHWM:')):
+                memoria[linha[:5]] = int(linha.split()[1]) / (1 << 10)
+    return memoria['VmRSS'], memoria['VmHWM']
+
+
+def reiniciar_pico_memoria():
+    # Reinicia o pico de memória para a medição de uma etapa e retorna a memória no início dela.
+    # No Linux o pico de RSS do processo (VmHWM) é reiniciado escrevendo 5 em /proc/self/clear_refs, o que
+    # inclui a memória alocada pelo pyarrow; nos demais sistemas é usado o pico das alocações do tracemalloc
+    if not tracemalloc.is_tracing():
+        try:
+            with open('/proc/self/clear_refs', 'w', encoding='ascii') as arquivo:
+                arquivo.write('5')
+            return 'rss', ler_memoria_linux()[0]
+        except OSError:
+            tracemalloc.start()
+
+    tracemalloc.reset_peak()
+    return 'tracemalloc', tracemalloc.get_traced_memory()[0] / (1 << 20)
+
+
+def ler_pico_memoria(medicao: str):
+    # Pico de memória desde o último reiniciar_pico_memoria, em MB
+    if medicao == 'rss':
+        return ler_memoria_linux()[1]
+    return tracemalloc.get_traced_memory()[1] / (1 << 20)
+
+
+def criar_etapas_pipeline(caminho_arquivo_json: str, limite_delecao=0.05, imprimir=False):
+    # Etapas do tratamento na mesma sequência do notebook. Cada etapa recebe o DataFrame da etapa anterior
+    # e retorna o novo DataFrame e um dicionário de informações complementares para o perfil
+    def carregar(_):
+        return ta.carregar_dados_telecomx_normalizado(caminho_arquivo_json, imprimir), {}
+
+    def valores_invalidados(df):
+        df, diagnostico = ta.limpar_valores_invalidados(df, limite_delecao, diagnostico_completo=imprimir)
+        if imprimir:
+            ta.imprimir_diagnostico_invalidados(diagnostico, limite_delecao)
+        return df, {'diagnostico': diagnostico}
+
+    def valores_binarios(df):
+        df, colunas_valores_binarios = ta.tratar_colunas_valores_binarios(df, imprimir)
+        return df, {'colunas_valores_binarios': colunas_valores_binarios}
+
+    def converter_tipos(df):
+        return lt.convert_types(df, ['account_Charges_Total'], ['float']), {}
+
+    def colunas_derivadas(df):
+        return ta.criar_colunas_derivadas(df), {}
+
+    def conversao_tipos(df):
+        return ta.conversao_tipos(df), {}
+
+    return [
+        ('carregar_dados_telecomx_normalizado', carregar),
+        ('tratar_valores_invalidados', valores_invalidados),
+        ('tratar_colunas_valores_binarios', valores_binarios),
+        ('convert_types', converter_tipos),
+        ('criar_colunas_derivadas', colunas_derivadas),
+        ('conversao_tipos', conversao_tipos),
+    ]
+
+
+def executar_etapa(nome: str, funcao, df: pd.DataFrame):
+    # Executa uma etapa medindo tempo de relógio, tempo de CPU, pico de memória da etapa e dimensões do resultado
+    medicao, memoria_inicio = reiniciar_pico_memoria()
+    inicio_relogio = time.perf_counter()
+    inicio_cpu = time.process_time()
+
+    df, informacoes = funcao(df)
+
+    registro = {
+        'etapa': nome,
+        'tempo_s': round(time.perf_counter() - inicio_relogio, 6),
+        'cpu_s': round(time.process_time() - inicio_cpu, 6),
+        'pico_memoria_mb': None,
+        'aumento_memoria_mb': None,
+        'medicao_memoria': medicao,
+        'linhas': None if df is None else int(df.shape[0]),
+        'colunas': None if df is None else int(df.shape[1]),
+    }
+
+    pico = ler_pico_memoria(medicao)
+    registro['pico_memoria_mb'] = round(pico, 2)
+    registro['aumento_memoria_mb'] = round(pico - memoria_inicio, 2)
+
+    registro.update(informacoes)
+    return df, registro
+
+
+def executar_pipeline(caminho_arquivo_json: str, limite_delecao=0.05, imprimir=False, arquivo_cprofile: str = None):
+    # Executa todas as etapas e retorna o DataFrame final e o perfil de execução (serializável em JSON).
+    # Com arquivo_cprofile, a execução completa é registrada pelo cProfile e gravada no arquivo informado
+    profiler = None
+    if arquivo_cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+
+    perfil = {
+        'fonte': caminho_arquivo_json,
+        'inicio': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'parametros': {'limite_delecao': limite_delecao},
+        'etapas': [],
+    }
+
+    inicio_relogio = time.perf_counter()
+    inicio_cpu = time.process_time()
+
+    df = None
+    tracemalloc_ativo = tracemalloc.is_tracing()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        for nome, funcao in criar_etapas_pipeline(caminho_arquivo_json, limite_delecao, imprimir):
+            df, registro = executar_etapa(nome, funcao, df)
+            perfil['etapas'].append(registro)
+            if df is None:
+                perfil['erro'] = f'Etapa {nome} não retornou dados'
+                break
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(arquivo_cprofile)
+            perfil['arquivo_cprofile'] = arquivo_cprofile
+        if not tracemalloc_ativo:
+            tracemalloc.stop()
+
+    perfil['total'] = {
+        'tempo_s': round(time.perf_counter() - inicio_relogio, 6),
+        'cpu_s': round(time.process_time() - inicio_cpu, 6),
+        'pico_memoria_mb': max((etapa['pico_memoria_mb'] for etapa in perfil['etapas']), default=None),
+        'linhas': None if df is None else int(df.shape[0]),
+        'colunas': None if df is None else int(df.shape[1]),
+    }
+
+    return df, perfil
+
+
+def gravar_perfil(perfil: dict, caminho_arquivo: str):
+    with open(caminho_arquivo, 'w', encoding='utf-8') as arquivo:
+        json.dump(perfil, arquivo, ensure_ascii=False, indent=2)
+
+
+def imprimir_perfil(perfil: dict):
+    colunas = ['etapa', 'tempo_s', 'cpu_s', 'pico_memoria_mb', 'aumento_memoria_mb', 'linhas', 'colunas']
+    df_perfil = pd.DataFrame(perfil['etapas'], columns=colunas)
+    print(df_perfil.to_string(index=False))
+    print(f"\nTotal: {perfil['total']['tempo_s']:.3f}s de relógio, {perfil['total']['cpu_s']:.3f}s de CPU")
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(
+        description='Executa o tratamento dos dados TelecomX e registra tempo e memória de cada etapa.'
+    )
+    parser.add_argument('arquivo', help='Arquivo JSON (ou URL) com os dados TelecomX')
+    parser.add_argument('--limite-delecao', type=float, default=0.05,
+                        help='Percentual máximo de registros com Churn inválido que podem ser deletados')
+    parser.add_argument('--perfil', help='Arquivo JSON onde o perfil de execução é gravado')
+    parser.add_argument('--cprofile', help='Arquivo onde as estatísticas do cProfile são gravadas')
+    parser.add_argument('--saida', help='Arquivo Parquet onde o DataFrame tratado é gravado')
+    parser.add_argument('--imprimir', action='store_true', help='Imprime as mensagens de cada etapa')
+    args = parser.parse_args(argv)
+
+    df, perfil = executar_pipeline(args.arquivo, args.limite_delecao, args.imprimir, args.cprofile)
+
+    if args.perfil:
+        gravar_perfil(perfil, args.perfil)
+    if args.saida and df is not None:
+        df.to_parquet(args.saida)
+
+    imprimir_perfil(perfil)
+    return 0 if df is not None else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
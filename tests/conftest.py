@@ -0,0 +1,27 @@
+import os
+import sys
+
+# Os testes importam os módulos como no notebook (scripts.*), a partir da raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import pytest
+
+CAMINHO_DADOS_TELECOMX = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'TelecomX_Data.json')
+
+
+@pytest.fixture(scope='session')
+def df_telecomx_base():
+    # Base TelecomX tratada como no notebook, sem as colunas derivadas
+    import scripts.telecomx_analysis as ta
+
+    df = ta.carregar_dados_telecomx_normalizado(CAMINHO_DADOS_TELECOMX, False)
+    df = ta.tratar_valores_invalidados(df, imprimir=False)
+    df, _ = ta.tratar_colunas_valores_binarios(df, imprimir=False)
+    df['account_Charges_Total'] = df['account_Charges_Total'].astype(float)
+    return df
+
+
+@pytest.fixture
+def df_telecomx(df_telecomx_base):
+    return df_telecomx_base.copy()
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+import scripts.local_tools as lt
+
+
+def test_profile_columns_percebe_escrita_na_coluna():
+    df = pd.DataFrame({'a': np.array([0, 1] * 5, dtype='int8'), 'b': pd.Series(['x', 'y'] * 5, dtype='str')})
+    perfil = lt.profile_columns(df)
+    assert perfil.is_binary['a'] and perfil.domain['b'] == ['x', 'y']
+
+    df.loc[0, 'a'] = 5
+    df.loc[0, 'b'] = 'z'
+    perfil = lt.profile_columns(df)
+    assert not perfil.is_binary['a']
+    assert perfil.domain['a'] == [0, 1, 5]
+    assert perfil.domain['b'] == ['x', 'y', 'z']
+
+
+def test_cached_statistic_percebe_escrita_na_coluna():
+    df = pd.DataFrame({'a': np.arange(10.0)})
+    assert lt.cached_statistic(df, ['a'], np.sum) == 45.0
+
+    df.loc[0, 'a'] = 100.0
+    assert lt.cached_statistic(df, ['a'], np.sum) == 145.0
+
+
+def test_describe_full_df_igual_ao_calculo_coluna_a_coluna():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'normal': rng.normal(50, 20, 1001),
+        'lognormal': rng.lognormal(3, 1, 1001).round(2),
+        'inteiro': rng.integers(0, 72, 1001),
+    })
+    resultado = lt.describe_full_df(df)
+
+    funcoes = lt.describe_functions()
+    for c in df.columns:
+        esperado = lt.describe_column_loop(df[c], funcoes)
+        for metrica, valor in zip(funcoes, esperado):
+            # Igualdade exata, sem tolerância: o bloco deve reproduzir o cálculo coluna a coluna
+            obtido = resultado.loc[metrica, c]
+            if isinstance(valor, list):
+                assert list(obtido) == valor, metrica
+            else:
+                assert obtido == valor or (np.isnan(obtido) and np.isnan(valor)), metrica
+
+
+def test_describe_full_df_segmented_igual_ao_describe_de_cada_segmento():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        'valor': rng.normal(50, 20, 500),
+        'inteiro': rng.integers(0, 72, 500),
+        'categoria': pd.Series(rng.choice(['a', 'b', 'c', None], 500, p=[0.5, 0.3, 0.19, 0.01]), dtype='str'),
+    })
+    df.loc[rng.random(500) < 0.02, 'valor'] = np.nan
+    resultado = lt.describe_full_df_segmented(df, ['valor', 'inteiro'], 'categoria')
+
+    # Os clientes sem categoria formam um segmento próprio
+    assert sorted(resultado.columns.get_level_values('categoria').dropna().unique()) == ['a', 'b', 'c']
+    assert resultado.columns.get_level_values('categoria').isna().any()
+
+    for c, categoria in resultado.columns:
+        filtro = df['categoria'].isna() if pd.isna(categoria) else df['categoria'] == categoria
+        esperado = lt.describe_full_df(df.loc[filtro, ['valor', 'inteiro']])[c]
+        for metrica in esperado.index:
+            obtido, valor = resultado.loc[metrica, (c, categoria)], esperado[metrica]
+            if isinstance(valor, list):
+                assert list(obtido) == valor, metrica
+            else:
+                assert obtido == valor or (pd.isna(obtido) and pd.isna(valor)), metrica
+
+
+def test_describe_full_df_aproximado_repassa_parametros_dos_sketches():
+    df = pd.DataFrame({'a': np.arange(3000) % 2500 * 1.5})
+
+    # Com contadores suficientes a contagem de distintos é exata; acima deles vem do HyperLogLog
+    assert lt.describe_full_df(df, approximate=True, max_counters=5000).loc['count_unique', 'a'] == 2500
+    estimativa = lt.describe_full_df(df, approximate=True).loc['count_unique', 'a']
+    estimativa_grosseira = lt.describe_full_df(df, approximate=True, hll_precision=6).loc['count_unique', 'a']
+    assert estimativa != 2500 and estimativa_grosseira != estimativa
+    assert lt.describe_approximate(df, n_jobs=2, max_counters=5000).loc['count_unique', 'a'] == 2500
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import scripts.telecomx_analysis as ta
+
+
+def criar_clientes(totais: list):
+    n = len(totais)
+    return pd.DataFrame({
+        'Churn': ['No'] * n,
+        'customer_tenure': [12] * n,
+        'account_Charges_Monthly': [50.0] * n,
+        'account_Charges_Total': pd.Series(totais, dtype='str'),
+        'phone_PhoneService': ['Yes'] * n,
+        'phone_MultipleLines': ['No'] * n,
+        'internet_InternetService': ['DSL'] * n,
+    })
+
+
+def test_limpar_valores_invalidados_total_nao_numerico_vira_nan():
+    df, diagnostico = ta.limpar_valores_invalidados(criar_clientes(['N/A', '1,234.5', ' ', '600.5']))
+
+    total = df['account_Charges_Total'].to_numpy()
+    assert np.isnan(total[0]) and np.isnan(total[1])
+    assert total[2] == 0.0
+    assert total[3] == 600.5
+    assert diagnostico['charges_total_invalidos_antes'] == 1
+
+
+def test_agregados_churn_nao_alteram_o_dataframe(df_telecomx):
+    colunas = ['customer_tenure_bins', 'account_Charges_Monthly_bins', 'only_PhoneService']
+    primeiro, segundo = df_telecomx.iloc[:3000].copy(), df_telecomx.iloc[3000:].copy()
+    colunas_originais = list(df_telecomx.columns)
+
+    agregados = ta.criar_agregados_churn(primeiro, colunas)
+    ta.atualizar_agregados_churn(agregados, segundo)
+
+    assert list(primeiro.columns) == colunas_originais
+    assert list(segundo.columns) == colunas_originais
+    df_completo = ta.garantir_colunas_derivadas(df_telecomx, colunas, agregados['faixas'])
+    for c in colunas:
+        assert ta.calcular_percentual_churn_agregados(agregados, c).equals(ta.calcular_percentual_churn_categoria(df_completo, c))
+
+
+def test_cubo_churn_intervalo_alinhado_igual_ao_filtro_nos_registros(df_telecomx):
+    colunas_originais = list(df_telecomx.columns)
+    cubo = ta.criar_cubo_churn(df_telecomx, ['account_Charges_Monthly_bins', 'customer_Partner', 'account_Contract'])
+    assert list(df_telecomx.columns) == colunas_originais
+
+    bordas = cubo['faixas']['account_Charges_Monthly_bins']['edges']
+    inicio, fim = bordas[1], bordas[3]
+    filtro = (df_telecomx['account_Charges_Monthly'] >= inicio) & (df_telecomx['account_Charges_Monthly'] < fim)
+    filtro_contrato = filtro & (df_telecomx['account_Contract'] == 'Month-to-month')
+
+    resultado = ta.consultar_cubo_churn(
+        cubo, 'customer_Partner', {'account_Charges_Monthly_bins': pd.Interval(inicio, fim, closed='left')})
+    assert resultado.equals(ta.calcular_percentual_churn_categoria(df_telecomx[filtro], 'customer_Partner'))
+
+    resultado = ta.consultar_cubo_churn(cubo, 'customer_Partner', {
+        'account_Charges_Monthly_bins': pd.Interval(inicio, fim, closed='left'), 'account_Contract': 'Month-to-month'})
+    assert resultado.equals(ta.calcular_percentual_churn_categoria(df_telecomx[filtro_contrato], 'customer_Partner'))
+
+
+def test_cubo_churn_intervalo_desalinhado_gera_erro(df_telecomx):
+    cubo = ta.criar_cubo_churn(df_telecomx, ['account_Charges_Monthly_bins', 'customer_Partner'])
+    bordas = cubo['faixas']['account_Charges_Monthly_bins']['edges']
+    meio = (bordas[1] + bordas[2]) / 2
+
+    # O filtro nos registros inclui clientes de uma faixa que o cubo não consegue separar
+    mensal = df_telecomx['account_Charges_Monthly']
+    assert ((mensal >= meio) & (mensal < bordas[2])).any()
+
+    with pytest.raises(ValueError, match='não coincide com as bordas'):
+        ta.consultar_cubo_churn(
+            cubo, 'customer_Partner', {'account_Charges_Monthly_bins': pd.Interval(meio, bordas[3], closed='left')})
@@ -0,0 +1,33 @@
+import numpy as np
+
+import scripts.telecomx_benchmark as tb
+
+
+def test_comparar_com_baseline_indica_tamanhos_sem_baseline():
+    baseline = {'tempos_s': {'10000': {'describe_full_df': 0.010, 'get_chi_square': 0.005}}}
+    resultados = {'tempos_s': {
+        '10000': {'describe_full_df': 0.011, 'get_chi_square': 0.009},
+        '10000000': {'describe_full_df': 1.5},
+    }}
+
+    comparacao = tb.comparar_com_baseline(resultados, baseline, tolerancia=0.2).set_index(['tamanho', 'benchmark'])
+
+    assert len(comparacao) == 3
+    assert not comparacao.loc[(10000, 'describe_full_df'), 'regressao']
+    assert comparacao.loc[(10000, 'get_chi_square'), 'regressao']
+    linha = comparacao.loc[(10000000, 'describe_full_df')]
+    assert linha['sem_baseline'] and not linha['regressao'] and np.isnan(linha['razao'])
+
+
+def test_modulos_do_tratamento_dentro_do_orcamento_de_importacao():
+    df_importacao = tb.verificar_importacao(repeticoes=1)
+
+    assert list(df_importacao['modulo']) == tb.MODULOS_ETL
+    assert df_importacao['dentro_orcamento'].all(), df_importacao.to_string()
+
+
+def test_importacao_de_modulo_pesado_fica_fora_do_orcamento():
+    df_importacao = tb.verificar_importacao(['scipy.stats'], orcamento_s=60, repeticoes=1)
+
+    assert df_importacao.loc[0, 'modulos_pesados'] == ['scipy']
+    assert not df_importacao.loc[0, 'dentro_orcamento']
@@ -0,0 +1,23 @@
+import pandas as pd
+
+import scripts.local_tools as lt
+import scripts.telecomx_blocos as tbl
+import scripts.telecomx_pipeline as tp
+
+from conftest import CAMINHO_DADOS_TELECOMX
+
+
+def test_etl_em_blocos_tem_os_mesmos_tipos_e_qui_quadrado_do_pipeline(tmp_path):
+    arquivo_saida = str(tmp_path / 'telecomx.parquet')
+    resultados = tbl.executar_etl_em_blocos(CAMINHO_DADOS_TELECOMX, arquivo_saida, tamanho_bloco=2000)
+    df_blocos = pd.read_parquet(arquivo_saida)
+    df_pipeline, _ = tp.executar_pipeline(CAMINHO_DADOS_TELECOMX)
+
+    assert resultados['blocos'] > 1
+    assert df_blocos['Churn'].dtype == df_pipeline['Churn'].dtype
+    pd.testing.assert_series_equal(df_blocos.dtypes, df_pipeline.dtypes)
+    assert 'Churn' not in resultados['colunas_contingencia']
+
+    colunas = [c for c in resultados['colunas_valores_binarios'] if c != 'Churn']
+    esperado = lt.get_chi_square(df_pipeline, 'Churn', colunas)
+    pd.testing.assert_frame_equal(tbl.calcular_qui_quadrado_blocos(resultados), esperado)
@@ -0,0 +1,38 @@
+import os
+
+import scripts.local_tools as lt
+import scripts.telecomx_analysis as ta
+import scripts.telecomx_cache as tc
+
+from conftest import CAMINHO_DADOS_TELECOMX
+
+
+def funcoes_da_etapa(etapa: str):
+    trechos = {}
+    tc.coletar_codigo_funcao(tc.FUNCOES_ETAPAS_CACHE[etapa], trechos)
+    return {chave[1] for chave in trechos if chave[0] == 'funcao'}
+
+
+def test_hash_codigo_usa_apenas_as_funcoes_da_etapa():
+    funcoes = funcoes_da_etapa('colunas_derivadas')
+    assert ta.calcular_faixa in funcoes
+    assert ta.criar_cubo_churn not in funcoes
+    assert ta.calcular_faixa not in funcoes_da_etapa('valores_invalidados')
+    assert tc.calcular_hash_codigo('colunas_derivadas') is tc.calcular_hash_codigo('colunas_derivadas')
+
+
+def test_faixas_entram_na_chave_do_cache(tmp_path):
+    diretorio = str(tmp_path)
+    df, _ = tc.carregar_dados_telecomx_com_cache(CAMINHO_DADOS_TELECOMX, diretorio)
+    arquivos = set(os.listdir(diretorio))
+
+    df_cache, _ = tc.carregar_dados_telecomx_com_cache(CAMINHO_DADOS_TELECOMX, diretorio)
+    assert set(os.listdir(diretorio)) == arquivos
+    assert df_cache.equals(df)
+
+    faixas = ta.ajustar_faixas_telecomx(df)
+    faixas['customer_tenure_bins'] = dict(lt.create_bins([0, 24, 48, 100], ['000-023', '024-047', '048-099']), coluna='customer_tenure')
+    df_faixas, _ = tc.carregar_dados_telecomx_com_cache(CAMINHO_DADOS_TELECOMX, diretorio, faixas=faixas)
+    novos = set(os.listdir(diretorio)) - arquivos
+    assert novos and all(a.startswith('colunas_derivadas_') for a in novos)
+    assert list(df_faixas['customer_tenure_bins'].cat.categories) == ['000-023', '024-047', '048-099']
@@ -0,0 +1,84 @@
+import gzip
+import hashlib
+import http.server
+import threading
+
+import pytest
+
+import scripts.telecomx_fontes as tf
+
+
+CONTEUDO = b'[{"customerID": "0001", "Churn": "No"}, {"customerID": "0002", "Churn": "Yes"}]'
+ETAG = '"v1"'
+
+
+@pytest.fixture
+def servidor_http():
+    # Servidor local que responde 304 a requisições condicionais e serve /dados.json.gz comprimido
+    respostas = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.headers.get('If-None-Match') == ETAG:
+                respostas.append(304)
+                self.send_response(304)
+                self.end_headers()
+                return
+            corpo = gzip.compress(CONTEUDO) if self.path.endswith('.gz') else CONTEUDO
+            respostas.append(200)
+            self.send_response(200)
+            self.send_header('ETag', ETAG)
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+    servidor = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield servidor, f'http://127.0.0.1:{servidor.server_port}', respostas
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def ler_fonte(caminho, diretorio_cache):
+    with tf.abrir_fonte(caminho, diretorio_cache) as pedacos:
+        return b''.join(pedacos)
+
+
+def test_cache_de_downloads_revalida_sem_transferir(servidor_http, tmp_path):
+    _, url, respostas = servidor_http
+    diretorio = str(tmp_path)
+
+    primeiro = tf.baixar_fonte_http(url + '/dados.json', diretorio)
+    segundo = tf.baixar_fonte_http(url + '/dados.json', diretorio)
+
+    assert respostas == [200, 304]
+    assert not primeiro['revalidado'] and segundo['revalidado']
+    assert primeiro['sha256'] == segundo['sha256'] == hashlib.sha256(CONTEUDO).hexdigest()
+    assert ler_fonte(url + '/dados.json', diretorio) == CONTEUDO
+
+
+def test_cache_de_downloads_descomprime_gzip(servidor_http, tmp_path):
+    _, url, _ = servidor_http
+
+    registro = tf.baixar_fonte_http(url + '/dados.json.gz', str(tmp_path))
+
+    assert registro['tamanho'] == len(CONTEUDO)
+    assert ler_fonte(url + '/dados.json.gz', str(tmp_path)) == CONTEUDO
+
+
+def test_cache_de_downloads_usa_copia_sem_conexao(servidor_http, tmp_path):
+    servidor, url, _ = servidor_http
+    diretorio = str(tmp_path)
+    tf.baixar_fonte_http(url + '/dados.json', diretorio)
+
+    servidor.shutdown()
+    servidor.server_close()
+    registro = tf.baixar_fonte_http(url + '/dados.json', diretorio, sessao=tf.criar_sessao_http(tentativas=0))
+
+    assert not registro['revalidado']
+    assert registro['sha256'] == hashlib.sha256(CONTEUDO).hexdigest()
+    with open(registro['caminho'], 'rb') as arquivo:
+        assert arquivo.read() == CONTEUDO
@@ -0,0 +1,40 @@
+import pytest
+
+import scripts.telecomx_graficos as tg
+
+
+def especificacoes_graficos(diretorio):
+    return [
+        {
+            'grafico': 'graf_barra_customer_churn',
+            'parametros': dict(var_categorica='customer_tenure_bins', titulo='Tenure', x_label='Meses',
+                               y_label1='Clientes', y_label2='% Churn'),
+            'arquivo': str(diretorio / 'barras' / 'tenure.png'),
+        },
+        {'grafico': 'graf_boxplot_churn', 'arquivo': str(diretorio / 'boxplot.svg')},
+        {'grafico': 'graf_distribuicao_churn', 'arquivo': str(diretorio / 'distribuicao.png')},
+    ]
+
+
+@pytest.mark.parametrize('n_jobs', [None, 2])
+def test_renderizar_graficos_grava_png_e_svg_com_tempos(df_telecomx, tmp_path, n_jobs):
+    especificacoes = especificacoes_graficos(tmp_path)
+
+    resultados = tg.renderizar_graficos(df_telecomx, especificacoes, n_jobs=n_jobs)
+
+    assert list(resultados['arquivo']) == [e['arquivo'] for e in especificacoes]
+    assert list(resultados['grafico']) == [e['grafico'] for e in especificacoes]
+    assert (resultados[['tempo_dados_s', 'tempo_render_s']] >= 0).all().all()
+    assert (resultados['tempo_total_s'] == resultados['tempo_dados_s'] + resultados['tempo_render_s']).all()
+
+    with open(especificacoes[0]['arquivo'], 'rb') as arquivo:
+        assert arquivo.read(8) == b'\x89PNG\r\n\x1a\n'
+    with open(especificacoes[1]['arquivo'], encoding='utf-8') as arquivo:
+        assert '<svg' in arquivo.read()
+    with open(especificacoes[2]['arquivo'], 'rb') as arquivo:
+        assert arquivo.read(8) == b'\x89PNG\r\n\x1a\n'
+
+
+def test_renderizar_graficos_rejeita_grafico_desconhecido(df_telecomx, tmp_path):
+    with pytest.raises(KeyError, match='graf_inexistente'):
+        tg.renderizar_graficos(df_telecomx, [{'grafico': 'graf_inexistente', 'arquivo': str(tmp_path / 'x.png')}])
@@ -0,0 +1,25 @@
+import json
+
+import scripts.telecomx_pipeline as tp
+
+from conftest import CAMINHO_DADOS_TELECOMX
+
+
+def test_perfil_json_tem_as_chaves_de_cada_etapa(tmp_path, capsys):
+    arquivo_perfil = tmp_path / 'perfil.json'
+
+    assert tp.main([CAMINHO_DADOS_TELECOMX, '--perfil', str(arquivo_perfil)]) == 0
+    with open(arquivo_perfil, encoding='utf-8') as arquivo:
+        perfil = json.load(arquivo)
+
+    assert {'fonte', 'inicio', 'python', 'pandas', 'numpy', 'parametros', 'etapas', 'total'} <= set(perfil)
+    assert perfil['parametros'] == {'limite_delecao': 0.05}
+    assert [e['etapa'] for e in perfil['etapas']] == [nome for nome, _ in tp.criar_etapas_pipeline(CAMINHO_DADOS_TELECOMX)]
+    chaves_etapa = {'etapa', 'tempo_s', 'cpu_s', 'pico_memoria_mb', 'aumento_memoria_mb', 'medicao_memoria', 'linhas', 'colunas'}
+    for etapa in perfil['etapas']:
+        assert chaves_etapa <= set(etapa)
+        assert etapa['tempo_s'] >= 0 and etapa['pico_memoria_mb'] is not None
+    assert 'colunas_valores_binarios' in perfil['etapas'][2]
+    assert {'tempo_s', 'cpu_s', 'pico_memoria_mb', 'linhas', 'colunas'} <= set(perfil['total'])
+    assert perfil['total']['linhas'] == perfil['etapas'][-1]['linhas']
+    assert 'Total:' in capsys.readouterr().out